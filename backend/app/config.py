@@ -1,26 +1,82 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# backend/.env, wherever the process is started from
+ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
 
 class Settings(BaseSettings):
+    """Read from the environment and backend/.env when instantiated; field names are the variable names
+    
+    Importing this module has no side effects beyond that read: nothing is
+    printed and os.environ is not modified.
+    """
+    
     # API Keys
-    gemini_api_key: Optional[str] = os.getenv('GEMINI_API_KEY')
-    tavily_api_key: Optional[str] = os.getenv('TAVILY_API_KEY')
+    gemini_api_key: Optional[str] = None
+    tavily_api_key: Optional[str] = None
+    
+    # API Endpoints; leave unset for the real services (set for local stand-ins)
+    gemini_api_endpoint: Optional[str] = None
+    tavily_api_url: Optional[str] = None
     
     # App Settings
     app_name: str = "Resume Parser & Job Agent"
-    debug: bool = os.getenv('DEBUG', 'false').lower() == 'true'
-    frontend_url: str = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+    debug: bool = False
+    frontend_url: str = 'http://localhost:3000'
+    
+    # Import the Gemini SDK and file parsers in the background at startup instead of on first use
+    preload_heavy_modules: bool = True
+    
+    # Job Search Settings
+    job_dedup_db_path: str = 'data/job_signatures.db'
+    job_dedup_retention_days: float = 30
+    job_prefetch_enabled: bool = False
+    job_prefetch_max_concurrent: int = 4
+    
+    # Resume Store Settings
+    resume_store_db_path: str = 'data/resumes.db'
+    job_listing_store_db_path: str = 'data/job_listings.db'
+    resume_text_db_path: str = 'data/resume_texts.db'
+    
+    # Session Settings
+    max_sessions: int = 1000
+    session_idle_ttl_seconds: int = 1800
+    session_memory_limit_mb: int = 512
+    session_sweep_interval_seconds: int = 60
+    session_backend: str = 'memory'
+    session_sqlite_path: str = 'data/sessions.db'
+    redis_url: str = 'redis://localhost:6379/0'
+    
+    # Parse Queue Settings
+    parse_queue_db_path: str = 'data/parse_jobs.db'
+    parse_upload_dir: str = 'data/parse_uploads'
+    parse_queue_workers: int = 2
+    parse_job_max_attempts: int = 3
+    parse_job_retry_backoff_seconds: float = 5
+    parse_job_lease_seconds: float = 600
+    parse_job_result_ttl_seconds: int = 3600
+    
+    # WebSocket Chat Settings
+    ws_max_pending_events: int = 64
+    ws_send_timeout_seconds: float = 10
+    ws_disconnect_grace_seconds: float = 15
+    
+    # Logging Settings
+    log_level: str = 'INFO'
+    log_format: str = 'text'  # text or json
+    log_queue_size: int = 10000
+    log_debug_sample_every: int = 20
+    
+    # Profiling Settings; profiles are only taken when enabled
+    profiling_enabled: bool = False
+    profiling_token: Optional[str] = None
+    profile_dir: str = 'data/profiles'
+    profile_keep: int = 50
+    profile_sample_interval_ms: float = 5
     
     class Config:
-        env_file = ".env"
+        env_file = ENV_FILE
+        extra = "ignore"
 
 settings = Settings()
-
-# Debug print
-print(f"[Config] Gemini API Key: {'Loaded' if settings.gemini_api_key else 'Missing'}")
-print(f"[Config] Tavily API Key: {'Loaded' if settings.tavily_api_key else 'Missing'}")
\ No newline at end of file
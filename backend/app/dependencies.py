@@ -0,0 +1,65 @@
+import threading
+from typing import Dict, Any, Callable, TYPE_CHECKING
+
+from app.services.job_search import JobSearchService
+from app.services.intent_router import IntentRouter
+from app.services.job_prefetch import JobPrefetcher
+from app.utils.llm_client import LLMClient, configure_gemini
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+
+class ServiceContainer:
+    """Process-wide, lazily created service instances shared by every session
+
+    Each service is built once on first use (double-checked under a lock),
+    so creating a chat agent never opens a client or calls an API.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get(self, name: str, factory: Callable[[], Any]):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    def llm_client(self) -> LLMClient:
+        return self._get("llm_client", LLMClient)
+
+    def job_search_service(self) -> JobSearchService:
+        return self._get("job_search_service", JobSearchService)
+
+    def intent_router(self) -> IntentRouter:
+        return self._get("intent_router", IntentRouter)
+
+    def job_prefetcher(self) -> JobPrefetcher:
+        return self._get("job_prefetcher", JobPrefetcher)
+
+    def generative_model(self, model_name: str) -> "genai.GenerativeModel":
+        """Shared Gemini model handle for free-form prompts (feedback, advice)"""
+        def create():
+            import google.generativeai as genai
+            
+            self._get("genai_configured", lambda: configure_gemini() or True)
+            return genai.GenerativeModel(model_name)
+        return self._get(f"model:{model_name}", create)
+
+    def override(self, name: str, instance: Any):
+        """Replace a service, e.g. with a local stand-in"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self):
+        with self._lock:
+            self._instances.clear()
+
+
+container = ServiceContainer()
@@ -1,45 +1,254 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+# First, so the startup report covers the whole import
+from app.utils.startup import startup, preload_heavy_modules
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Query, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, PlainTextResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List, Tuple
 import os
+import json
 from contextlib import asynccontextmanager
 import uuid
+import time
+import asyncio
+import logging
+import threading
 
 from app.config import settings
+from app.utils.serialization import FastJSONResponse, loads_json
+from app.utils.ndjson import NDJSON_MEDIA_TYPE, encode_ndjson, import_ndjson
+from app.utils.metrics import registry as metrics_registry, MetricsMiddleware, STAGE_SECONDS, ERRORS
+from app.utils.log import configure_logging, shutdown_logging, bind_session, RequestContextMiddleware
+from app.utils.profiling import profiler, ProfilingMiddleware, MODES as PROFILE_MODES
 from app.models.schemas import (
     ResumeData, ResumeParseResponse, ChatMessage, 
-    ChatResponse, JobSearchQuery
+    ChatResponse, JobSearchQuery, JobPage,
+    CandidateMatchRequest, CandidateMatchResponse, ParseJobStatus, ProfilingToggle,
+    StoredResumeSummary, StoredResumeQueryResponse, JobListing, NdjsonImportResult
 )
 from app.utils.file_processor import FileProcessor
 from app.utils.llm_client import LLMClient
 from app.services.chat_agent import ChatAgent
+from app.dependencies import container
+from app.services.candidate_index import CandidateIndex
+from app.services.resume_store import ResumeStore
+from app.services.listing_store import JobListingStore
+from app.services.text_store import ResumeTextStore
+from app.services.resume_sections import parse_revision
+from app.services.session_manager import SessionManager, SessionConflict
+from app.services.session_store import create_session_store
+from app.services.chat_channel import ChatConnection, ChatChannelRegistry
+from app.services.parse_queue import ParseJobQueue, PermanentJobError, TERMINAL_STATUSES
+
+configure_logging()
+log = logging.getLogger(__name__)
+
+# Chat agents per session, bounded by idle TTL, count and approximate memory.
+# With a sqlite or redis SESSION_BACKEND, snapshots go there so any worker can pick a session up.
+chat_agents = SessionManager(
+    store=create_session_store(),
+    agent_factory=ChatAgent.from_snapshot
+)
+
+# Open WebSocket chat connections, for pushing results of background work
+chat_channels = ChatChannelRegistry()
+
+# Parsed resumes indexed for recruiter-side matching
+candidate_index = CandidateIndex()
+
+# Every parsed resume, kept across restarts for analytics and re-matching
+resume_store = ResumeStore()
+
+# Job listings brought in by bulk import
+job_listing_store = JobListingStore()
+
+# Full extracted resume texts, so re-parsing never needs the original file
+text_store = ResumeTextStore()
+
+SESSION_CONFLICT_DETAIL = "This session was updated elsewhere; please send your message again."
+
+ALLOWED_RESUME_TYPES = [
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+]
+
+def run_parse_job(job: Dict[str, Any]):
+    """Queue worker: extract, parse and index one uploaded resume"""
+    try:
+        resume_text = FileProcessor.extract_text_from_file(job["file_path"], job["content_type"])
+    except Exception as e:
+        raise PermanentJobError(str(e))
+    if not resume_text.strip():
+        raise PermanentJobError("No text could be extracted from the file")
+    
+    parsed_data = parse_resume_text(resume_text, job.get("candidate_id"))
+    # Stored under the job id: a run repeated after a lost lease replaces the earlier copy
+    candidate_id = remember_resume(parsed_data, job.get("candidate_id") or job["id"])
+    return parsed_data.model_dump(), candidate_id
+
+def parse_resume_file(file_path: str, file_type: str, candidate_id: Optional[str] = None) -> Tuple[ResumeData, str]:
+    """Extract, parse and store an uploaded resume; returns it with its candidate id"""
+    resume_text = FileProcessor.extract_text_from_file(file_path, file_type)
+    log.debug("Extracted %d characters from %s", len(resume_text), os.path.basename(file_path))
+    parsed_data = parse_resume_text(resume_text, candidate_id)
+    # Make the candidate searchable for recruiters right away
+    return parsed_data, remember_resume(parsed_data, candidate_id)
+
+def parse_resume_text(resume_text: str, candidate_id: Optional[str] = None) -> ResumeData:
+    """Parse extracted text with Gemini and keep the full text for later re-parsing
+
+    With the ``candidate_id`` of a stored resume whose text was kept, the
+    text is treated as a revision: only changed sections go to Gemini.
+    """
+    previous = resume_store.get(candidate_id) if candidate_id else None
+    previous_text = text_store.get(previous.text_digest) if previous and previous.text_digest else None
+    if previous_text is not None:
+        parsed_data = parse_revision(container.llm_client(), previous, previous_text, resume_text)
+    else:
+        parsed_data = container.llm_client().parse_resume(resume_text)
+    try:
+        parsed_data.text_digest = text_store.put(resume_text)
+    except Exception:
+        # Only re-parsing needs the text; the parse result is still good
+        ERRORS.inc("text_store")
+        log.exception("Storing resume text failed")
+    return parsed_data
+
+def remember_resume(parsed_data: ResumeData, candidate_id: Optional[str] = None) -> str:
+    """Index a parsed resume for matching and store it (replacing ``candidate_id``); returns its id"""
+    candidate_id = candidate_index.add(parsed_data, candidate_id)
+    try:
+        resume_store.put(parsed_data, candidate_id)
+        # A revision replaces the text the candidate's previous version used
+        text_store.link(candidate_id, parsed_data.text_digest)
+    except Exception:
+        # The parse itself succeeded; the user should still get their result
+        ERRORS.inc("resume_store")
+        log.exception("Storing resume %s failed", candidate_id)
+    return candidate_id
 
-# Global chat agents storage
-chat_agents: Dict[str, ChatAgent] = {}
+def load_candidate_index():
+    """Re-index stored resumes so matching covers everything parsed before this start"""
+    start = time.perf_counter()
+    count = 0
+    for resume_id, resume_data in resume_store.iter_all():
+        candidate_index.add(resume_data, resume_id)
+        count += 1
+    log.info("Indexed %d stored resumes", count, extra={"duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+def store_imported_resumes(records):
+    """Import chunk sink: store resumes (keeping any exported ``id``) and index them"""
+    resume_ids = resume_store.put_many([
+        (str(raw["id"]) if raw.get("id") else None, resume_data) for _, raw, resume_data in records
+    ])
+    text_store.link_many(
+        (resume_id, resume_data.text_digest) for resume_id, (_, _, resume_data) in zip(resume_ids, records)
+    )
+    for resume_id, (_, _, resume_data) in zip(resume_ids, records):
+        candidate_index.add(resume_data, resume_id)
+
+async def require_stored_resume(candidate_id: Optional[str]):
+    """404 unless a revision's candidate id names a stored resume"""
+    if candidate_id and await run_in_threadpool(resume_store.get, candidate_id) is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+# Resumes parsed in the background; jobs persist in SQLite across restarts
+parse_jobs = ParseJobQueue(handler=run_parse_job)
+
+# State the services already keep, read only when /metrics is scraped
+metrics_registry.callback(
+    "sessions_active", "Chat sessions held by this worker", "gauge", [],
+    lambda: {(): len(chat_agents)}
+)
+metrics_registry.callback(
+    "session_events_total", "Session cache hits, misses, rehydrations and evictions", "counter", ["event"],
+    lambda: {
+        (event,): value for event, value in chat_agents.stats().items()
+        if event in ("hits", "misses", "rehydrated", "evicted_ttl", "evicted_lru", "evicted_memory", "store_errors")
+    }
+)
+metrics_registry.callback(
+    "job_prefetch_total", "Background job searches by outcome", "counter", ["outcome"],
+    lambda: {
+        (outcome,): value for outcome, value in container.job_prefetcher().stats().items()
+        if outcome not in ("max_concurrent", "inflight")
+    }
+)
+metrics_registry.callback(
+    "parse_jobs", "Parse jobs in the queue database by status", "gauge", ["status"],
+    lambda: {(status,): count for status, count in parse_jobs.store.counts().items()}
+)
+metrics_registry.callback(
+    "websocket_connections", "Open WebSocket chat connections", "gauge", [],
+    lambda: {(): len(chat_channels)}
+)
+metrics_registry.callback(
+    "intent_routes_total", "Chat messages routed, by routing method", "counter", ["method"],
+    lambda: {(method,): count for method, count in container.intent_router().stats()["by_method"].items()}
+)
+
+def parse_job_status(job: Dict[str, Any]) -> ParseJobStatus:
+    return ParseJobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        priority=job["priority"],
+        filename=job["filename"],
+        attempts=job["attempts"],
+        max_attempts=job["max_attempts"],
+        error=job["error"],
+        data=loads_json(job["result"]) if job["result"] else None,
+        candidate_id=job["candidate_id"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        expires_at=job["expires_at"]
+    )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager"""
     # Startup
-    print("=" * 50)
-    print("Starting Resume Job Agent API")
-    print(f"Gemini API: {'Configured' if settings.gemini_api_key else 'Not configured'}")
-    print(f"Tavily API: {'Configured' if settings.tavily_api_key else 'Not configured'}")
-    print("=" * 50)
+    log.info(
+        "Starting Resume Job Agent API (Gemini %s, Tavily %s)",
+        "configured" if settings.gemini_api_key else "not configured",
+        "configured" if settings.tavily_api_key else "not configured"
+    )
+    
+    sweeper = asyncio.create_task(chat_agents.run_sweeper())
+    parse_jobs.start()
+    threading.Thread(target=load_candidate_index, name="candidate-index-load", daemon=True).start()
+    if settings.preload_heavy_modules:
+        preload_heavy_modules()
+    log.info("Ready", extra={"duration_ms": startup.mark("ready")})
     
     yield
     
     # Shutdown
-    print("Shutting down...")
+    log.info("Shutting down")
+    sweeper.cancel()
+    parse_jobs.stop()
     chat_agents.clear()
+    shutdown_logging()
 
 app = FastAPI(
     title="Resume Parser & Job Hunter API",
     description="API for parsing resumes and finding matching jobs using Gemini AI",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(bind_session)]
 )
 
+# Total request time per route
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in per-request profiles; not installed at all unless enabled
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request IDs for log records, plus one access record per request
+app.add_middleware(RequestContextMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -57,9 +266,27 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "parse_resume": "POST /parse-resume",
+            "parse_resume_async": "POST /parse-jobs?priority=",
+            "parse_job_status": "GET /parse-jobs/{job_id}",
+            "parse_job_events": "GET /parse-jobs/{job_id}/events",
+            "parse_job_stats": "GET /parse-jobs/stats",
             "chat": "POST /chat/{session_id}",
+            "chat_ws": "WS /ws/chat/{session_id}?keep_session=",
             "create_agent": "POST /create-agent/{session_id}",
-            "health": "GET /health"
+            "jobs": "GET /jobs/{session_id}?cursor=&limit=",
+            "match_candidates": "POST /match-candidates",
+            "resumes": "GET /resumes?skill=&match=&seniority=&location=&min_years=",
+            "resume": "GET /resumes/{resume_id}",
+            "resumes_bulk": "POST /resumes/bulk",
+            "resume_stats": "GET /resumes/stats",
+            "health": "GET /health",
+            "metrics": "GET /metrics",
+            "session_stats": "GET /sessions/stats",
+            "intent_stats": "GET /intents/stats",
+            "startup": "GET /startup",
+            "profiles": "GET /profiles",
+            "profile_download": "GET /profiles/{request_id}",
+            "profiling_toggle": "POST /admin/profiling"
         }
     }
 
@@ -74,46 +301,49 @@ async def health_check():
         }
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus metrics in text exposition format
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/parse-resume", response_model=ResumeParseResponse)
-async def parse_resume(file: UploadFile = File(...)):
+async def parse_resume(file: UploadFile = File(...), candidate_id: Optional[str] = Query(None)):
     """
     Parse resume file and extract structured information
+
+    With ``candidate_id`` the upload is a revised version of that stored
+    resume: it replaces it, and only changed sections are parsed again.
     """
     try:
         # Validate file type
-        allowed_types = [
-            "application/pdf",
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        ]
-        
-        if file.content_type not in allowed_types:
+        if file.content_type not in ALLOWED_RESUME_TYPES:
             raise HTTPException(
                 status_code=400,
                 detail="File type not supported. Please upload PDF or DOCX."
             )
+        await require_stored_resume(candidate_id)
         
         # Save and process file
         file_path, file_type = FileProcessor.save_uploaded_file(file)
         
         try:
-            # Extract text
-            print(f"[API] Extracting text from {file.filename}...")
-            resume_text = FileProcessor.extract_text_from_file(file_path, file_type)
-            print(f"[API] Extracted {len(resume_text)} characters")
-            
-            # Parse with Gemini
-            print("[API] Parsing with Gemini...")
-            llm_client = LLMClient()
-            parsed_data = llm_client.parse_resume(resume_text)
+            # Extract, parse with Gemini and store, all off the event loop
+            parsed_data, candidate_id = await run_in_threadpool(
+                parse_resume_file, file_path, file_type, candidate_id
+            )
             
             # Clean up temp file
             os.unlink(file_path)
             
-            return ResumeParseResponse(
+            # parse_resume already validated the data; skip re-validating the response
+            return FastJSONResponse(ResumeParseResponse.model_construct(
                 success=True,
                 data=parsed_data,
-                message="Resume parsed successfully"
-            )
+                message="Resume parsed successfully",
+                candidate_id=candidate_id
+            ))
             
         except Exception as e:
             # Clean up temp file on error
@@ -126,31 +356,223 @@ async def parse_resume(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@app.post("/parse-jobs", response_model=ParseJobStatus, status_code=202)
+async def submit_parse_job(
+    file: UploadFile = File(...),
+    priority: int = Query(0, ge=0, le=9),
+    candidate_id: Optional[str] = Query(None)
+):
+    """
+    Queue a resume for parsing and return immediately; higher priority runs first
+
+    With ``candidate_id`` the upload revises that stored resume, as in /parse-resume.
+    """
+    if file.content_type not in ALLOWED_RESUME_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="File type not supported. Please upload PDF or DOCX."
+        )
+    await require_stored_resume(candidate_id)
+    
+    try:
+        data = await file.read()
+        job = await run_in_threadpool(
+            parse_jobs.submit, data, file.filename, file.content_type, priority, candidate_id
+        )
+        return parse_job_status(job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue resume: {str(e)}")
+
+@app.get("/parse-jobs/stats")
+async def parse_job_stats():
+    """
+    Parse queue depth by status and worker count
+    """
+    return parse_jobs.stats()
+
+@app.get("/parse-jobs/{job_id}", response_model=ParseJobStatus)
+async def get_parse_job(job_id: str):
+    """
+    Poll a parse job; finished jobs are kept for the result TTL
+    """
+    job = parse_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Parse job not found or expired.")
+    return parse_job_status(job)
+
+@app.get("/parse-jobs/{job_id}/events")
+async def parse_job_events(job_id: str):
+    """
+    Server-sent events: a "status" event on every change, ending after success or failure
+    """
+    if parse_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Parse job not found or expired.")
+    
+    async def events():
+        changed = parse_jobs.subscribe(job_id)
+        try:
+            last_update = None
+            while True:
+                # Clear before reading, so a change in between is not missed
+                changed.clear()
+                job = parse_jobs.get(job_id)
+                if job is None:
+                    yield 'event: error\ndata: {"detail": "Parse job not found or expired."}\n\n'
+                    return
+                if job["updated_at"] != last_update:
+                    last_update = job["updated_at"]
+                    yield f"event: status\ndata: {parse_job_status(job).model_dump_json()}\n\n"
+                if job["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            parse_jobs.unsubscribe(job_id, changed)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/chat/{session_id}", response_model=ChatResponse)
 async def chat_with_agent(session_id: str, message: ChatMessage):
     """
     Chat with job hunting agent
     """
     try:
-        # Check if session exists
-        if session_id not in chat_agents:
+        # Process message; a turn is never re-run, so a concurrent save elsewhere is a 409
+        try:
+            async with chat_channels.turn(session_id):
+                response_data = await run_in_threadpool(
+                    chat_agents.update, session_id, lambda agent: agent.process_message(message.content)
+                )
+        except KeyError:
             raise HTTPException(
                 status_code=404,
                 detail="Session not found. Please parse a resume first."
             )
+        except SessionConflict:
+            raise HTTPException(status_code=409, detail=SESSION_CONFLICT_DETAIL)
         
-        # Get chat agent for session
-        agent = chat_agents[session_id]
+        # Job listings were validated when built; serialize them as they are
+        return FastJSONResponse(ChatResponse.model_construct(**response_data))
         
-        # Process message
-        response_data = agent.process_message(message.content)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+
+@app.websocket("/ws/chat/{session_id}")
+async def chat_socket(websocket: WebSocket, session_id: str, keep_session: bool = False):
+    """
+    Chat over a persistent connection
+    
+    Client sends {"content": "..."} per turn. Server replies with a "status"
+    event, then "intent", "job" and "delta" events as they become ready, and
+    finally "done" carrying the full message. "prefetch_ready" is pushed when
+    the background job search finishes. A dropped connection never ends
+    the session, so the client can reconnect to it; unless keep_session is
+    set, a normal close (code 1000) deletes the session shortly after,
+    unless the client reconnects first.
+    """
+    await websocket.accept()
+    
+    agent = await run_in_threadpool(chat_agents.get, session_id)
+    if agent is None:
+        await websocket.send_json({"type": "error", "detail": "Session not found. Please parse a resume first."})
+        await websocket.close(code=4404)
+        return
+    
+    connection = ChatConnection(websocket, session_id)
+    previous = chat_channels.register(connection)
+    if previous is not None:
+        await previous.close(code=4409)
+    connection.start()
+    
+    def emit(event_type: str, payload: Dict[str, Any]):
+        if not connection.closed:
+            connection.send_threadsafe(event_type, **payload)
+    
+    closed_by_client = False
+    try:
+        while True:
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                data = None
+            content = str(data.get("content") or "").strip() if isinstance(data, dict) else ""
+            if not content:
+                await connection.send("error", detail="Message content is required.")
+                continue
+            
+            # One turn at a time, shared with HTTP turns; later messages wait in the socket's receive buffer
+            await connection.send("status", status="processing")
+            try:
+                async with chat_channels.turn(session_id):
+                    response_data = await run_in_threadpool(
+                        chat_agents.update, session_id, lambda agent: agent.process_message(content, emit)
+                    )
+            except KeyError:
+                await connection.send("error", detail="Session not found. Please parse a resume first.")
+                break
+            except SessionConflict:
+                await connection.send("error", detail=SESSION_CONFLICT_DETAIL)
+                continue
+            
+            await connection.send(
+                "done",
+                message=response_data["message"],
+                requires_input=response_data["requires_input"],
+                next_cursor=response_data["next_cursor"]
+            )
+            
+    except WebSocketDisconnect as e:
+        closed_by_client = e.code == 1000
+    except asyncio.TimeoutError:
+        log.warning("WebSocket client stopped reading, closing")
+    except Exception:
+        log.exception("WebSocket connection failed")
         
-        return ChatResponse(**response_data)
+    finally:
+        await connection.close()
+        if keep_session or not closed_by_client:
+            chat_channels.unregister(connection)
+        else:
+            chat_channels.unregister(connection, on_abandoned=lambda: release_session(session_id))
+
+@app.get("/jobs/{session_id}", response_model=JobPage)
+async def get_jobs_page(
+    session_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=20)
+):
+    """
+    Page through the session's ranked job results
+    """
+    try:
+        try:
+            async with chat_channels.turn(session_id):
+                page = await run_in_threadpool(
+                    chat_agents.update, session_id, lambda agent: agent.get_job_page(cursor, limit)
+                )
+        except KeyError:
+            raise HTTPException(
+                status_code=404,
+                detail="Session not found. Please parse a resume first."
+            )
+        except SessionConflict:
+            raise HTTPException(status_code=409, detail=SESSION_CONFLICT_DETAIL)
+        return FastJSONResponse(page)
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Job listing error: {str(e)}")
 
 @app.post("/create-agent/{session_id}")
 async def create_chat_agent(session_id: str, resume_data: ResumeData):
@@ -160,7 +582,15 @@ async def create_chat_agent(session_id: str, resume_data: ResumeData):
     try:
         # Create new chat agent
         agent = ChatAgent(resume_data)
-        chat_agents[session_id] = agent
+        await run_in_threadpool(chat_agents.put, session_id, agent)
+        
+        # Most users ask for jobs first; start that search while they read the greeting
+        if settings.job_prefetch_enabled:
+            def prefetch_done():
+                chat_agents.touch(session_id)
+                chat_channels.push(session_id, "prefetch_ready")
+            
+            container.job_prefetcher().start(session_id, agent, on_complete=prefetch_done)
         
         return {
             "success": True,
@@ -171,16 +601,280 @@ async def create_chat_agent(session_id: str, resume_data: ResumeData):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create agent: {str(e)}")
 
+@app.post("/match-candidates", response_model=CandidateMatchResponse)
+async def match_candidates(request: CandidateMatchRequest):
+    """
+    Rank parsed resumes against a job description
+    """
+    try:
+        start = time.perf_counter()
+        top_n = max(1, min(request.top_n, 100))
+        # Scoring holds the index lock for the whole pass; keep it off the event loop
+        candidates, required_skills = await run_in_threadpool(
+            candidate_index.match, request.job_description, top_n, request.min_score
+        )
+        STAGE_SECONDS.observe(time.perf_counter() - start, "candidate_match")
+        
+        return FastJSONResponse(CandidateMatchResponse.model_construct(
+            candidates=candidates,
+            required_skills=required_skills,
+            total_indexed=len(candidate_index),
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2)
+        ))
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Candidate matching failed: {str(e)}")
+
+@app.get("/resumes", response_model=StoredResumeQueryResponse)
+async def query_resumes(
+    skill: Optional[List[str]] = Query(None),
+    match: str = Query("any", pattern="^(any|all)$"),
+    seniority: Optional[str] = None,
+    location: Optional[str] = None,
+    min_years: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Stored resumes filtered by skills (any or all), seniority, location prefix and minimum experience
+    """
+    summaries, total = await run_in_threadpool(
+        resume_store.query, skill, match == "all", seniority, location,
+        int(min_years * 12) if min_years else None, limit, offset
+    )
+    
+    return FastJSONResponse(StoredResumeQueryResponse.model_construct(
+        resumes=[
+            StoredResumeSummary.model_construct(
+                resume_id=summary["id"],
+                name=summary["name"],
+                email=summary["email"],
+                seniority=summary["seniority"],
+                experience_years=round(summary["experience_months"] / 12, 1),
+                location=summary["location"],
+                skills=summary["skills"],
+                created_at=summary["created_at"],
+                updated_at=summary["updated_at"]
+            )
+            for summary in summaries
+        ],
+        total=total
+    ))
+
+@app.get("/resumes/stats")
+async def resume_stats():
+    """
+    Stored resume counts by seniority, skill and location
+    """
+    stats = await run_in_threadpool(resume_store.stats)
+    stats["full_text"] = await run_in_threadpool(text_store.stats)
+    return stats
+
+@app.post("/resumes/bulk")
+async def bulk_store_resumes(resumes: List[ResumeData]):
+    """
+    Store and index already-parsed resumes in one transaction
+    """
+    if len(resumes) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 resumes per request")
+    
+    resume_ids = await run_in_threadpool(resume_store.put_many, resumes)
+    links = [(resume_id, resume_data.text_digest) for resume_id, resume_data in zip(resume_ids, resumes)]
+    await run_in_threadpool(text_store.link_many, links)
+    for resume_id, resume_data in zip(resume_ids, resumes):
+        candidate_index.add(resume_data, resume_id)
+    
+    return {"success": True, "resume_ids": resume_ids}
+
+@app.get("/resumes/export")
+async def export_resumes():
+    """
+    Every stored resume as NDJSON, one ResumeData object (plus its id) per line
+    """
+    return StreamingResponse(encode_ndjson(resume_store.iter_records()), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/resumes/import", response_model=NdjsonImportResult)
+async def import_resumes(request: Request):
+    """
+    Store and index resumes from an NDJSON body, one ResumeData object per line
+
+    Lines with an ``id`` replace that stored resume. Invalid lines are
+    skipped and listed by line number; everything else is imported.
+    """
+    report = await import_ndjson(request.stream(), ResumeData, store_imported_resumes)
+    return FastJSONResponse(report.to_model())
+
+@app.get("/resumes/{resume_id}", response_model=ResumeData)
+async def get_stored_resume(resume_id: str):
+    """
+    One stored resume
+    """
+    resume_data = await run_in_threadpool(resume_store.get, resume_id)
+    if resume_data is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    return FastJSONResponse(resume_data)
+
+@app.get("/resumes/{resume_id}/text")
+async def get_stored_resume_text(resume_id: str):
+    """
+    Full extracted text of a stored resume, decompressed as it streams
+    """
+    resume_data = await run_in_threadpool(resume_store.get, resume_id)
+    if resume_data is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    chunks = await run_in_threadpool(text_store.stream, resume_data.text_digest) if resume_data.text_digest else None
+    if chunks is None:
+        raise HTTPException(status_code=404, detail="Full text was not kept for this resume")
+    
+    return StreamingResponse(chunks, media_type="text/plain")
+
+@app.post("/resumes/{resume_id}/reparse", response_model=ResumeParseResponse)
+async def reparse_stored_resume(resume_id: str):
+    """
+    Parse a stored resume again from its kept text, e.g. after a model upgrade, without the original file
+    """
+    resume_data = await run_in_threadpool(resume_store.get, resume_id)
+    if resume_data is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    resume_text = await run_in_threadpool(text_store.get, resume_data.text_digest) if resume_data.text_digest else None
+    if resume_text is None:
+        raise HTTPException(status_code=404, detail="Full text was not kept for this resume")
+    
+    try:
+        parsed_data = await run_in_threadpool(parse_resume_text, resume_text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+    await run_in_threadpool(resume_store.put, parsed_data, resume_id)
+    await run_in_threadpool(text_store.link, resume_id, parsed_data.text_digest)
+    candidate_index.add(parsed_data, resume_id)
+    
+    return FastJSONResponse(ResumeParseResponse.model_construct(
+        success=True,
+        data=parsed_data,
+        message="Resume re-parsed from stored text",
+        candidate_id=resume_id
+    ))
+
+@app.delete("/resumes/{resume_id}")
+async def delete_stored_resume(resume_id: str):
+    """
+    Delete a stored resume and drop it from candidate matching
+    """
+    if not await run_in_threadpool(resume_store.delete, resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    await run_in_threadpool(text_store.release, resume_id)
+    candidate_index.remove(resume_id)
+    
+    return {"success": True, "message": "Resume deleted"}
+
+@app.get("/job-listings/export")
+async def export_job_listings():
+    """
+    Every stored job listing as NDJSON, one JobListing object per line
+    """
+    return StreamingResponse(encode_ndjson(job_listing_store.iter_records()), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/job-listings/import", response_model=NdjsonImportResult)
+async def import_job_listings(request: Request):
+    """
+    Store job listings from an NDJSON body, one JobListing object per line
+
+    A listing whose canonical URL is already stored replaces it. Invalid
+    lines are skipped and listed by line number.
+    """
+    report = await import_ndjson(
+        request.stream(), JobListing,
+        lambda records: job_listing_store.put_many(listing for _, _, listing in records)
+    )
+    return FastJSONResponse(report.to_model())
+
 @app.delete("/session/{session_id}")
 async def delete_session(session_id: str):
     """
     Delete chat session
     """
-    if session_id in chat_agents:
-        del chat_agents[session_id]
+    await run_in_threadpool(release_session, session_id)
     
     return {"success": True, "message": "Session deleted"}
 
+def release_session(session_id: str):
+    """Cancel background work for a session and drop it; blocks on the session store"""
+    agent = chat_agents.get(session_id)
+    container.job_prefetcher().cancel(session_id, agent)
+    chat_agents.delete(session_id)
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """
+    Session store size, memory estimate and eviction counters
+    """
+    stats = chat_agents.stats()
+    stats["prefetch"] = container.job_prefetcher().stats()
+    stats["websockets"] = chat_channels.stats()
+    return stats
+
+@app.get("/startup")
+async def startup_report():
+    """
+    Startup milestones, background preload times and which heavy modules are loaded
+    """
+    return startup.report()
+
+@app.get("/intents/stats")
+async def intent_stats():
+    """
+    Chat intent routing counts and latency
+    """
+    return container.intent_router().stats()
+
+def require_profiling(x_admin_token: Optional[str] = Header(None)):
+    """Profiling endpoints exist only when enabled and, with PROFILING_TOKEN set, need the token"""
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not profiler.authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/profiling", dependencies=[Depends(require_profiling)])
+async def profiling_status():
+    """
+    Whether requests are armed for profiling, and how many profiles are stored
+    """
+    return profiler.status()
+
+@app.post("/admin/profiling", dependencies=[Depends(require_profiling)])
+async def arm_profiling(toggle: ProfilingToggle):
+    """
+    Profile the next N requests whose path starts with path_prefix
+    """
+    if toggle.mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    if not 0 <= toggle.count <= 100:
+        raise HTTPException(status_code=400, detail="count must be between 0 and 100")
+    
+    profiler.arm(toggle.count, toggle.mode, toggle.path_prefix)
+    return profiler.status()
+
+@app.get("/profiles", dependencies=[Depends(require_profiling)])
+async def list_profiles():
+    """
+    Recent request profiles, newest first
+    """
+    return {"profiles": profiler.store.list()}
+
+@app.get("/profiles/{request_id}", dependencies=[Depends(require_profiling)])
+async def download_profile(request_id: str):
+    """
+    Download one profile: collapsed stacks (flamegraph.pl, speedscope) or .prof (pstats, snakeviz)
+    """
+    path = profiler.store.path(request_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return FileResponse(path, media_type="application/octet-stream", filename=os.path.basename(path))
+
+startup.mark("imported")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -28,6 +28,7 @@ class ResumeData(BaseModel):
     education: List[Education]
     summary: Optional[str] = None
     raw_text: Optional[str] = None
+    text_digest: Optional[str] = None  # full extracted text in the resume text store
 
 # Chat Models
 class ChatMessage(BaseModel):
@@ -49,14 +50,89 @@ class JobListing(BaseModel):
     posted_date: Optional[str] = None
     salary: Optional[str] = None
     match_score: Optional[float] = 0.0
+    job_type: Optional[str] = None
+    seniority: Optional[str] = None
+
+class JobPage(BaseModel):
+    jobs: List[JobListing] = []
+    next_cursor: Optional[str] = None
+    total_cached: int = 0
+
+# Candidate Matching Models
+class CandidateMatchRequest(BaseModel):
+    job_description: str
+    top_n: int = 10
+    min_score: float = 0.0
+
+class CandidateMatch(BaseModel):
+    candidate_id: str
+    name: str
+    email: Optional[str] = None
+    score: float
+    matched_skills: List[str] = []
+    experience_years: float = 0.0
 
 # API Response Models
 class ResumeParseResponse(BaseModel):
     success: bool
     data: ResumeData
     message: Optional[str] = None
+    candidate_id: Optional[str] = None
+
+class ParseJobStatus(BaseModel):
+    job_id: str
+    status: str  # queued, running, succeeded or failed
+    priority: int = 0
+    filename: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = 0
+    error: Optional[str] = None
+    data: Optional[ResumeData] = None
+    candidate_id: Optional[str] = None
+    created_at: float
+    updated_at: float
+    expires_at: Optional[float] = None
 
 class ChatResponse(BaseModel):
     message: str
     job_suggestions: List[JobListing] = []
-    requires_input: bool = False
\ No newline at end of file
+    requires_input: bool = False
+    next_cursor: Optional[str] = None
+
+class CandidateMatchResponse(BaseModel):
+    candidates: List[CandidateMatch] = []
+    required_skills: List[str] = []
+    total_indexed: int = 0
+    elapsed_ms: float = 0.0
+
+
+class ProfilingToggle(BaseModel):
+    count: int = 1  # next N matching requests are profiled; 0 disarms
+    mode: str = "sample"  # sample or cprofile
+    path_prefix: str = ""
+
+class StoredResumeSummary(BaseModel):
+    resume_id: str
+    name: str
+    email: Optional[str] = None
+    seniority: str
+    experience_years: float
+    location: Optional[str] = None
+    skills: List[str] = []
+    created_at: float
+    updated_at: float
+
+class StoredResumeQueryResponse(BaseModel):
+    resumes: List[StoredResumeSummary] = []
+    total: int = 0
+
+# Bulk NDJSON import
+class NdjsonImportError(BaseModel):
+    line: int
+    error: str
+
+class NdjsonImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[NdjsonImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,231 @@
+import re
+import threading
+import uuid
+from array import array
+from typing import List, Dict, Optional, Set, Tuple
+
+from app.models.schemas import ResumeData, CandidateMatch
+from app.services.resume_profile import ResumeProfile, SkillMatcher
+
+# Weight of skill coverage vs. experience fit in the final score
+SKILL_WEIGHT = 0.8
+EXPERIENCE_WEIGHT = 0.2
+
+# Postings are rewritten without removed rows once they are this share of all rows
+COMPACT_TOMBSTONE_SHARE = 0.25
+# ...and at least this many, so small indexes are not compacted on every removal
+COMPACT_MIN_TOMBSTONES = 64
+
+# New skills are compiled into the matcher in segments of at least this many
+MATCHER_SEGMENT_SIZE = 64
+
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years|yrs)", re.IGNORECASE)
+
+
+class _SegmentedMatcher:
+    """Skill matcher built from segments, so new skills do not recompile the whole vocabulary
+
+    Skills are appended to a small tail that is cheap to rebuild; a full
+    tail is sealed as a segment, and segments of equal size are merged, so
+    there are only logarithmically many. Overlapping matches across
+    segments are resolved leftmost-longest, like one combined regex.
+    """
+
+    def __init__(self):
+        self._segments: List[SkillMatcher] = []
+        self._tail: List[str] = []
+        self._tail_matcher: Optional[SkillMatcher] = None
+
+    def add(self, skill: str):
+        self._tail.append(skill)
+        self._tail_matcher = None
+        if len(self._tail) >= MATCHER_SEGMENT_SIZE:
+            segment = SkillMatcher(self._tail)
+            self._tail = []
+            while self._segments and len(self._segments[-1].canonical_skills) <= len(segment.canonical_skills):
+                segment = SkillMatcher(self._segments.pop().canonical_skills + segment.canonical_skills)
+            self._segments.append(segment)
+
+    def matched_skills(self, text: str) -> Set[str]:
+        if not text:
+            return set()
+        if self._tail and self._tail_matcher is None:
+            self._tail_matcher = SkillMatcher(list(self._tail))
+        matchers = self._segments + ([self._tail_matcher] if self._tail else [])
+        if len(matchers) == 1:
+            return matchers[0].matched_skills(text)
+
+        lowered = text.lower()
+        spans = sorted(
+            (span for matcher in matchers for span in matcher.find_spans(lowered)),
+            key=lambda span: (span[0], span[0] - span[1])
+        )
+        matched, end = set(), 0
+        for span_start, span_end, skill in spans:
+            if span_start >= end:
+                matched.add(skill)
+                end = span_end
+        return matched
+
+
+class CandidateIndex:
+    """In-memory inverted index of parsed resumes for job-description -> candidates matching
+
+    Skills are canonicalized the same way as ResumeProfile and kept as
+    postings lists (skill id -> row ids). A query first collects rows that
+    share at least one skill with the job description, then scores them in
+    one vectorized pass. Removed rows are tombstoned and compacted away in
+    bulk once they are a sizeable share of the index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._skill_ids: Dict[str, int] = {}
+        self._skill_names: List[str] = []
+        self._postings: List[array] = []
+        self._row_ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._row_skills: List[array] = []
+        self._names: List[str] = []
+        self._emails: List[Optional[str]] = []
+        self._experience_months = array("f")
+        self._active = bytearray()
+        self._active_count = 0
+        self._matcher = _SegmentedMatcher()
+
+    def __len__(self) -> int:
+        return self._active_count
+
+    def add(self, resume_data: ResumeData, candidate_id: Optional[str] = None) -> str:
+        """Index one parsed resume; re-adding an id replaces the old entry"""
+        candidate_id = candidate_id or uuid.uuid4().hex
+        profile = ResumeProfile.from_resume(resume_data)
+
+        with self._lock:
+            if candidate_id in self._row_by_id:
+                self.remove(candidate_id)
+
+            row = len(self._row_ids)
+            skill_ids = array("i")
+            for skill in profile.canonical_skills:
+                skill_id = self._skill_ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self._skill_names)
+                    self._skill_ids[skill] = skill_id
+                    self._skill_names.append(skill)
+                    self._postings.append(array("i"))
+                    self._matcher.add(skill)
+                self._postings[skill_id].append(row)
+                skill_ids.append(skill_id)
+
+            self._row_ids.append(candidate_id)
+            self._row_by_id[candidate_id] = row
+            self._row_skills.append(skill_ids)
+            self._names.append(resume_data.name)
+            self._emails.append(resume_data.email)
+            self._experience_months.append(float(profile.experience_months))
+            self._active.append(1)
+            self._active_count += 1
+
+        return candidate_id
+
+    def remove(self, candidate_id: str) -> bool:
+        """Tombstone a candidate; its postings are skipped at query time until the next compaction"""
+        with self._lock:
+            row = self._row_by_id.pop(candidate_id, None)
+            if row is None:
+                return False
+            self._active[row] = 0
+            self._active_count -= 1
+
+            tombstones = len(self._row_ids) - self._active_count
+            if tombstones >= COMPACT_MIN_TOMBSTONES and tombstones > COMPACT_TOMBSTONE_SHARE * len(self._row_ids):
+                self._compact()
+            return True
+
+    def match(self, job_description: str, top_n: int = 10,
+              min_score: float = 0.0) -> Tuple[List[CandidateMatch], List[str]]:
+        """Top candidates for a job description and the skills extracted from it"""
+        import numpy as np
+
+        with self._lock:
+            required = sorted(self._matcher.matched_skills(job_description))
+            if not required:
+                return [], []
+
+            required_ids = [self._skill_ids[skill] for skill in required]
+            postings = [
+                np.frombuffer(self._postings[skill_id], dtype=np.int32)
+                for skill_id in required_ids
+                if len(self._postings[skill_id])
+            ]
+            if not postings:
+                return [], required
+
+            row_count = len(self._row_ids)
+            hits = np.bincount(np.concatenate(postings), minlength=row_count)
+            active = np.frombuffer(bytes(self._active), dtype=np.uint8).astype(bool)
+            rows = np.nonzero((hits > 0) & active)[0]
+            if rows.size == 0:
+                return [], required
+
+            coverage = hits[rows] / len(required_ids)
+
+            min_years = self._required_years(job_description)
+            months = np.frombuffer(self._experience_months, dtype=np.float32)[rows]
+            if min_years:
+                experience_fit = np.clip(months / (min_years * 12.0), 0.0, 1.0)
+            else:
+                experience_fit = np.ones(rows.size)
+
+            scores = SKILL_WEIGHT * coverage + EXPERIENCE_WEIGHT * experience_fit
+
+            keep = scores >= min_score
+            rows, scores, months = rows[keep], scores[keep], months[keep]
+            if rows.size > top_n:
+                top = np.argpartition(-scores, top_n - 1)[:top_n]
+                rows, scores, months = rows[top], scores[top], months[top]
+            order = np.argsort(-scores, kind="stable")
+
+            required_set = set(required_ids)
+            matches = []
+            for i in order:
+                row = int(rows[i])
+                matches.append(CandidateMatch.model_construct(
+                    candidate_id=self._row_ids[row],
+                    name=self._names[row],
+                    email=self._emails[row],
+                    score=round(float(scores[i]), 3),
+                    matched_skills=[
+                        self._skill_names[skill_id]
+                        for skill_id in self._row_skills[row]
+                        if skill_id in required_set
+                    ],
+                    experience_years=round(float(months[i]) / 12, 1)
+                ))
+            return matches, required
+
+    def _compact(self):
+        """Drop tombstoned rows and renumber the rest, rewriting every postings list"""
+        keep = [row for row in range(len(self._row_ids)) if self._active[row]]
+        new_rows = array("i", [-1]) * len(self._row_ids)
+        for new_row, row in enumerate(keep):
+            new_rows[row] = new_row
+
+        self._postings = [
+            array("i", [new_rows[row] for row in posting if new_rows[row] >= 0])
+            for posting in self._postings
+        ]
+        self._row_ids = [self._row_ids[row] for row in keep]
+        self._row_by_id = {candidate_id: row for row, candidate_id in enumerate(self._row_ids)}
+        self._row_skills = [self._row_skills[row] for row in keep]
+        self._names = [self._names[row] for row in keep]
+        self._emails = [self._emails[row] for row in keep]
+        self._experience_months = array("f", [self._experience_months[row] for row in keep])
+        self._active = bytearray(b"\x01" * len(keep))
+
+    @staticmethod
+    def _required_years(job_description: str) -> int:
+        match = _YEARS_RE.search(job_description)
+        return int(match.group(1)) if match else 0
+
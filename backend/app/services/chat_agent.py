@@ -1,78 +1,246 @@
-from typing import List, Dict, Any
-from app.models.schemas import ChatMessage, JobListing, ResumeData
+import logging
+from typing import List, Dict, Any, Optional, Callable
+from app.models.schemas import ChatMessage, JobListing, JobPage, ResumeData
 from app.services.job_search import JobSearchService
+from app.services.job_results import RankedResultSet
+from app.services.compact_resume import CompactResume
+from app.services.resume_profile import ResumeProfile
 from app.utils.llm_client import LLMClient
+from app.services.conversation_memory import ConversationMemory, gemini_summarizer
+from app.dependencies import ServiceContainer, container
+from app.utils.metrics import GEMINI_SECONDS, CACHE_EVENTS, FALLBACKS, ERRORS, model_name
 import json
 
+log = logging.getLogger(__name__)
+
+# Listings shown per chat turn; "show me more" pages through the same result set
+JOB_PAGE_SIZE = 5
+
+# Refinements keep the cached results if at least this many still match
+MIN_REFINED_RESULTS = 3
+
+MORE_JOBS_PHRASES = ["show more", "show me more", "more jobs", "more results", "see more", "next page", "more listings"]
+
+# Receives (event_type, payload) while a turn is processed, e.g. to stream over a socket
+EventSink = Callable[[str, Dict[str, Any]], None]
+
 class ChatAgent:
-    def __init__(self, resume_data: ResumeData):
-        self.resume_data = resume_data
-        self.job_search_service = JobSearchService()
-        self.llm_client = LLMClient()
-        self.conversation_history: List[ChatMessage] = []
+    def __init__(self, resume_data: ResumeData, services: Optional[ServiceContainer] = None):
+        # Resident for the life of the session; see resume_data for the pydantic form
+        self.resume = CompactResume.from_resume_data(resume_data)
+        self.profile = ResumeProfile.from_resume(self.resume)
+        self.services = services or container
+        self.memory = ConversationMemory(
+            summarizer=gemini_summarizer(lambda: self.services.generative_model('models/gemini-2.0-flash'))
+        )
+        self.result_set = None
+        self.prefetched: Optional[RankedResultSet] = None
+        self.next_cursor: Optional[str] = None
+        self.jobs_shown = 0
+    
+    @property
+    def resume_data(self) -> ResumeData:
+        """The resume as a pydantic model, built on each access for API boundaries"""
+        return self.resume.to_resume_data()
+    
+    @property
+    def job_search_service(self) -> JobSearchService:
+        return self.services.job_search_service()
+    
+    @property
+    def llm_client(self) -> LLMClient:
+        return self.services.llm_client()
+    
+    @property
+    def conversation_history(self) -> List[ChatMessage]:
+        """Recent turns; older ones live on only in the memory's summary"""
+        return self.memory.messages()
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Everything needed to rebuild this agent in another worker"""
+        return {
+            "resume_data": self.resume.to_dict(),
+            "memory": self.memory.to_snapshot(),
+            "result_set": self.result_set.to_snapshot() if self.result_set else None,
+            "prefetched": self.prefetched.to_snapshot() if self.prefetched and self.prefetched.listings else None,
+            "next_cursor": self.next_cursor,
+            "jobs_shown": self.jobs_shown,
+        }
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], services: Optional[ServiceContainer] = None) -> "ChatAgent":
+        """Rehydrate an agent saved with to_snapshot"""
+        agent = cls(ResumeData(**snapshot["resume_data"]), services)
+        agent.memory.restore(snapshot.get("memory", {}))
+        if snapshot.get("result_set"):
+            agent.result_set = RankedResultSet.from_snapshot(
+                agent.job_search_service, agent.resume, snapshot["result_set"], agent.profile
+            )
+        if snapshot.get("prefetched"):
+            agent.prefetched = RankedResultSet.from_snapshot(
+                agent.job_search_service, agent.resume, snapshot["prefetched"], agent.profile
+            )
+        agent.next_cursor = snapshot.get("next_cursor")
+        agent.jobs_shown = snapshot.get("jobs_shown", 0)
+        return agent
     
-    def process_message(self, user_message: str) -> Dict[str, Any]:
-        """Process user message and return response"""
+    def process_message(self, user_message: str, emit: Optional[EventSink] = None) -> Dict[str, Any]:
+        """Process user message and return response
+        
+        With ``emit``, each job and each chunk of generated text is also
+        reported as soon as it is ready; the returned message stays the full reply.
+        """
         
         # Add user message to history
-        self.conversation_history.append(ChatMessage(role="user", content=user_message))
+        self.memory.add("user", user_message)
         
         # Determine intent
         intent = self._determine_intent(user_message)
+        if emit:
+            emit("intent", {"intent": intent})
         
         response_data = {
             "message": "",
             "job_suggestions": [],
-            "requires_input": False
+            "requires_input": False,
+            "next_cursor": None
         }
         
-        if intent == "greeting":
+        if intent == "more_jobs":
+            try:
+                if self.next_cursor:
+                    page = self.get_job_page(self.next_cursor, JOB_PAGE_SIZE)
+                else:
+                    page = JobPage()
+                self._apply_page(page, response_data, continued=True, emit=emit)
+            except Exception as e:
+                response_data["message"] = f"I encountered an error while loading more jobs: {str(e)}"
+            
+        elif intent == "refine_jobs":
+            try:
+                page = self._refine_results(user_message)
+                self._apply_page(page, response_data, emit=emit)
+            except Exception as e:
+                response_data["message"] = f"I encountered an error while refining the results: {str(e)}"
+            
+        elif intent == "greeting":
             response_data["message"] = self._generate_greeting()
             response_data["requires_input"] = True
             
         elif intent == "search_jobs":
             # Extract search parameters
             search_params = self._extract_search_params(user_message)
+            sort_by = search_params.pop("sort_by", None)
             
-            # Search for jobs
+            # Search for jobs; later pages are served from the same ranked set
             try:
-                job_listings = self.job_search_service.search_jobs(self.resume_data, search_params)
-                response_data["job_suggestions"] = job_listings
-                response_data["message"] = self._format_job_response(job_listings)
+                prefetched = self._take_prefetched() if not search_params else None
+                if prefetched:
+                    self.result_set = prefetched
+                else:
+                    self.result_set = self.job_search_service.create_result_set(
+                        self.resume, search_params, self.profile
+                    )
+                if sort_by:
+                    self.result_set = self.result_set.refine({}, sort_by)
+                self.jobs_shown = 0
+                page = self.result_set.page(limit=JOB_PAGE_SIZE)
+                self._apply_page(page, response_data, emit=emit)
             except Exception as e:
                 response_data["message"] = f"I encountered an error while searching: {str(e)}"
             
         elif intent == "resume_feedback":
-            response_data["message"] = self._generate_resume_feedback()
+            response_data["message"] = self._generate_resume_feedback(emit)
             
         elif intent == "career_advice":
-            response_data["message"] = self._generate_career_advice(user_message)
+            response_data["message"] = self._generate_career_advice(user_message, emit)
             
         else:
             response_data["message"] = "I can help you find jobs, give resume feedback, or provide career advice. What would you like to do?"
             response_data["requires_input"] = True
         
         # Add assistant response to history
-        self.conversation_history.append(
-            ChatMessage(role="assistant", content=response_data["message"])
-        )
+        self.memory.add("assistant", response_data["message"])
         
         return response_data
     
+    def prepare_prefetch(self) -> RankedResultSet:
+        """Result set for the default search, to be filled in the background"""
+        self.prefetched = self.job_search_service.create_result_set(self.resume, profile=self.profile)
+        return self.prefetched
+    
+    def _take_prefetched(self) -> Optional[RankedResultSet]:
+        """Hand over the speculative default search once; joins it if still running"""
+        prefetched, self.prefetched = self.prefetched, None
+        if prefetched is None or prefetched.cancelled:
+            CACHE_EVENTS.inc("prefetch", "miss")
+            return None
+        CACHE_EVENTS.inc("prefetch", "hit")
+        self.services.job_prefetcher().record_use()
+        return prefetched
+    
+    def get_job_page(self, cursor: Optional[str] = None, limit: int = JOB_PAGE_SIZE) -> JobPage:
+        """Page through the current search without re-running it"""
+        if not self.result_set:
+            self.result_set = self.job_search_service.create_result_set(self.resume, profile=self.profile)
+        return self.result_set.page(cursor, limit)
+    
+    def _refine_results(self, user_message: str) -> JobPage:
+        """Filter the cached results in memory; search again only if too few remain"""
+        filters = self._extract_search_params(user_message)
+        sort_by = filters.pop("sort_by", None)
+        
+        refined = self.result_set.refine(filters, sort_by)
+        searched_again = False
+        if len(refined.listings) < MIN_REFINED_RESULTS and filters:
+            log.debug("Only %d cached matches after refining, searching again", len(refined.listings))
+            root = self.job_search_service.create_result_set(
+                self.resume, refined.query_params, self.profile
+            )
+            # The search only hints at filters such as posting date; they still have to be applied
+            refined = root.refine(filters, sort_by)
+            searched_again = True
+        
+        # Serve the first refined page from cache; "show me more" may fetch further.
+        # After a new search, the first page fetches until it is full of matching listings.
+        self.result_set = refined
+        self.jobs_shown = 0
+        return refined.page(limit=JOB_PAGE_SIZE, allow_fetch=searched_again)
+    
+    def _apply_page(self, page: JobPage, response_data: Dict[str, Any], continued: bool = False,
+                    emit: Optional[EventSink] = None):
+        """Fill a chat response from a page of the current result set"""
+        if emit:
+            for job in page.jobs:
+                emit("job", {"job": job.model_dump(mode="json")})
+        
+        start = self.jobs_shown + 1 if continued else 1
+        self.jobs_shown = start - 1 + len(page.jobs)
+        self.next_cursor = page.next_cursor
+        
+        response_data["job_suggestions"] = page.jobs
+        response_data["next_cursor"] = page.next_cursor
+        if continued and not page.jobs:
+            response_data["message"] = "That's all the matching jobs I found. Try a new search with different criteria."
+        else:
+            response_data["message"] = self._format_job_response(
+                page.jobs, start=start, has_more=page.next_cursor is not None
+            )
+    
     def _determine_intent(self, message: str) -> str:
         """Determine user intent"""
         message_lower = message.lower()
         
-        if any(word in message_lower for word in ["hello", "hi", "hey", "greetings"]):
-            return "greeting"
-        elif any(word in message_lower for word in ["job", "search", "find", "opportunity", "opening", "position"]):
-            return "search_jobs"
-        elif any(word in message_lower for word in ["resume", "cv", "feedback", "improve"]):
-            return "resume_feedback"
-        elif any(word in message_lower for word in ["advice", "career", "help", "suggest", "recommend"]):
-            return "career_advice"
-        else:
-            return "general"
+        if self.result_set and any(phrase in message_lower for phrase in MORE_JOBS_PHRASES):
+            return "more_jobs"
+        
+        intent, _, method = self.services.intent_router().route(message)
+        
+        # Filters only refine a search; "senior interview prep" is still interview prep
+        searching = intent == "search_jobs" or (intent == "general" and method == "default")
+        if self.result_set and searching and self._extract_search_params(message):
+            return "refine_jobs"
+        return intent
     
     def _extract_search_params(self, message: str) -> Dict[str, Any]:
         """Extract job search parameters from user message"""
@@ -82,7 +250,7 @@ class ChatAgent:
         message_lower = message.lower()
         
         # Check for location
-        location_keywords = ["in ", "at ", "near ", "location ", "city ", "remote", "hybrid"]
+        location_keywords = ["remote", "hybrid", "in ", "at ", "near ", "location ", "city "]
         for keyword in location_keywords:
             if keyword in message_lower:
                 if keyword in ["remote", "hybrid"]:
@@ -96,13 +264,39 @@ class ChatAgent:
             params["job_type"] = "part time"
         elif "internship" in message_lower:
             params["job_type"] = "internship"
+        elif "contract" in message_lower or "freelance" in message_lower:
+            params["job_type"] = "contract"
+        
+        # Check for seniority
+        if "senior" in message_lower:
+            params["seniority"] = "senior"
+        elif "junior" in message_lower:
+            params["seniority"] = "junior"
+        elif "entry level" in message_lower or "entry-level" in message_lower:
+            params["seniority"] = "entry level"
+        elif "mid level" in message_lower or "mid-level" in message_lower:
+            params["seniority"] = "mid level"
+        
+        # Check for recency
+        if "today" in message_lower or "24 hours" in message_lower:
+            params["posted_within_days"] = 1
+        elif "this week" in message_lower or "last week" in message_lower:
+            params["posted_within_days"] = 7
+        elif "this month" in message_lower or "last month" in message_lower:
+            params["posted_within_days"] = 30
+        
+        # Check for ordering
+        if any(word in message_lower for word in ["newest", "latest", "most recent", "by date"]):
+            params["sort_by"] = "date"
+        elif "best match" in message_lower or "by match" in message_lower:
+            params["sort_by"] = "match"
         
         return params
     
     def _generate_greeting(self) -> str:
         """Generate personalized greeting"""
-        name = self.resume_data.name.split()[0] if self.resume_data.name else "there"
-        top_skills = ', '.join(self.resume_data.skills[:3])
+        name = self.resume.name.split()[0] if self.resume.name else "there"
+        top_skills = ', '.join(self.resume.top_skills(3))
         
         return f"""👋 Hello {name}!
 
@@ -115,14 +309,17 @@ Here's what I can help you with:
 
 What would you like to do?"""
     
-    def _format_job_response(self, job_listings: List[JobListing]) -> str:
+    def _format_job_response(self, job_listings: List[JobListing], start: int = 1, has_more: bool = False) -> str:
         """Format job listings into readable response"""
         if not job_listings:
             return "I couldn't find any jobs matching your criteria. Try adjusting your search terms or location."
         
-        response = f"✅ **I found {len(job_listings)} job opportunities for you:**\n\n"
+        if start > 1:
+            response = f"✅ **Here are {len(job_listings)} more job opportunities:**\n\n"
+        else:
+            response = f"✅ **I found {len(job_listings)} job opportunities for you:**\n\n"
         
-        for i, job in enumerate(job_listings[:3], 1):
+        for i, job in enumerate(job_listings, start):
             response += f"**{i}. {job.title}**\n"
             response += f"   🏢 **Company:** {job.company}\n"
             response += f"   📍 **Location:** {job.location}\n"
@@ -131,101 +328,111 @@ What would you like to do?"""
             response += f"   📝 **Description:** {job.description}\n"
             response += f"   🔗 [Apply Here]({job.url})\n\n"
         
-        response += "Would you like me to search for more specific roles or adjust the search criteria?"
+        if has_more:
+            response += "Say **\"show me more\"** to see more matches, or ask me to adjust the search criteria."
+        else:
+            response += "Would you like me to search for more specific roles or adjust the search criteria?"
         
         return response
     
-    def _generate_resume_feedback(self) -> str:
+    def _conversation_context(self) -> str:
+        """Bounded conversation context for the feedback and advice prompts"""
+        context = self.memory.context(max_chars=1500)
+        return f"Conversation so far:\n{context}" if context else ""
+    
+    def _complete(self, model, prompt: str, call: str, emit: Optional[EventSink] = None) -> str:
+        """Run a prompt; with emit, stream the text as Gemini produces it"""
+        try:
+            with GEMINI_SECONDS.time(model_name(model), call):
+                if not emit:
+                    return model.generate_content(prompt).text
+                
+                parts = []
+                for chunk in model.generate_content(prompt, stream=True):
+                    parts.append(chunk.text)
+                    emit("delta", {"content": chunk.text})
+                return "".join(parts)
+        except Exception:
+            ERRORS.inc("gemini")
+            raise
+    
+    def _generate_resume_feedback(self, emit: Optional[EventSink] = None) -> str:
         """Generate resume feedback"""
         feedback_prompt = f"""Based on this resume data, provide 3 specific, actionable suggestions for improvement:
 
 Resume Summary:
-- Name: {self.resume_data.name}
-- Skills: {len(self.resume_data.skills)} skills including {', '.join(self.resume_data.skills[:5])}
-- Experience: {len(self.resume_data.experience)} positions
-- Education: {len(self.resume_data.education)} degrees
+- Name: {self.resume.name}
+- Skills: {self.resume.skill_count} skills including {', '.join(self.resume.top_skills(5))}
+- Experience: {len(self.resume.experience)} positions
+- Education: {len(self.resume.education)} degrees
 
 Focus on:
 1. Skill presentation
 2. Experience descriptions
 3. Overall resume strength
 
+{self._conversation_context()}
+
 Provide concise, helpful feedback."""
         
         try:
-            # Use Gemini for feedback - UPDATED MODEL NAME
-            import google.generativeai as genai
-            from app.config import settings
-            
-            genai.configure(api_key=settings.gemini_api_key)
-            # CHANGED FROM 'gemini-pro' TO 'models/gemini-2.0-flash'
-            model = genai.GenerativeModel('models/gemini-2.0-flash')
+            # Use Gemini for feedback
+            model = self.services.generative_model('models/gemini-2.0-flash')
             
-            response = model.generate_content(feedback_prompt)
-            return response.text
+            return self._complete(model, feedback_prompt, "resume_feedback", emit)
             
         except Exception as e:
-            print(f"[ChatAgent] Error generating feedback: {e}")
+            log.warning("Error generating feedback: %s", e)
             
             # Try alternative model
             try:
-                import google.generativeai as genai
-                from app.config import settings
+                FALLBACKS.inc("gemini_model")
+                model = self.services.generative_model('models/gemini-2.5-flash')
                 
-                genai.configure(api_key=settings.gemini_api_key)
-                model = genai.GenerativeModel('models/gemini-2.5-flash')
-                
-                response = model.generate_content(feedback_prompt)
-                return response.text
+                return self._complete(model, feedback_prompt, "resume_feedback")
             except Exception as e2:
-                print(f"[ChatAgent] Alternative model also failed: {e2}")
+                log.error("Alternative model also failed: %s", e2)
             
             # Fallback feedback
+            FALLBACKS.inc("canned_reply")
             return f"""Based on your resume, here are some suggestions:
 
 1. **Quantify achievements**: Add numbers to your experience descriptions (e.g., "Improved performance by 20%")
-2. **Expand skills**: Consider adding {', '.join(['AWS', 'Docker', 'TypeScript'][:3-len(self.resume_data.skills)])}
+2. **Expand skills**: Consider adding {', '.join(['AWS', 'Docker', 'TypeScript'][:3-self.resume.skill_count])}
 3. **Update summary**: Make your summary more specific to the roles you're targeting
 
 Your resume looks good overall! Focus on tailoring it for specific job applications."""
     
-    def _generate_career_advice(self, user_message: str) -> str:
+    def _generate_career_advice(self, user_message: str, emit: Optional[EventSink] = None) -> str:
         """Generate career advice"""
         advice_prompt = f"""Provide career advice based on this resume and query:
 
 Resume:
-- Skills: {', '.join(self.resume_data.skills[:5])}
-- Experience Level: {len(self.resume_data.experience)} positions
+- Skills: {', '.join(self.resume.top_skills(5))}
+- Experience Level: {len(self.resume.experience)} positions
+
+{self._conversation_context()}
 
 User Question: {user_message}
 
 Give specific, actionable advice."""
         
         try:
-            import google.generativeai as genai
-            from app.config import settings
-            
-            genai.configure(api_key=settings.gemini_api_key)
-            # CHANGED FROM 'gemini-pro' TO 'models/gemini-2.0-flash'
-            model = genai.GenerativeModel('models/gemini-2.0-flash')
+            model = self.services.generative_model('models/gemini-2.0-flash')
             
-            response = model.generate_content(advice_prompt)
-            return response.text
+            return self._complete(model, advice_prompt, "career_advice", emit)
             
         except Exception as e:
-            print(f"[ChatAgent] Error generating advice: {e}")
+            log.warning("Error generating advice: %s", e)
             
             # Try alternative model
             try:
-                import google.generativeai as genai
-                from app.config import settings
+                FALLBACKS.inc("gemini_model")
+                model = self.services.generative_model('models/gemini-2.5-flash')
                 
-                genai.configure(api_key=settings.gemini_api_key)
-                model = genai.GenerativeModel('models/gemini-2.5-flash')
-                
-                response = model.generate_content(advice_prompt)
-                return response.text
+                return self._complete(model, advice_prompt, "career_advice")
             except Exception as e2:
-                print(f"[ChatAgent] Alternative model also failed: {e2}")
-                
+                log.error("Alternative model also failed: %s", e2)
+            
+            FALLBACKS.inc("canned_reply")
             return "Based on your skills and experience, I recommend focusing on roles that leverage your strengths in Python and web development. Consider looking for positions at tech companies that value full-stack expertise."
\ No newline at end of file
@@ -0,0 +1,183 @@
+import logging
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Callable
+
+from fastapi import WebSocket
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+
+class ChatConnection:
+    """One client socket with a bounded outbound queue drained by a single sender task
+
+    Producers on the event loop ``send`` and wait while the queue is full, so a
+    slow client throttles the turn that feeds it instead of growing a buffer.
+    Worker threads use ``send_threadsafe`` (blocking, same backpressure) or
+    ``push`` for best-effort notifications that are dropped when the client
+    is behind.
+    """
+
+    def __init__(self, websocket: WebSocket, session_id: str,
+                 max_pending: int = None, send_timeout: float = None):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.send_timeout = send_timeout or settings.ws_send_timeout_seconds
+        self.loop = asyncio.get_running_loop()
+        self.outbound: asyncio.Queue = asyncio.Queue(maxsize=max_pending or settings.ws_max_pending_events)
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._sender = asyncio.create_task(self._drain())
+
+    async def send(self, event_type: str, **payload):
+        """Queue an event; raises TimeoutError if the client stops reading"""
+        if self.closed:
+            raise ConnectionError("Connection closed")
+        await asyncio.wait_for(self.outbound.put({"type": event_type, **payload}), self.send_timeout)
+
+    def send_threadsafe(self, event_type: str, **payload):
+        """Queue an event from a worker thread, blocking it while the queue is full"""
+        future = asyncio.run_coroutine_threadsafe(self.send(event_type, **payload), self.loop)
+        future.result()
+
+    def push(self, event_type: str, **payload):
+        """Fire-and-forget notification from any thread"""
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self._offer, {"type": event_type, **payload})
+
+    async def close(self, code: int = 1000):
+        if self.closed:
+            return
+        self.closed = True
+        if self._sender is not None:
+            self._sender.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # Already closed by the client
+
+    def _offer(self, event: Dict[str, Any]):
+        if self.closed:
+            return
+        try:
+            self.outbound.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _drain(self):
+        try:
+            while True:
+                event = await self.outbound.get()
+                await self.websocket.send_json(event)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The socket is gone; stop accepting events so producers fail fast
+            log.warning("Send to %s failed: %s", self.session_id, e)
+            self.closed = True
+
+
+class ChatChannelRegistry:
+    """Open chat connections by session, for pushing events from background work
+
+    A session has at most one connection; a new one replaces the old. When a
+    connection goes away, ``on_abandoned`` runs after a short grace period
+    unless the client reconnected in the meantime, so a page reload does not
+    throw the session away.
+    """
+
+    def __init__(self, grace_seconds: float = None):
+        self.grace_seconds = settings.ws_disconnect_grace_seconds if grace_seconds is None else grace_seconds
+        self._lock = threading.Lock()
+        self._connections: Dict[str, ChatConnection] = {}
+        # Session id -> [lock, holders and waiters]; only touched on the event loop
+        self._turn_locks: Dict[str, List[Any]] = {}
+        self._counters = {
+            "opened": 0,
+            "replaced": 0,
+            "closed": 0,
+            "pushed": 0,
+            "abandoned": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def register(self, connection: ChatConnection) -> Optional[ChatConnection]:
+        """Track a connection; returns the one it replaced, if any"""
+        with self._lock:
+            previous = self._connections.get(connection.session_id)
+            self._connections[connection.session_id] = connection
+            self._counters["opened"] += 1
+            if previous is not None:
+                self._counters["replaced"] += 1
+        return previous
+
+    @asynccontextmanager
+    async def turn(self, session_id: str):
+        """Hold the session's turn lock, so WebSocket and HTTP turns of one session never overlap"""
+        entry = self._turn_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._turn_locks[session_id]
+
+    def unregister(self, connection: ChatConnection, on_abandoned: Optional[Callable[[], None]] = None):
+        """Forget a connection and schedule cleanup if the session stays unclaimed"""
+        with self._lock:
+            if self._connections.get(connection.session_id) is connection:
+                del self._connections[connection.session_id]
+            self._counters["closed"] += 1
+
+        if on_abandoned is not None:
+            connection.loop.call_later(
+                self.grace_seconds, self._abandon_if_unclaimed, connection.session_id, on_abandoned
+            )
+
+    def push(self, session_id: str, event_type: str, **payload) -> bool:
+        """Notify the session's client if it is connected"""
+        with self._lock:
+            connection = self._connections.get(session_id)
+            if connection is not None:
+                self._counters["pushed"] += 1
+        if connection is None:
+            return False
+        connection.push(event_type, **payload)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            connections = list(self._connections.values())
+            return {
+                "connections": len(connections),
+                "pending_events": sum(c.outbound.qsize() for c in connections),
+                "dropped_events": sum(c.dropped for c in connections),
+                **self._counters,
+            }
+
+    def _abandon_if_unclaimed(self, session_id: str, on_abandoned: Callable[[], None]):
+        with self._lock:
+            if session_id in self._connections:
+                return
+            self._counters["abandoned"] += 1
+        # Cleanup may hit the session store; run it off the event loop
+        asyncio.get_running_loop().run_in_executor(None, self._clean_up, session_id, on_abandoned)
+
+    @staticmethod
+    def _clean_up(session_id: str, on_abandoned: Callable[[], None]):
+        try:
+            on_abandoned()
+        except Exception:
+            log.exception("Cleanup for %s failed", session_id)
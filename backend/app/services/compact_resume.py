@@ -0,0 +1,137 @@
+import sys
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from app.models.schemas import ResumeData, Experience, Education
+from app.services.resume_profile import skill_vocabulary
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class _Record:
+    """``__slots__`` mirror of a pydantic model, field for field
+
+    Fields listed in ``interned`` (titles, companies, dates) repeat across
+    sessions and share one string object; free text is kept as is.
+    """
+
+    __slots__ = ()
+    model = None
+    interned: Tuple[str, ...] = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields.get(name)
+            setattr(self, name, _intern(value) if name in self.interned else value)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(**{name: getattr(model, name) for name in cls.__slots__})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_model(self):
+        # Built from an already validated model, so validation is skipped
+        return self.model.model_construct(**self.to_dict())
+
+
+class CompactExperience(_Record):
+    __slots__ = ("title", "company", "start_date", "end_date", "description", "location")
+    model = Experience
+    interned = ("title", "company", "start_date", "end_date", "location")
+
+
+class CompactEducation(_Record):
+    __slots__ = ("degree", "institution", "field_of_study", "start_date", "end_date", "gpa")
+    model = Education
+    interned = ("degree", "institution", "field_of_study", "start_date", "end_date")
+
+
+class CompactResume:
+    """Resident form of a parsed resume, held by chat sessions
+
+    Skills are ids into the shared vocabulary, roles and degrees are
+    ``__slots__`` records with interned strings, and the pydantic
+    ``ResumeData`` is only built again by ``to_resume_data`` at API
+    boundaries. It reads like ``ResumeData`` (``name``, ``skills``,
+    ``experience``, ``education``...), so ResumeProfile and the search
+    service accept either.
+    """
+
+    __slots__ = ("name", "email", "phone", "_skill_ids", "experience", "education", "summary", "raw_text",
+                 "text_digest")
+
+    def __init__(self, name: str, skills: List[str], experience: Tuple[CompactExperience, ...] = (),
+                 education: Tuple[CompactEducation, ...] = (), email: Optional[str] = None,
+                 phone: Optional[str] = None, summary: Optional[str] = None, raw_text: Optional[str] = None,
+                 text_digest: Optional[str] = None):
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self._skill_ids = skill_vocabulary.encode(skills)
+        self.experience = tuple(experience)
+        self.education = tuple(education)
+        self.summary = summary
+        self.raw_text = raw_text
+        self.text_digest = text_digest
+
+    @classmethod
+    def from_resume_data(cls, resume_data: ResumeData) -> "CompactResume":
+        if isinstance(resume_data, cls):
+            return resume_data
+        return cls(
+            name=resume_data.name,
+            email=resume_data.email,
+            phone=resume_data.phone,
+            skills=resume_data.skills,
+            experience=tuple(CompactExperience.from_model(exp) for exp in resume_data.experience),
+            education=tuple(CompactEducation.from_model(edu) for edu in resume_data.education),
+            summary=resume_data.summary,
+            raw_text=resume_data.raw_text,
+            text_digest=resume_data.text_digest,
+        )
+
+    @property
+    def skills(self) -> List[str]:
+        return skill_vocabulary.decode(self._skill_ids)
+
+    @property
+    def skill_count(self) -> int:
+        return len(self._skill_ids)
+
+    def top_skills(self, count: int) -> List[str]:
+        """First skills as written on the resume, without decoding the rest"""
+        return skill_vocabulary.decode(self._skill_ids[:count])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as ``ResumeData.model_dump()``, without building the model"""
+        return {
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "skills": self.skills,
+            "experience": [exp.to_dict() for exp in self.experience],
+            "education": [edu.to_dict() for edu in self.education],
+            "summary": self.summary,
+            "raw_text": self.raw_text,
+            "text_digest": self.text_digest,
+        }
+
+    def to_resume_data(self) -> ResumeData:
+        return ResumeData.model_construct(
+            name=self.name,
+            email=self.email,
+            phone=self.phone,
+            skills=self.skills,
+            experience=[exp.to_model() for exp in self.experience],
+            education=[edu.to_model() for edu in self.education],
+            summary=self.summary,
+            raw_text=self.raw_text,
+            text_digest=self.text_digest,
+        )
+
+
+# Accepted wherever a resume is only read, never returned to a client
+ResumeLike = Union[ResumeData, CompactResume]
@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from app.models.schemas import ChatMessage
+from app.utils.metrics import GEMINI_SECONDS, FALLBACKS, model_name
+
+log = logging.getLogger(__name__)
+
+# Summaries are generated here, never on the request thread
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+
+_ROLE_CODES = {"user": "u", "assistant": "a"}
+_ROLE_NAMES = {"u": "User", "a": "Assistant"}
+
+
+def _keep_tail(text: str, max_chars: int) -> str:
+    """Newest part of text within max_chars, starting at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    return tail.split(" ", 1)[-1] if " " in tail else tail
+
+
+class ConversationMemory:
+    """Fixed window of recent turns plus a rolling summary of everything older
+
+    Turns are kept as (role code, text) tuples, trimmed to ``max_turn_chars``.
+    Turns that fall out of the window are queued and folded into the summary
+    by a background worker; until that finishes they still count as context,
+    so nothing is lost in between.
+    """
+
+    def __init__(self, window_size: int = 10, max_turn_chars: int = 600,
+                 max_summary_chars: int = 1200,
+                 summarizer: Optional[Callable[[str, List[Tuple[str, str]]], str]] = None):
+        self.window_size = window_size
+        self.max_turn_chars = max_turn_chars
+        self.max_summary_chars = max_summary_chars
+        self.summarizer = summarizer
+        self.summary = ""
+        self.total_turns = 0
+
+        self._recent: deque = deque()
+        self._pending: List[Tuple[str, str]] = []
+        self._folding: List[Tuple[str, str]] = []
+        self._summarizing = False
+        self._lock = threading.Lock()
+
+    def add(self, role: str, content: str):
+        """Record a turn; older turns are summarized asynchronously"""
+        text = content if len(content) <= self.max_turn_chars else content[:self.max_turn_chars] + "..."
+        with self._lock:
+            self._recent.append((_ROLE_CODES.get(role, role[:1]), text))
+            self.total_turns += 1
+            while len(self._recent) > self.window_size:
+                self._pending.append(self._recent.popleft())
+            schedule = bool(self._pending) and not self._summarizing
+            if schedule:
+                self._summarizing = True
+
+        if schedule:
+            _summary_executor.submit(self._fold_pending)
+
+    def messages(self) -> List[ChatMessage]:
+        """Recent turns as API models"""
+        with self._lock:
+            return [
+                ChatMessage(role="user" if code == "u" else "assistant", content=text)
+                for code, text in self._recent
+            ]
+
+    def context(self, max_chars: int = 2000) -> str:
+        """Bounded prompt context: summary, then as many recent turns as fit"""
+        with self._lock:
+            summary = self.summary
+            turns = self._folding + self._pending + list(self._recent)
+
+        # The summary may use at most half the budget; recent turns get the rest
+        summary = _keep_tail(summary, max_chars // 2)
+        lines = []
+        budget = max_chars - len(summary)
+        for code, text in reversed(turns):
+            line = f"{_ROLE_NAMES.get(code, code)}: {text}"
+            if budget - len(line) < 0:
+                break
+            lines.append(line)
+            budget -= len(line) + 1
+        lines.reverse()
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation: {summary}")
+        if lines:
+            parts.append("Recent messages:\n" + "\n".join(lines))
+        return "\n".join(parts)
+
+    def approximate_size(self) -> int:
+        with self._lock:
+            return (
+                len(self.summary)
+                + sum(len(text) + 64 for _, text in self._recent)
+                + sum(len(text) + 64 for _, text in self._pending + self._folding)
+            )
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "summary": self.summary,
+                "total_turns": self.total_turns,
+                "recent": [list(turn) for turn in self._folding + self._pending + list(self._recent)],
+            }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        turns = [tuple(turn) for turn in snapshot.get("recent", [])]
+        with self._lock:
+            self.summary = snapshot.get("summary", "")
+            self.total_turns = snapshot.get("total_turns", len(turns))
+            self._recent = deque(turns[-self.window_size:])
+            self._pending = turns[:-self.window_size] if len(turns) > self.window_size else []
+            schedule = bool(self._pending) and not self._summarizing
+            if schedule:
+                self._summarizing = True
+        if schedule:
+            _summary_executor.submit(self._fold_pending)
+
+    def _fold_pending(self):
+        """Worker: merge queued turns into the summary until the queue is empty"""
+        while True:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._folding = batch
+                previous = self.summary
+                if not batch:
+                    self._summarizing = False
+                    return
+
+            summary = None
+            if self.summarizer:
+                try:
+                    summary = self.summarizer(previous, batch)
+                except Exception as e:
+                    log.warning("Summarizer failed, using extractive summary: %s", e)
+            if not summary:
+                FALLBACKS.inc("extractive_summary")
+                summary = self._extractive_summary(previous, batch)
+
+            with self._lock:
+                self.summary = _keep_tail(summary.strip(), self.max_summary_chars)
+                self._folding = []
+
+    def _extractive_summary(self, previous: str, batch: List[Tuple[str, str]]) -> str:
+        """Cheap fallback: keep what the user asked for, newest last"""
+        asks = [text.split("\n", 1)[0][:120] for code, text in batch if code == "u"]
+        if not asks:
+            return previous
+        addition = "User asked: " + "; ".join(asks) + "."
+        return f"{previous} {addition}".strip()
+
+
+def gemini_summarizer(model_provider: Callable[[], Any]) -> Callable[[str, List[Tuple[str, str]]], str]:
+    """Summarizer that asks Gemini to fold new turns into the running summary"""
+    def summarize(previous: str, batch: List[Tuple[str, str]]) -> str:
+        transcript = "\n".join(f"{_ROLE_NAMES.get(code, code)}: {text}" for code, text in batch)
+        prompt = f"""Update the running summary of a job-hunting chat between a user and an assistant.
+
+Current summary:
+{previous or '(none)'}
+
+New messages:
+{transcript}
+
+Return ONLY the updated summary in at most 5 sentences. Keep the user's goals, preferences
+(location, job type, seniority) and any advice already given."""
+        model = model_provider()
+        with GEMINI_SECONDS.time(model_name(model), "summary"):
+            return model.generate_content(prompt).text
+    return summarize
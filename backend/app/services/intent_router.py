@@ -0,0 +1,210 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+# Keyword rules, highest priority first; greeting only wins when nothing else matches
+INTENT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("search_jobs", [r"jobs?", "search", "find", r"opportunit(?:y|ies)", r"openings?", r"positions?",
+                     r"roles?", "hiring", r"vacanc(?:y|ies)"]),
+    ("resume_feedback", ["resume", "cv", "feedback", "improve", "review"]),
+    ("career_advice", ["advice", "career", "help", "suggest", "recommend", "should i", r"interview(?:s|ing)?",
+                       "cover letter"]),
+    ("greeting", ["hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening"]),
+]
+
+# Minimum classifier posterior before its answer is trusted
+DEFAULT_THRESHOLDS = {
+    "search_jobs": 0.55,
+    "resume_feedback": 0.6,
+    "career_advice": 0.6,
+    "greeting": 0.7,
+    "general": 0.5,
+}
+
+# Small labelled seed set the local classifier is trained on at startup
+TRAINING_EXAMPLES: List[Tuple[str, str]] = [
+    ("hello", "greeting"),
+    ("hi there", "greeting"),
+    ("hey", "greeting"),
+    ("good morning", "greeting"),
+    ("hi, how are you", "greeting"),
+    ("greetings", "greeting"),
+    ("find me jobs", "search_jobs"),
+    ("show me python developer positions", "search_jobs"),
+    ("are there any openings for data engineers", "search_jobs"),
+    ("who is hiring backend engineers", "search_jobs"),
+    ("search for remote roles", "search_jobs"),
+    ("i am looking for work in berlin", "search_jobs"),
+    ("any full time opportunities near me", "search_jobs"),
+    ("help me find a job", "search_jobs"),
+    ("can you look for internships", "search_jobs"),
+    ("what jobs match my resume", "search_jobs"),
+    ("find jobs that fit my cv", "search_jobs"),
+    ("review my resume", "resume_feedback"),
+    ("how can i improve my cv", "resume_feedback"),
+    ("give me feedback on my resume", "resume_feedback"),
+    ("what is wrong with my resume", "resume_feedback"),
+    ("is my resume good enough", "resume_feedback"),
+    ("how should i rewrite my experience section", "resume_feedback"),
+    ("help me improve my resume summary", "resume_feedback"),
+    ("what career should i pursue", "career_advice"),
+    ("should i learn rust or go", "career_advice"),
+    ("how do i move into management", "career_advice"),
+    ("any advice for switching to data science", "career_advice"),
+    ("what skills should i learn next", "career_advice"),
+    ("recommend a certification for cloud", "career_advice"),
+    ("how do i negotiate salary", "career_advice"),
+    ("help me plan my career", "career_advice"),
+    ("how do i prepare for a technical interview", "career_advice"),
+    ("interview prep tips", "career_advice"),
+    ("thanks", "general"),
+    ("ok", "general"),
+    ("what can you do", "general"),
+    ("never mind", "general"),
+    ("that is all", "general"),
+    ("cool thank you", "general"),
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#']+")
+
+
+def _features(text: str) -> List[str]:
+    """Unigrams plus bigrams"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class NaiveBayesIntentClassifier:
+    """Multinomial naive Bayes over word n-grams with Laplace smoothing"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.intents: List[str] = []
+        self._log_priors: Dict[str, float] = {}
+        self._log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self._log_unseen: Dict[str, float] = {}
+
+    def fit(self, examples: List[Tuple[str, str]]) -> "NaiveBayesIntentClassifier":
+        counts: Dict[str, Counter] = defaultdict(Counter)
+        docs = Counter()
+        for text, intent in examples:
+            counts[intent].update(_features(text))
+            docs[intent] += 1
+
+        vocabulary = set()
+        for counter in counts.values():
+            vocabulary.update(counter)
+
+        self.intents = sorted(counts)
+        total_docs = sum(docs.values())
+        for intent in self.intents:
+            total = sum(counts[intent].values()) + self.alpha * len(vocabulary)
+            self._log_priors[intent] = math.log(docs[intent] / total_docs)
+            self._log_likelihoods[intent] = {
+                feature: math.log((count + self.alpha) / total)
+                for feature, count in counts[intent].items()
+            }
+            self._log_unseen[intent] = math.log(self.alpha / total)
+        return self
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely intent and its posterior probability"""
+        features = _features(text)
+        scores = {}
+        for intent in self.intents:
+            likelihoods = self._log_likelihoods[intent]
+            unseen = self._log_unseen[intent]
+            scores[intent] = self._log_priors[intent] + sum(likelihoods.get(f, unseen) for f in features)
+
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+
+def _latency_summary(count: int, total: float, peak: float) -> Dict[str, Any]:
+    return {
+        "routed": count,
+        "avg_latency_us": round(total / count * 1e6, 1),
+        "max_latency_us": round(peak * 1e6, 1),
+    }
+
+
+class IntentRouter:
+    """Routes chat messages: one precompiled keyword pass, classifier for ambiguous cases"""
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None,
+                 classifier: Optional[NaiveBayesIntentClassifier] = None):
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.classifier = classifier or NaiveBayesIntentClassifier().fit(TRAINING_EXAMPLES)
+        self._priority = [intent for intent, _ in INTENT_KEYWORDS]
+
+        alternatives = []
+        for intent, words in INTENT_KEYWORDS:
+            alternatives.append(rf"(?P<{intent}>\b(?:{'|'.join(words)})\b)")
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._methods: Counter = Counter()
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        # (intent, method) -> [routed, latency total, latency max]
+        self._latency: Dict[Tuple[str, str], List[float]] = {}
+
+    def route(self, message: str) -> Tuple[str, float, str]:
+        """Return (intent, confidence, method) for a message"""
+        start = time.perf_counter()
+
+        hits = {match.lastgroup for match in self._pattern.finditer(message)}
+        substantive = hits - {"greeting"}
+
+        if len(substantive) == 1:
+            intent, confidence, method = substantive.pop(), 1.0, "keyword"
+        elif hits == {"greeting"}:
+            intent, confidence, method = "greeting", 1.0, "keyword"
+        else:
+            # No keyword, or several competing ones: let the classifier decide
+            intent, confidence = self.classifier.predict(message)
+            method = "classifier"
+            if confidence < self.thresholds.get(intent, 0.5):
+                fallback = [i for i in self._priority if i in hits]
+                intent, method = (fallback[0], "keyword_fallback") if fallback else ("general", "default")
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._counts[intent] += 1
+            self._methods[method] += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+            latency = self._latency.setdefault((intent, method), [0, 0.0, 0.0])
+            latency[0] += 1
+            latency[1] += elapsed
+            latency[2] = max(latency[2], elapsed)
+
+        return intent, confidence, method
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = sum(self._counts.values())
+            by_intent = {}
+            for intent in sorted(self._counts):
+                methods = {method: latency for (name, method), latency in self._latency.items() if name == intent}
+                by_intent[intent] = {
+                    **_latency_summary(
+                        sum(count for count, _, _ in methods.values()),
+                        sum(total for _, total, _ in methods.values()),
+                        max(peak for _, _, peak in methods.values())
+                    ),
+                    "by_method": {method: _latency_summary(*latency) for method, latency in sorted(methods.items())},
+                }
+            return {
+                "routed": routed,
+                "by_intent": by_intent,
+                "by_method": dict(self._methods),
+                "avg_latency_us": round(self._latency_total / routed * 1e6, 1) if routed else 0.0,
+                "max_latency_us": round(self._latency_max * 1e6, 1),
+                "thresholds": self.thresholds,
+            }
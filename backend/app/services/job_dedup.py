@@ -0,0 +1,327 @@
+import logging
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+# Query parameters that identify a posting; everything else is tracking noise
+IDENTITY_PARAMS = {"jk", "jobid", "job_id", "currentjobid", "jl", "id"}
+
+# 64 permutations split into 16 bands of 4 rows -> ~0.5 Jaccard threshold
+NUM_PERM = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# How often a long-running store prunes clusters it has not seen recently
+PRUNE_INTERVAL_SECONDS = 24 * 3600
+
+# Board names that syndicated copies add to titles ("... | LinkedIn")
+_BOARD_WORDS = {"linkedin", "indeed", "glassdoor", "monster", "careerbuilder", "com"}
+
+
+def _make_permutations() -> List[Tuple[int, int]]:
+    """Deterministic (a, b) pairs so signatures stay comparable across processes"""
+    perms = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"minhash-perm-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        perms.append(((a % (_MERSENNE_PRIME - 1)) + 1, b % _MERSENNE_PRIME))
+    return perms
+
+
+_PERMUTATIONS = _make_permutations()
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a job URL so the same posting maps to one key"""
+    if not url:
+        return ""
+
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+
+    path = re.sub(r"/+", "/", parts.path).rstrip("/") or "/"
+
+    # LinkedIn slugs change with the title; the trailing numeric id does not
+    if host.endswith("linkedin.com"):
+        match = re.search(r"/jobs/view/(?:[^/]*-)?(\d+)", path)
+        if match:
+            path = f"/jobs/view/{match.group(1)}"
+
+    query = sorted(
+        (key.lower(), value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() in IDENTITY_PARAMS
+    )
+
+    return urlunsplit(("https", host, path.lower(), urlencode(query), ""))
+
+
+def _shingles(text: str) -> Set[str]:
+    """Word n-gram shingles of normalized text"""
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _BOARD_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text: str) -> Tuple[int, ...]:
+    """Compute a MinHash signature over the text's shingles"""
+    shingles = _shingles(text)
+    if not shingles:
+        return tuple([_MAX_HASH] * NUM_PERM)
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+
+    signature = []
+    for a, b in _PERMUTATIONS:
+        signature.append(min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes))
+    return tuple(signature)
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return matches / NUM_PERM
+
+
+def _band_keys(signature: Tuple[int, ...]) -> List[str]:
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"<{ROWS_PER_BAND}I", *rows), digest_size=8).hexdigest()
+        keys.append(digest)
+    return keys
+
+
+class SignatureStore:
+    """SQLite-backed LSH index of job signatures shared across searches and sessions
+
+    Clusters not seen for ``job_dedup_retention_days`` are pruned at startup
+    and then about once a day.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.job_dedup_db_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job_signatures (
+                cluster_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                canonical_url TEXT,
+                signature BLOB NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_urls (
+                canonical_url TEXT PRIMARY KEY,
+                cluster_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                cluster_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_lsh_band_bucket ON lsh_buckets (band, bucket);
+            CREATE INDEX IF NOT EXISTS idx_lsh_cluster ON lsh_buckets (cluster_id);
+            CREATE INDEX IF NOT EXISTS idx_job_urls_cluster ON job_urls (cluster_id);
+            CREATE INDEX IF NOT EXISTS idx_job_signatures_last_seen ON job_signatures (last_seen);
+            """
+        )
+        self._conn.commit()
+
+        # Postings that stopped appearing in searches are forgotten after the retention period
+        self._last_pruned = 0.0
+        self._prune(time.time())
+
+    def assign_cluster(self, canonical_url: str, signature: Tuple[int, ...],
+                       threshold: float = 0.6) -> int:
+        """Return the cluster of an existing near-duplicate, or register a new one"""
+        return self.assign_clusters([(canonical_url, signature)], threshold)[0]
+
+    def assign_clusters(self, items: List[Tuple[str, Tuple[int, ...]]], threshold: float = 0.6) -> List[int]:
+        """``assign_cluster`` for a batch of (canonical URL, signature) in one transaction
+
+        Later items see clusters registered by earlier ones, so duplicates
+        within the batch collapse as well.
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._last_pruned > PRUNE_INTERVAL_SECONDS:
+                self._prune(now)
+            with self._conn:
+                return [self._assign(canonical_url, signature, threshold, now) for canonical_url, signature in items]
+
+    def prune(self, max_age_days: float = None) -> int:
+        """Forget clusters not seen for ``max_age_days``; returns how many"""
+        with self._lock:
+            return self._prune(time.time(), max_age_days)
+
+    def _assign(self, canonical_url: str, signature: Tuple[int, ...], threshold: float, now: float) -> int:
+        if canonical_url:
+            row = self._conn.execute(
+                "SELECT cluster_id FROM job_urls WHERE canonical_url = ?", (canonical_url,)
+            ).fetchone()
+            if row:
+                self._touch(row[0], now)
+                return row[0]
+
+        band_keys = _band_keys(signature)
+        candidates = set()
+        # A result with no text has nothing to compare; only its URL identifies it
+        if set(signature) == {_MAX_HASH}:
+            band_keys = []
+        for band, key in enumerate(band_keys):
+            for (cluster_id,) in self._conn.execute(
+                "SELECT cluster_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, key)
+            ):
+                candidates.add(cluster_id)
+
+        best_cluster, best_score = None, 0.0
+        for cluster_id in candidates:
+            row = self._conn.execute(
+                "SELECT signature FROM job_signatures WHERE cluster_id = ?", (cluster_id,)
+            ).fetchone()
+            if not row:
+                continue
+            score = estimate_similarity(signature, self._unpack(row[0]))
+            if score > best_score:
+                best_cluster, best_score = cluster_id, score
+
+        if best_cluster is not None and best_score >= threshold:
+            cluster_id = best_cluster
+            self._touch(cluster_id, now)
+        else:
+            cursor = self._conn.execute(
+                "INSERT INTO job_signatures (canonical_url, signature, last_seen) VALUES (?, ?, ?)",
+                (canonical_url, self._pack(signature), now)
+            )
+            cluster_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO lsh_buckets (band, bucket, cluster_id) VALUES (?, ?, ?)",
+                [(band, key, cluster_id) for band, key in enumerate(band_keys)]
+            )
+
+        if canonical_url:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO job_urls (canonical_url, cluster_id) VALUES (?, ?)",
+                (canonical_url, cluster_id)
+            )
+        return cluster_id
+
+    def _prune(self, now: float, max_age_days: float = None) -> int:
+        self._last_pruned = now
+        days = settings.job_dedup_retention_days if max_age_days is None else max_age_days
+        if not days:
+            return 0
+        cutoff = now - days * 86400
+        with self._conn:
+            stale = "SELECT cluster_id FROM job_signatures WHERE last_seen < ?"
+            self._conn.execute(f"DELETE FROM lsh_buckets WHERE cluster_id IN ({stale})", (cutoff,))
+            self._conn.execute(f"DELETE FROM job_urls WHERE cluster_id IN ({stale})", (cutoff,))
+            pruned = self._conn.execute("DELETE FROM job_signatures WHERE last_seen < ?", (cutoff,)).rowcount
+        if pruned:
+            log.info("Pruned %d job signatures not seen for %s days", pruned, days)
+        return pruned
+
+    def _touch(self, cluster_id: int, now: float):
+        self._conn.execute(
+            "UPDATE job_signatures SET last_seen = ? WHERE cluster_id = ?", (now, cluster_id)
+        )
+
+    @staticmethod
+    def _pack(signature: Tuple[int, ...]) -> bytes:
+        return struct.pack(f"<{NUM_PERM}I", *signature)
+
+    @staticmethod
+    def _unpack(blob: bytes) -> Tuple[int, ...]:
+        return struct.unpack(f"<{NUM_PERM}I", blob)
+
+
+class JobDeduplicator:
+    """Collapse the same posting syndicated across multiple job boards"""
+
+    def __init__(self, store: Optional[SignatureStore] = None, threshold: float = 0.6):
+        self.store = store or SignatureStore()
+        self.threshold = threshold
+
+    def deduplicate(self, results: List[Dict[str, Any]],
+                    seen_clusters: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+        """Keep the first result of every duplicate cluster, preserving order
+
+        Each kept result gets a ``dedup_cluster`` key. Pass ``seen_clusters`` to
+        also drop postings already shown earlier (it is updated in place).
+        """
+        seen = seen_clusters if seen_clusters is not None else set()
+        unique = []
+
+        keys: List[Optional[Tuple[str, Tuple[int, ...]]]] = []
+        for result in results:
+            try:
+                keys.append(self._cluster_key(result))
+            except Exception as e:
+                log.warning("Error hashing result: %s", e)
+                keys.append(None)
+
+        # One transaction for the whole batch rather than a commit per result
+        try:
+            clusters = iter(self.store.assign_clusters([key for key in keys if key is not None], self.threshold))
+        except Exception as e:
+            log.warning("Error assigning duplicate clusters: %s", e)
+            return results
+
+        for result, key in zip(results, keys):
+            if key is None:
+                unique.append(result)
+                continue
+
+            cluster_id = next(clusters)
+            if cluster_id in seen:
+                continue
+            seen.add(cluster_id)
+            unique.append({**result, "dedup_cluster": cluster_id})
+
+        if len(unique) < len(results):
+            log.debug("Collapsed %d duplicate listings", len(results) - len(unique))
+        return unique
+
+    def cluster_for(self, result: Dict[str, Any]) -> int:
+        """Stable cluster id for a raw search result"""
+        return self.store.assign_cluster(*self._cluster_key(result), self.threshold)
+
+    @staticmethod
+    def _cluster_key(result: Dict[str, Any]) -> Tuple[str, Tuple[int, ...]]:
+        canonical_url = canonicalize_url(result.get("url", ""))
+        text = " ".join([
+            result.get("title", "") or "",
+            result.get("company", "") or "",
+            result.get("content", "") or "",
+        ])
+        return canonical_url, minhash_signature(text)
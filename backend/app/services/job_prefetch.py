@@ -0,0 +1,106 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, Callable
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+
+class JobPrefetcher:
+    """Runs the default job search in the background right after an agent is created
+
+    The prefetch fills the agent's ``prefetched`` result set. A chat turn
+    that arrives while it is still running blocks on the result set's lock,
+    which joins the in-flight search instead of starting a second one.
+    At most ``max_concurrent`` prefetches run at once; further requests are
+    skipped rather than queued, because speculative work that waits in line
+    is rarely still useful.
+    """
+
+    def __init__(self, max_concurrent: int = None, page_size: int = 5):
+        self.max_concurrent = max_concurrent or settings.job_prefetch_max_concurrent
+        self.page_size = page_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent, thread_name_prefix="job-prefetch"
+        )
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._counters = {
+            "started": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "skipped_capacity": 0,
+            "used": 0,
+        }
+
+    def start(self, session_id: str, agent, on_complete: Optional[Callable[[], None]] = None) -> bool:
+        """Kick off a prefetch for the agent; returns False if at capacity"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["skipped_capacity"] += 1
+            return False
+
+        result_set = agent.prepare_prefetch()
+
+        def run():
+            if not result_set.cancelled:
+                result_set.page(limit=self.page_size)
+
+        def finished(future: Future):
+            self._slots.release()
+            with self._lock:
+                if self._inflight.get(session_id) is future:
+                    del self._inflight[session_id]
+            if future.cancelled() or result_set.cancelled:
+                return
+
+            error = future.exception()
+            with self._lock:
+                self._counters["failed" if error else "completed"] += 1
+            if error:
+                log.warning("Prefetch for %s failed: %s", session_id, error)
+            elif on_complete:
+                try:
+                    on_complete()
+                except Exception as e:
+                    log.exception("Completion callback for %s failed", session_id)
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._inflight[session_id] = future
+            self._counters["started"] += 1
+        future.add_done_callback(finished)
+        return True
+
+    def cancel(self, session_id: str, agent=None):
+        """Drop a session's prefetch; a search already on the wire is discarded on return"""
+        with self._lock:
+            future = self._inflight.pop(session_id, None)
+        if agent is not None and agent.prefetched is not None:
+            agent.prefetched.cancelled = True
+            agent.prefetched = None
+        # A running search cannot be cancelled; its result is discarded instead, not counted here
+        if future is not None and future.cancel():
+            with self._lock:
+                self._counters["cancelled"] += 1
+
+    def record_use(self):
+        with self._lock:
+            self._counters["used"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "inflight": len(self._inflight),
+                **self._counters,
+            }
@@ -0,0 +1,269 @@
+import base64
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.models.schemas import JobListing, JobPage
+from app.services.compact_resume import ResumeLike
+from app.services.resume_profile import ResumeProfile
+from app.utils.metrics import CACHE_EVENTS
+
+# Tavily returns at most 20 results per query
+MAX_UPSTREAM_RESULTS = 20
+INITIAL_UPSTREAM_RESULTS = 8
+
+# Query params that can be applied to cached listings instead of searching again
+LOCAL_FILTER_KEYS = ("location", "job_type", "seniority", "posted_within_days")
+
+
+def encode_cursor(set_id: str, offset: int) -> str:
+    """Opaque cursor pointing at an offset of one result set"""
+    return base64.urlsafe_b64encode(f"{set_id}:{offset}".encode()).decode().rstrip("=")
+
+
+def _parse_posted_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse ISO dates and the RFC 2822 dates Tavily returns into naive datetimes"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed.replace(tzinfo=None)
+
+
+def matches_filters(job: JobListing, filters: Dict[str, Any]) -> bool:
+    """Whether a cached listing satisfies the structured refinement filters"""
+    location = filters.get("location")
+    if location:
+        wanted = location.lower()
+        haystack = f"{job.location} {job.title} {job.description}".lower()
+        if wanted not in haystack:
+            return False
+
+    job_type = filters.get("job_type")
+    if job_type and job.job_type != job_type:
+        # Listings with no detected type only pass if the text says so
+        if job.job_type or job_type not in f"{job.title} {job.description}".lower():
+            return False
+
+    seniority = filters.get("seniority")
+    if seniority and job.seniority and job.seniority != seniority:
+        return False
+
+    days = filters.get("posted_within_days")
+    if days:
+        posted = _parse_posted_date(job.posted_date)
+        if not posted or posted < datetime.now() - timedelta(days=int(days)):
+            return False
+
+    return True
+
+
+def sort_listings(listings: List[JobListing], sort_by: Optional[str]) -> List[JobListing]:
+    """Order listings by match score (default) or by newest posting"""
+    if sort_by == "date":
+        return sorted(
+            listings,
+            key=lambda job: _parse_posted_date(job.posted_date) or datetime.min,
+            reverse=True
+        )
+    return sorted(listings, key=lambda job: job.match_score or 0.0, reverse=True)
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        set_id, offset = base64.urlsafe_b64decode(padded.encode()).decode().rsplit(":", 1)
+        offset = int(offset)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return set_id, offset
+
+
+class RankedResultSet:
+    """Ranked job listings for one search, grown lazily as pages are requested
+
+    Pages already handed out never move: each upstream fetch only appends
+    listings the set has not seen before, so cursors stay valid.
+
+    A refined set (see ``refine``) shares its root's upstream cache and only
+    filters and re-orders it in memory; it asks the root to fetch more when
+    a page runs past what the filtered view holds.
+    """
+
+    def __init__(self, search_service, resume_data: ResumeLike, query_params: Dict[str, Any] = None,
+                 profile: Optional[ResumeProfile] = None, parent: Optional["RankedResultSet"] = None,
+                 filters: Optional[Dict[str, Any]] = None, sort_by: Optional[str] = None):
+        self.set_id = uuid.uuid4().hex[:12]
+        self.search_service = search_service
+        self.resume_data = resume_data
+        self.query_params = query_params or {}
+        self.profile = profile
+        self.parent = parent
+        self.filters = filters or {}
+        self.sort_by = sort_by
+        self.listings: List[JobListing] = []
+        self.seen_clusters = set()
+        self.seen_urls = set()
+        self.requested = 0
+        self.exhausted = False
+        self.cancelled = False
+        self._lock = parent._lock if parent else threading.RLock()
+
+        if parent:
+            self._consumed = len(parent.listings)
+            self.listings = sort_listings(
+                [job for job in parent.listings if matches_filters(job, self.filters)], sort_by
+            )
+            self.exhausted = parent.exhausted
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Plain-data form of the set (and its root, for refined views)"""
+        root = self.root
+        snapshot = {
+            "root": {
+                "set_id": root.set_id,
+                "query_params": root.query_params,
+                "listings": [job.model_dump() for job in root.listings],
+                "seen_clusters": sorted(root.seen_clusters),
+                "requested": root.requested,
+                "exhausted": root.exhausted,
+            }
+        }
+        if self.parent:
+            positions = {id(job): i for i, job in enumerate(root.listings)}
+            snapshot["view"] = {
+                "set_id": self.set_id,
+                "query_params": self.query_params,
+                "filters": self.filters,
+                "sort_by": self.sort_by,
+                "rows": [positions[id(job)] for job in self.listings],
+                "consumed": self._consumed,
+                "exhausted": self.exhausted,
+            }
+        return snapshot
+
+    @classmethod
+    def from_snapshot(cls, search_service, resume_data: ResumeLike, snapshot: Dict[str, Any],
+                      profile: Optional[ResumeProfile] = None) -> "RankedResultSet":
+        data = snapshot["root"]
+        root = cls(search_service, resume_data, data["query_params"], profile)
+        root.set_id = data["set_id"]
+        # Listings were validated when first fetched; skip validation on rehydrate
+        root.listings = [JobListing.model_construct(**job) for job in data["listings"]]
+        root.seen_clusters = set(data["seen_clusters"])
+        root.seen_urls = {job.url for job in root.listings}
+        root.requested = data["requested"]
+        root.exhausted = data["exhausted"]
+
+        view = snapshot.get("view")
+        if not view:
+            return root
+
+        refined = cls(search_service, resume_data, view["query_params"], profile,
+                      parent=root, filters=view["filters"], sort_by=view["sort_by"])
+        refined.set_id = view["set_id"]
+        refined.listings = [root.listings[row] for row in view["rows"]]
+        refined._consumed = view["consumed"]
+        refined.exhausted = view["exhausted"]
+        return refined
+
+    @property
+    def root(self) -> "RankedResultSet":
+        return self.parent.root if self.parent else self
+
+    def refine(self, filters: Dict[str, Any], sort_by: Optional[str] = None) -> "RankedResultSet":
+        """Filter and re-sort the cached listings without searching again"""
+        combined = {**self.filters, **{k: v for k, v in filters.items() if v}}
+        with self._lock:
+            return RankedResultSet(
+                self.search_service,
+                self.resume_data,
+                {**self.root.query_params, **combined},
+                self.profile,
+                parent=self.root,
+                filters=combined,
+                sort_by=sort_by or self.sort_by
+            )
+
+    def page(self, cursor: Optional[str] = None, limit: int = 5, allow_fetch: bool = True) -> JobPage:
+        """Return the page starting at cursor, fetching upstream only if needed
+
+        With ``allow_fetch=False`` the page is served from cache only, even if short.
+        """
+        offset = 0
+        if cursor:
+            set_id, offset = decode_cursor(cursor)
+            if set_id != self.set_id:
+                raise ValueError("Cursor belongs to an earlier search")
+
+        with self._lock:
+            fetched = False
+            while allow_fetch and offset + limit > len(self.listings) and not self.exhausted:
+                self._fetch_more()
+                fetched = True
+            CACHE_EVENTS.inc("job_results", "miss" if fetched else "hit")
+
+            jobs = self.listings[offset:offset + limit]
+            next_offset = offset + len(jobs)
+            has_more = next_offset < len(self.listings) or not self.exhausted
+
+            return JobPage.model_construct(
+                jobs=jobs,
+                next_cursor=encode_cursor(self.set_id, next_offset) if has_more and jobs else None,
+                total_cached=len(self.listings)
+            )
+
+    def _fetch_more(self):
+        """Ask upstream for a larger window and append the unseen listings"""
+        if self.parent:
+            self._pull_from_parent()
+            return
+
+        if self.requested >= MAX_UPSTREAM_RESULTS:
+            self.exhausted = True
+            return
+
+        self.requested = min(
+            max(INITIAL_UPSTREAM_RESULTS, self.requested * 2), MAX_UPSTREAM_RESULTS
+        )
+
+        new_listings, raw_count = self.search_service.fetch_ranked(
+            self.resume_data,
+            self.query_params,
+            max_results=self.requested,
+            seen_clusters=self.seen_clusters,
+            fallback_to_mock=not self.listings,
+            profile=self.profile
+        )
+
+        for job in new_listings:
+            if job.url in self.seen_urls:
+                continue
+            self.seen_urls.add(job.url)
+            self.listings.append(job)
+
+        # Upstream had nothing beyond what it already returned
+        if raw_count < self.requested or raw_count == 0:
+            self.exhausted = True
+
+    def _pull_from_parent(self):
+        """Grow the root set and append whatever new listings pass the filters"""
+        if len(self.parent.listings) <= self._consumed and not self.parent.exhausted:
+            self.parent._fetch_more()
+
+        fresh = self.parent.listings[self._consumed:]
+        self._consumed = len(self.parent.listings)
+        self.listings.extend(
+            sort_listings([job for job in fresh if matches_filters(job, self.filters)], self.sort_by)
+        )
+        self.exhausted = self.parent.exhausted and self._consumed >= len(self.parent.listings)
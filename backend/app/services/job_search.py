@@ -1,74 +1,177 @@
-from tavily import TavilyClient
-from typing import List, Dict, Any
-from app.models.schemas import JobListing, ResumeData
+import logging
+from typing import List, Dict, Any, Optional, Set, Tuple
+from app.models.schemas import JobListing
 from app.config import settings
+from app.services.job_dedup import JobDeduplicator
+from app.services.job_results import RankedResultSet
+from app.services.compact_resume import ResumeLike
+from app.services.resume_profile import ResumeProfile
+from app.utils.metrics import STAGE_SECONDS, FALLBACKS, ERRORS
 import random
+import re
+import time
+
+log = logging.getLogger(__name__)
+
+# Structured attributes inferred from listing text so refinements can filter locally
+JOB_TYPE_PATTERNS = [
+    ("internship", re.compile(r"\bintern(ship)?\b", re.IGNORECASE)),
+    ("part time", re.compile(r"\bpart[\s-]?time\b", re.IGNORECASE)),
+    ("contract", re.compile(r"\b(contract|contractor|freelance)\b", re.IGNORECASE)),
+    ("full time", re.compile(r"\bfull[\s-]?time\b|\bpermanent\b", re.IGNORECASE)),
+]
+
+SENIORITY_PATTERNS = [
+    ("senior", re.compile(r"\b(senior|sr\.?|lead|principal|staff)\b", re.IGNORECASE)),
+    ("junior", re.compile(r"\b(junior|jr\.?|graduate)\b", re.IGNORECASE)),
+    ("entry level", re.compile(r"\b(entry[\s-]?level|new grad)\b", re.IGNORECASE)),
+    ("mid level", re.compile(r"\b(mid[\s-]?level|intermediate)\b", re.IGNORECASE)),
+]
+
+WORK_MODE_PATTERNS = [
+    ("Remote", re.compile(r"\bremote\b", re.IGNORECASE)),
+    ("Hybrid", re.compile(r"\bhybrid\b", re.IGNORECASE)),
+]
 
 class JobSearchService:
     def __init__(self):
         self.tavily_api_key = settings.tavily_api_key
         
         if not self.tavily_api_key or self.tavily_api_key == "your_tavily_api_key_here":
-            print("[JobSearch] WARNING: Tavily API key not configured")
+            log.warning("Tavily API key not configured")
             self.client = None
         else:
             try:
+                from tavily import TavilyClient
+                
                 self.client = TavilyClient(api_key=self.tavily_api_key)
-                print("[JobSearch] Tavily client initialized")
+                if settings.tavily_api_url:
+                    self.client.base_url = settings.tavily_api_url
+                log.info("Tavily client initialized")
             except Exception as e:
-                print(f"[JobSearch] Failed to initialize Tavily: {e}")
+                log.error("Failed to initialize Tavily: %s", e)
                 self.client = None
+        
+        try:
+            self.deduplicator = JobDeduplicator()
+        except Exception as e:
+            log.error("Failed to open dedup store, duplicates will not be collapsed: %s", e)
+            self.deduplicator = None
     
-    def search_jobs(self, resume_data: ResumeData, query_params: Dict[str, Any] = None) -> List[JobListing]:
+    def search_jobs(self, resume_data: ResumeLike, query_params: Dict[str, Any] = None,
+                    profile: Optional[ResumeProfile] = None) -> List[JobListing]:
         """Search for jobs using Tavily API or return mock data"""
+        profile = self._profile_for(resume_data, profile)
         
         # If no Tavily client, return mock jobs
         if not self.client:
-            print("[JobSearch] Using mock job data")
+            log.debug("Using mock job data")
             return self._get_mock_jobs(resume_data, query_params)
         
         try:
             # Generate search query
-            search_query = self._generate_search_query(resume_data, query_params)
+            search_query = self._generate_search_query(resume_data, query_params, profile)
             
-            print(f"[JobSearch] Searching for: {search_query}")
+            log.debug("Searching for: %s", search_query)
             
             # Perform search
-            response = self.client.search(
-                query=search_query,
-                search_depth="advanced",
-                max_results=8,
-                include_domains=[
-                    "linkedin.com/jobs",
-                    "indeed.com",
-                    "glassdoor.com",
-                    "monster.com",
-                    "careerbuilder.com"
-                ]
-            )
+            results = self._search_upstream(search_query, max_results=8)
             
             # Process results
-            job_listings = self._process_search_results(response['results'], resume_data)
+            job_listings = self._process_search_results(results, resume_data, profile=profile)
             
             # If no results, use mock data
             if not job_listings:
-                print("[JobSearch] No results found, using mock data")
+                log.info("No results found, using mock data")
                 return self._get_mock_jobs(resume_data, query_params)
             
             return job_listings
             
         except Exception as e:
-            print(f"[JobSearch] Tavily API error: {e}")
+            log.warning("Tavily API error: %s", e)
             return self._get_mock_jobs(resume_data, query_params)
     
-    def _generate_search_query(self, resume_data: ResumeData, query_params: Dict[str, Any] = None) -> str:
+    def create_result_set(self, resume_data: ResumeLike, query_params: Dict[str, Any] = None,
+                          profile: Optional[ResumeProfile] = None) -> RankedResultSet:
+        """Start a paginated result set; nothing is fetched until the first page is read"""
+        return RankedResultSet(self, resume_data, query_params, self._profile_for(resume_data, profile))
+    
+    def fetch_ranked(self, resume_data: ResumeLike, query_params: Dict[str, Any] = None,
+                     max_results: int = 8, seen_clusters: Optional[Set[int]] = None,
+                     fallback_to_mock: bool = True,
+                     profile: Optional[ResumeProfile] = None) -> Tuple[List[JobListing], int]:
+        """Fetch up to max_results upstream and rank everything not in seen_clusters
+        
+        Returns the ranked listings and the number of raw upstream results, which
+        lets callers tell when upstream has nothing more to give.
+        """
+        profile = self._profile_for(resume_data, profile)
+        
+        if not self.client:
+            if not fallback_to_mock:
+                return [], 0
+            log.debug("Using mock job data")
+            mock_jobs = self._get_mock_jobs(resume_data, query_params)
+            return mock_jobs, len(mock_jobs)
+        
+        try:
+            search_query = self._generate_search_query(resume_data, query_params, profile)
+            log.debug("Fetching up to %d results for: %s", max_results, search_query)
+            
+            results = self._search_upstream(search_query, max_results=max_results)
+            job_listings = self._process_search_results(
+                results, resume_data, limit=None, seen_clusters=seen_clusters, profile=profile
+            )
+            
+            if not job_listings and not results and fallback_to_mock:
+                log.info("No results found, using mock data")
+                mock_jobs = self._get_mock_jobs(resume_data, query_params)
+                return mock_jobs, len(mock_jobs)
+            
+            return job_listings, len(results)
+            
+        except Exception as e:
+            log.warning("Tavily API error: %s", e)
+            if not fallback_to_mock:
+                return [], 0
+            mock_jobs = self._get_mock_jobs(resume_data, query_params)
+            return mock_jobs, len(mock_jobs)
+    
+    def _search_upstream(self, search_query: str, max_results: int = 8) -> List[Dict]:
+        """Run one Tavily search and return its raw results"""
+        with STAGE_SECONDS.time("tavily_search"):
+            try:
+                response = self.client.search(
+                    query=search_query,
+                    search_depth="advanced",
+                    max_results=max_results,
+                    include_domains=[
+                        "linkedin.com/jobs",
+                        "indeed.com",
+                        "glassdoor.com",
+                        "monster.com",
+                        "careerbuilder.com"
+                    ]
+                )
+            except Exception:
+                ERRORS.inc("tavily_search")
+                raise
+        return response.get('results', [])
+    
+    def _profile_for(self, resume_data: ResumeLike, profile: Optional[ResumeProfile]) -> ResumeProfile:
+        """Use the session's precomputed profile, building one only for ad-hoc callers"""
+        return profile if profile is not None else ResumeProfile.from_resume(resume_data)
+    
+    def _generate_search_query(self, resume_data: ResumeLike, query_params: Dict[str, Any] = None,
+                               profile: Optional[ResumeProfile] = None) -> str:
         """Generate search query from resume"""
+        profile = self._profile_for(resume_data, profile)
+        
         # Base query from skills
-        skills = resume_data.skills[:3] if len(resume_data.skills) > 3 else resume_data.skills
-        base_query = " ".join(skills)
+        base_query = " ".join(profile.top_skills(3))
         
-        # Add experience level
-        exp_level = self._determine_experience_level(resume_data)
+        # Add experience level, unless the user asked for a specific one
+        exp_level = (query_params or {}).get('seniority') or profile.seniority
         
         # Add location if in query_params
         location = ""
@@ -82,81 +185,73 @@ class JobSearchService:
         
         return f"{base_query} {exp_level}{job_type} jobs{location}"
     
-    def _determine_experience_level(self, resume_data: ResumeData) -> str:
+    def _determine_experience_level(self, resume_data: ResumeLike) -> str:
         """Determine experience level based on work history"""
-        total_months = 0
-        
-        for exp in resume_data.experience:
-            if exp.start_date:
-                try:
-                    # Simple calculation (could be improved)
-                    if exp.end_date and exp.end_date.lower() != 'present':
-                        start_year = int(exp.start_date[:4]) if len(exp.start_date) >= 4 else 0
-                        end_year = int(exp.end_date[:4]) if len(exp.end_date) >= 4 else 0
-                        total_months += (end_year - start_year) * 12
-                except:
-                    pass
-        
-        total_years = total_months / 12
-        
-        if total_years < 1:
-            return "entry level"
-        elif total_years < 3:
-            return "junior"
-        elif total_years < 7:
-            return "mid level"
-        else:
-            return "senior"
+        return ResumeProfile.from_resume(resume_data).seniority
     
-    def _process_search_results(self, results: List[Dict], resume_data: ResumeData) -> List[JobListing]:
+    def _process_search_results(self, results: List[Dict], resume_data: ResumeLike,
+                                limit: Optional[int] = 5,
+                                seen_clusters: Optional[Set[int]] = None,
+                                profile: Optional[ResumeProfile] = None) -> List[JobListing]:
         """Process and score search results"""
+        start = time.perf_counter()
         job_listings = []
+        profile = self._profile_for(resume_data, profile)
+        
+        # Collapse the same posting syndicated across job boards before spending the budget
+        if self.deduplicator:
+            results = self.deduplicator.deduplicate(results, seen_clusters)
         
-        for result in results[:5]:  # Limit to 5 results
+        if limit is not None:
+            results = results[:limit]
+        
+        for result in results:
             try:
                 # Calculate match score
-                match_score = self._calculate_match_score(result, resume_data)
+                match_score = self._calculate_match_score(result, resume_data, profile)
                 
                 # Only include if relevant
                 if match_score > 0.3:
+                    text = f"{result.get('title', '')} {result.get('content', '')}"
                     job = JobListing(
                         title=result.get('title', 'Job Title'),
                         company=self._extract_company(result),
-                        location=result.get('location', 'Location not specified'),
+                        location=result.get('location') or self._first_match(WORK_MODE_PATTERNS, text) or 'Location not specified',
                         url=result.get('url', '#'),
                         description=result.get('content', 'No description available')[:200] + "...",
                         posted_date=result.get('published_date'),
                         salary=None,
-                        match_score=round(match_score, 2)
+                        match_score=round(match_score, 2),
+                        job_type=self._first_match(JOB_TYPE_PATTERNS, text),
+                        seniority=self._first_match(SENIORITY_PATTERNS, text)
                     )
                     job_listings.append(job)
             except Exception as e:
-                print(f"[JobSearch] Error processing result: {e}")
+                log.warning("Error processing result: %s", e)
                 continue
         
         # Sort by match score
-        return sorted(job_listings, key=lambda x: x.match_score, reverse=True)
+        ranked = sorted(job_listings, key=lambda x: x.match_score, reverse=True)
+        STAGE_SECONDS.observe(time.perf_counter() - start, "match_scoring")
+        return ranked
     
-    def _calculate_match_score(self, result: Dict, resume_data: ResumeData) -> float:
+    def _calculate_match_score(self, result: Dict, resume_data: ResumeLike,
+                               profile: Optional[ResumeProfile] = None) -> float:
         """Calculate how well job matches resume"""
-        score = 0.0
+        profile = self._profile_for(resume_data, profile)
         
         # Check title and description for skill matches
-        title = result.get('title', '').lower()
-        description = result.get('content', '').lower()
-        text_to_check = f"{title} {description}"
-        
-        # Count skill matches
-        matched_skills = 0
-        for skill in resume_data.skills:
-            if skill.lower() in text_to_check:
-                matched_skills += 1
+        text_to_check = f"{result.get('title', '')} {result.get('content', '')}"
         
-        # Calculate score
-        if len(resume_data.skills) > 0:
-            score = matched_skills / len(resume_data.skills)
-        
-        return min(score, 1.0)
+        return profile.matcher.score(text_to_check)
+    
+    @staticmethod
+    def _first_match(patterns, text: str) -> Optional[str]:
+        """Label of the first pattern found in text"""
+        for label, pattern in patterns:
+            if pattern.search(text):
+                return label
+        return None
     
     def _extract_company(self, result: Dict) -> str:
         """Extract company name from result"""
@@ -171,8 +266,9 @@ class JobSearchService:
         
         return company if company else "Company not specified"
     
-    def _get_mock_jobs(self, resume_data: ResumeData, query_params: Dict[str, Any] = None) -> List[JobListing]:
+    def _get_mock_jobs(self, resume_data: ResumeLike, query_params: Dict[str, Any] = None) -> List[JobListing]:
         """Return mock job listings for testing"""
+        FALLBACKS.inc("mock_jobs")
         mock_jobs = [
             JobListing(
                 title="Python Developer",
@@ -182,7 +278,9 @@ class JobSearchService:
                 description="Looking for Python developer with FastAPI and React experience. Minimum 2 years experience required.",
                 posted_date="2024-01-15",
                 salary="$80,000 - $120,000",
-                match_score=random.uniform(0.7, 0.9)
+                match_score=random.uniform(0.7, 0.9),
+                job_type="full time",
+                seniority="mid level"
             ),
             JobListing(
                 title="Full Stack Engineer",
@@ -192,7 +290,9 @@ class JobSearchService:
                 description="Join our team as a Full Stack Engineer working with React, Python, and AWS.",
                 posted_date="2024-01-10",
                 salary="$90,000 - $130,000",
-                match_score=random.uniform(0.6, 0.8)
+                match_score=random.uniform(0.6, 0.8),
+                job_type="full time",
+                seniority="mid level"
             ),
             JobListing(
                 title="Software Developer",
@@ -202,7 +302,9 @@ class JobSearchService:
                 description="We're hiring a Software Developer with JavaScript and Python skills.",
                 posted_date="2024-01-05",
                 salary="$75,000 - $110,000",
-                match_score=random.uniform(0.5, 0.7)
+                match_score=random.uniform(0.5, 0.7),
+                job_type="contract",
+                seniority="junior"
             ),
             JobListing(
                 title="Backend Developer",
@@ -212,7 +314,9 @@ class JobSearchService:
                 description="Backend developer position focusing on API development with FastAPI.",
                 posted_date="2024-01-03",
                 salary="$85,000 - $125,000",
-                match_score=random.uniform(0.6, 0.8)
+                match_score=random.uniform(0.6, 0.8),
+                job_type="full time",
+                seniority="senior"
             )
         ]
         
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from app.config import settings
+from app.models.schemas import JobListing
+from app.services.job_dedup import canonicalize_url
+from app.utils.serialization import pack, unpack
+
+
+class JobListingStore:
+    """Job listings in a local SQLite file (WAL), one row per canonical URL
+
+    Filled by bulk imports (backfills and migrations between deployments);
+    the same posting imported twice under different tracking parameters
+    replaces the earlier row instead of adding a second one.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.job_listing_store_db_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS job_listings (
+                url TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def put_many(self, listings: Iterable[JobListing]) -> int:
+        """Store listings in one transaction, replacing any with the same canonical URL"""
+        now = time.time()
+        rows = [
+            (canonicalize_url(listing.url) or listing.url, pack(listing.model_dump()), now, now)
+            for listing in listings
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    """INSERT INTO job_listings (url, data, created_at, updated_at) VALUES (?, ?, ?, ?)
+                       ON CONFLICT (url) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at""",
+                    rows
+                )
+        return len(rows)
+
+    def get(self, url: str) -> Optional[JobListing]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM job_listings WHERE url = ?", (canonicalize_url(url) or url,)
+            ).fetchone()
+        return JobListing.model_validate(unpack(row[0])) if row else None
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Every stored listing as a plain dict in insertion order, fetched in batches"""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, data FROM job_listings WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield unpack(data)
+            last_rowid = rows[-1][0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM job_listings").fetchone()[0]
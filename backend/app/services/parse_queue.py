@@ -0,0 +1,396 @@
+import logging
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from app.config import settings
+from app.utils.serialization import dumps_json
+from app.utils.metrics import STAGE_SECONDS, ERRORS
+
+log = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = {SUCCEEDED, FAILED}
+
+_COLUMNS = [
+    "id", "status", "priority", "filename", "content_type", "file_path",
+    "attempts", "max_attempts", "error", "result", "candidate_id",
+    "created_at", "updated_at", "available_at", "lease_expires_at", "expires_at", "lease_owner",
+]
+
+# Lease renewals per lease period while a job runs, so one missed beat does not lose it
+HEARTBEATS_PER_LEASE = 3
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying will not fix, e.g. an unreadable file"""
+
+
+class ParseJobStore:
+    """Parse jobs in a local SQLite file, so queued work survives restarts
+
+    Workers claim jobs with a lease. A job whose worker died is claimed
+    again once the lease runs out, which also makes it safe for several
+    processes on one host to share the file. Each claim gets a fresh
+    ``lease_owner`` token; renewals and the final write only apply while
+    the claim holding that token is still current.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.parse_queue_db_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                filename TEXT,
+                content_type TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                error TEXT,
+                result TEXT,
+                candidate_id TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                lease_expires_at REAL,
+                expires_at REAL,
+                lease_owner TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(parse_jobs)")}
+        if "lease_owner" not in columns:
+            self._conn.execute("ALTER TABLE parse_jobs ADD COLUMN lease_owner TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parse_jobs_ready ON parse_jobs (status, priority DESC, created_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parse_jobs_expiry ON parse_jobs (expires_at) WHERE expires_at IS NOT NULL"
+        )
+        self._conn.commit()
+
+    def insert(self, job: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO parse_jobs ({', '.join(job)}) VALUES ({', '.join('?' for _ in job)})",
+                list(job.values())
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM parse_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        if job["expires_at"] and job["expires_at"] < time.time():
+            return None
+        return job
+
+    def claim(self, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """Take the highest-priority runnable job, or None"""
+        now = time.time()
+        ready = "((status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?))"
+        ready_args = (QUEUED, now, RUNNING, now)
+
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    f"SELECT id FROM parse_jobs WHERE {ready} ORDER BY priority DESC, created_at LIMIT 1",
+                    ready_args
+                ).fetchone()
+                if row is None:
+                    return None
+
+                # Conditional update, so a job is only claimed once across processes
+                claimed = self._conn.execute(
+                    f"""UPDATE parse_jobs
+                        SET status = ?, attempts = attempts + 1, lease_expires_at = ?, lease_owner = ?,
+                            updated_at = ?
+                        WHERE id = ? AND {ready}""",
+                    (RUNNING, now + lease_seconds, uuid.uuid4().hex, now, row[0], *ready_args)
+                ).rowcount
+                self._conn.commit()
+                if claimed:
+                    job = self._conn.execute(
+                        f"SELECT {', '.join(_COLUMNS)} FROM parse_jobs WHERE id = ?", (row[0],)
+                    ).fetchone()
+                    return dict(zip(_COLUMNS, job))
+
+    def update(self, job_id: str, lease_owner: Optional[str] = None, **fields) -> bool:
+        """Write job fields; with ``lease_owner``, only while that claim still holds the job"""
+        fields["updated_at"] = time.time()
+        where, args = "id = ?", [job_id]
+        if lease_owner is not None:
+            where += " AND status = ? AND lease_owner = ?"
+            args += [RUNNING, lease_owner]
+        with self._lock:
+            updated = self._conn.execute(
+                f"UPDATE parse_jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE {where}",
+                (*fields.values(), *args)
+            ).rowcount
+            self._conn.commit()
+        return updated > 0
+
+    def renew(self, job_id: str, lease_owner: str, lease_seconds: float) -> bool:
+        """Extend a running job's lease; False if another worker has claimed it since"""
+        return self.update(job_id, lease_owner, lease_expires_at=time.time() + lease_seconds)
+
+    def purge_expired(self) -> List[str]:
+        """Delete finished jobs past their TTL; returns their leftover file paths"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_path FROM parse_jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "DELETE FROM parse_jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+                )
+                self._conn.commit()
+        return [path for (path,) in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM parse_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class ParseJobQueue:
+    """Local worker pool that runs resume parses queued in a ParseJobStore
+
+    ``handler(job)`` does the work and returns ``(result_dict, candidate_id)``.
+    Failed jobs are retried with exponential backoff up to ``max_attempts``
+    unless the handler raised PermanentJobError. Finished jobs stay readable
+    for ``result_ttl_seconds``. Async callers can ``subscribe`` to be woken
+    whenever a job changes.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Tuple[Dict[str, Any], Optional[str]]],
+                 store: Optional[ParseJobStore] = None, workers: int = None,
+                 max_attempts: int = None, result_ttl_seconds: int = None,
+                 retry_backoff_seconds: float = None, lease_seconds: float = None,
+                 upload_dir: str = None, poll_interval: float = 1.0):
+        self.handler = handler
+        self.store = store or ParseJobStore()
+        self.workers = workers or settings.parse_queue_workers
+        self.max_attempts = max_attempts or settings.parse_job_max_attempts
+        self.result_ttl_seconds = result_ttl_seconds or settings.parse_job_result_ttl_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds or settings.parse_job_retry_backoff_seconds
+        self.lease_seconds = lease_seconds or settings.parse_job_lease_seconds
+        self.upload_dir = upload_dir or settings.parse_upload_dir
+        self.poll_interval = poll_interval
+
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._subscribers_lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._last_purge = 0.0
+
+    def start(self):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"parse-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log.info("Started %d workers (%s)", self.workers, self.store.counts())
+
+    def stop(self, timeout: float = 5.0):
+        """Stop taking jobs; a job still running resumes after restart via its lease"""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, data: bytes, filename: str, content_type: str, priority: int = 0,
+               candidate_id: Optional[str] = None) -> Dict[str, Any]:
+        """Spool the upload to disk and queue it; returns the new job
+
+        ``candidate_id`` marks the upload as a revision of that stored resume.
+        """
+        job_id = uuid.uuid4().hex
+        extension = os.path.splitext(filename or "")[1]
+        file_path = os.path.join(self.upload_dir, f"{job_id}{extension}")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        with STAGE_SECONDS.time("upload_save"), open(file_path, "wb") as f:
+            f.write(data)
+
+        now = time.time()
+        job = {
+            "id": job_id,
+            "status": QUEUED,
+            "priority": priority,
+            "filename": filename,
+            "content_type": content_type,
+            "file_path": file_path,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "created_at": now,
+            "updated_at": now,
+            "available_at": now,
+            "candidate_id": candidate_id,
+        }
+        self.store.insert(job)
+        with self._wakeup:
+            self._wakeup.notify()
+        return self.store.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """Event set on the caller's loop each time the job changes"""
+        event = asyncio.Event()
+        with self._subscribers_lock:
+            self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, job_id: str, event: asyncio.Event):
+        with self._subscribers_lock:
+            subscribers = [s for s in self._subscribers.get(job_id, []) if s[1] is not event]
+            if subscribers:
+                self._subscribers[job_id] = subscribers
+            else:
+                self._subscribers.pop(job_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._subscribers_lock:
+            subscribers = sum(len(s) for s in self._subscribers.values())
+        return {
+            "workers": len(self._threads),
+            "jobs": self.store.counts(),
+            "subscribers": subscribers,
+        }
+
+    def _notify(self, job_id: str):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers.get(job_id, []))
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Subscriber's loop already closed
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job = self.store.claim(self.lease_seconds)
+            except Exception as e:
+                log.error("Failed to claim a job: %s", e)
+                job = None
+
+            if job is None:
+                self._purge_if_due()
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        self._notify(job_id)
+
+        if job["attempts"] > job["max_attempts"]:
+            # Claimed again after its worker died on the last attempt
+            self._finish(job, FAILED, error=job["error"] or "Worker stopped while parsing")
+            return
+
+        start = time.perf_counter()
+        heartbeat = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(job, heartbeat), name=f"parse-lease-{job_id[:8]}", daemon=True
+        ).start()
+        try:
+            result, candidate_id = self.handler(job)
+        except Exception as e:
+            heartbeat.set()
+            ERRORS.inc("parse_job")
+            retry = not isinstance(e, PermanentJobError) and job["attempts"] < job["max_attempts"]
+            log.warning("Job %s attempt %d failed: %s", job_id, job["attempts"], e)
+            if retry:
+                delay = self.retry_backoff_seconds * 2 ** (job["attempts"] - 1)
+                if not self.store.update(
+                    job_id, job["lease_owner"], status=QUEUED, error=str(e),
+                    available_at=time.time() + delay, lease_expires_at=None
+                ):
+                    log.warning("Job %s lease was lost; another worker owns it now", job_id)
+                self._notify(job_id)
+            else:
+                self._finish(job, FAILED, error=str(e))
+            return
+        heartbeat.set()
+
+        if self._finish(job, SUCCEEDED, result=dumps_json(result).decode("utf-8"), candidate_id=candidate_id,
+                        error=None):
+            log.info("Job %s done", job_id, extra={"stage": "parse_job", "duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+
+    def _heartbeat(self, job: Dict[str, Any], stop: threading.Event):
+        """Keep renewing the job's lease until ``stop`` is set or the lease is lost"""
+        interval = self.lease_seconds / HEARTBEATS_PER_LEASE
+        while not stop.wait(interval):
+            try:
+                if not self.store.renew(job["id"], job["lease_owner"], self.lease_seconds):
+                    log.warning("Job %s lease was lost while parsing", job["id"])
+                    return
+            except Exception as e:
+                # The lease is still good for a while; try again on the next beat
+                log.error("Failed to renew lease of job %s: %s", job["id"], e)
+
+    def _finish(self, job: Dict[str, Any], status: str, **fields) -> bool:
+        """Record the outcome unless the lease was lost; returns whether it was recorded"""
+        if not self.store.update(
+            job["id"], job["lease_owner"], status=status, lease_expires_at=None,
+            expires_at=time.time() + self.result_ttl_seconds, **fields
+        ):
+            # The worker now holding the job still needs the upload
+            log.warning("Job %s lease was lost; discarding this attempt's %s", job["id"], status)
+            return False
+        self._remove_file(job["file_path"])
+        self._notify(job["id"])
+        return True
+
+    def _purge_if_due(self):
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+        self._last_purge = now
+        try:
+            for path in self.store.purge_expired():
+                self._remove_file(path)
+        except Exception as e:
+            log.error("Purge failed: %s", e)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log.warning("Could not remove %s: %s", path, e)
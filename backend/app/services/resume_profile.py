@@ -0,0 +1,270 @@
+import re
+import sys
+import threading
+from array import array
+from datetime import date
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from app.models.schemas import ResumeData
+
+# canonical skill -> aliases that should count as the same skill
+SKILL_SYNONYMS: Dict[str, List[str]] = {
+    "javascript": ["js", "ecmascript", "es6"],
+    "typescript": ["ts"],
+    "python": ["python3", "py"],
+    "react": ["reactjs", "react.js"],
+    "node.js": ["node", "nodejs"],
+    "vue": ["vuejs", "vue.js"],
+    "angular": ["angularjs", "angular.js"],
+    "postgresql": ["postgres", "psql"],
+    "mongodb": ["mongo"],
+    "kubernetes": ["k8s"],
+    "aws": ["amazon web services"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "azure": ["microsoft azure"],
+    "go": ["golang"],
+    "c#": ["csharp", "c sharp"],
+    "c++": ["cpp"],
+    ".net": ["dotnet", "asp.net"],
+    "machine learning": ["ml"],
+    "artificial intelligence": ["ai"],
+    "natural language processing": ["nlp"],
+    "ci/cd": ["cicd", "continuous integration"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "sql": ["mysql", "t-sql"],
+}
+
+_ALIAS_TO_CANONICAL: Dict[str, str] = {
+    alias: canonical
+    for canonical, aliases in SKILL_SYNONYMS.items()
+    for alias in aliases
+}
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_ONGOING = {"present", "current", "currently", "now", "ongoing", "today"}
+
+# Characters that may be part of a skill token, so "go" does not match "good"
+_BOUNDARY_CHARS = r"a-z0-9+#"
+
+# Matchers kept for the most recently used skill sets; sessions look theirs up per search
+MATCHER_CACHE_SIZE = 256
+
+
+class SkillVocabulary:
+    """Process-wide table of skill strings; resumes and profiles keep integer ids into it
+
+    Thousands of sessions mention the same few hundred skills, so each
+    distinct spelling is stored once and a resume's skills cost four bytes
+    apiece. Ids are never reused: the table grows with the number of
+    distinct spellings seen, not with the number of resumes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def encode(self, skills: Iterable[str]) -> array:
+        ids = array("I")
+        for skill in skills:
+            skill_id = self._ids.get(skill)
+            if skill_id is None:
+                with self._lock:
+                    skill_id = self._ids.get(skill)
+                    if skill_id is None:
+                        skill_id = len(self._names)
+                        # The name goes in first so readers never see an id without one
+                        self._names.append(sys.intern(skill))
+                        self._ids[self._names[skill_id]] = skill_id
+            ids.append(skill_id)
+        return ids
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        names = self._names
+        return [names[skill_id] for skill_id in ids]
+
+
+skill_vocabulary = SkillVocabulary()
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase, collapse whitespace and map aliases to one canonical name"""
+    normalized = re.sub(r"\s+", " ", (skill or "").strip().lower())
+    return _ALIAS_TO_CANONICAL.get(normalized, normalized)
+
+
+def parse_resume_date(value: Optional[str], today: Optional[date] = None) -> Optional[Tuple[int, int]]:
+    """Parse 'YYYY-MM', 'YYYY', 'Jan 2020', '01/2020' or 'Present' into (year, month)"""
+    if not value:
+        return None
+
+    text = value.strip().lower()
+    if text in _ONGOING:
+        today = today or date.today()
+        return today.year, today.month
+
+    match = re.search(r"(\d{4})[-/.](\d{1,2})", text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return int(match.group(1)), int(match.group(2))
+
+    match = re.search(r"(\d{1,2})[-/.](\d{4})", text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return int(match.group(2)), int(match.group(1))
+
+    match = re.search(r"([a-z]{3})[a-z]*\.?\s+(\d{4})", text)
+    if match and match.group(1) in _MONTHS:
+        return int(match.group(2)), _MONTHS[match.group(1)]
+
+    match = re.search(r"(\d{4})", text)
+    if match:
+        return int(match.group(1)), 1
+
+    return None
+
+
+def total_experience_months(resume_data: ResumeData, today: Optional[date] = None) -> int:
+    """Months of experience, treating open-ended roles as ongoing and merging overlaps"""
+    intervals = []
+    for exp in resume_data.experience:
+        start = parse_resume_date(exp.start_date, today)
+        if not start:
+            continue
+        end = parse_resume_date(exp.end_date or "present", today)
+        start_index = start[0] * 12 + start[1] - 1
+        end_index = end[0] * 12 + end[1] - 1 if end else start_index
+        if end_index >= start_index:
+            intervals.append((start_index, end_index))
+
+    total = 0
+    current_start, current_end = None, None
+    for start_index, end_index in sorted(intervals):
+        if current_end is None or start_index > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start_index, end_index
+        else:
+            current_end = max(current_end, end_index)
+    if current_end is not None:
+        total += current_end - current_start
+
+    return total
+
+
+def seniority_for_months(months: int) -> str:
+    """Map months of experience to the seniority bucket used in search queries"""
+    total_years = months / 12
+
+    if total_years < 1:
+        return "entry level"
+    elif total_years < 3:
+        return "junior"
+    elif total_years < 7:
+        return "mid level"
+    else:
+        return "senior"
+
+
+class SkillMatcher:
+    """One precompiled word-boundary regex over every skill term and its aliases"""
+
+    def __init__(self, canonical_skills: List[str]):
+        self.canonical_skills = canonical_skills
+        self._term_to_skill: Dict[str, str] = {}
+        for skill in canonical_skills:
+            self._term_to_skill[skill] = skill
+            for alias in SKILL_SYNONYMS.get(skill, []):
+                self._term_to_skill[alias] = skill
+
+        terms = sorted(self._term_to_skill, key=len, reverse=True)
+        if terms:
+            alternation = "|".join(re.escape(term) for term in terms)
+            self._pattern = re.compile(
+                rf"(?<![{_BOUNDARY_CHARS}])(?:{alternation})(?![{_BOUNDARY_CHARS}])"
+            )
+        else:
+            self._pattern = None
+
+    def matched_skills(self, text: str) -> Set[str]:
+        """Canonical skills mentioned anywhere in the text"""
+        if not self._pattern or not text:
+            return set()
+        return {self._term_to_skill[m.group(0)] for m in self._pattern.finditer(text.lower())}
+
+    def find_spans(self, lowered_text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, canonical skill) of every match in already lowercased text"""
+        if not self._pattern:
+            return
+        for m in self._pattern.finditer(lowered_text):
+            yield m.start(), m.end(), self._term_to_skill[m.group(0)]
+
+    def score(self, text: str) -> float:
+        """Fraction of the resume's skills found in the text"""
+        if not self.canonical_skills:
+            return 0.0
+        return min(len(self.matched_skills(text)) / len(self.canonical_skills), 1.0)
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def _shared_matcher(canonical_ids: bytes) -> SkillMatcher:
+    ids = array("I")
+    ids.frombytes(canonical_ids)
+    return SkillMatcher(skill_vocabulary.decode(ids))
+
+
+class ResumeProfile:
+    """Derived resume features computed once per session and reused by every search
+
+    Skills are held as ids into the shared vocabulary, and the compiled
+    matcher comes from a small cache keyed by the skill set rather than
+    living on every session, so an idle profile is a few hundred bytes.
+    """
+
+    __slots__ = ("_skill_ids", "_canonical_ids", "experience_months", "seniority")
+
+    def __init__(self, resume_data: ResumeData, today: Optional[date] = None):
+        skills, canonical_skills = [], []
+        seen = set()
+        for skill in resume_data.skills:
+            canonical = normalize_skill(skill)
+            if not canonical or canonical in seen:
+                continue
+            seen.add(canonical)
+            skills.append(skill.strip())
+            canonical_skills.append(canonical)
+
+        self._skill_ids = skill_vocabulary.encode(skills)
+        self._canonical_ids = skill_vocabulary.encode(canonical_skills)
+        self.experience_months = total_experience_months(resume_data, today)
+        self.seniority = seniority_for_months(self.experience_months)
+
+    @classmethod
+    def from_resume(cls, resume_data: ResumeData) -> "ResumeProfile":
+        return cls(resume_data)
+
+    @property
+    def skills(self) -> List[str]:
+        return skill_vocabulary.decode(self._skill_ids)
+
+    @property
+    def canonical_skills(self) -> List[str]:
+        return skill_vocabulary.decode(self._canonical_ids)
+
+    @property
+    def skill_set(self) -> Set[str]:
+        return set(self.canonical_skills)
+
+    @property
+    def matcher(self) -> SkillMatcher:
+        return _shared_matcher(self._canonical_ids.tobytes())
+
+    def top_skills(self, count: int = 3) -> List[str]:
+        """Leading skills in the resume's own wording, for queries and prompts"""
+        return skill_vocabulary.decode(self._skill_ids[:count])
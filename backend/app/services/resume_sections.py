@@ -0,0 +1,156 @@
+import logging
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models.schemas import ResumeData
+from app.services.resume_profile import SkillMatcher, normalize_skill
+from app.utils.metrics import RESUME_REVISIONS
+
+log = logging.getLogger(__name__)
+
+# Section key -> headings that start it, lowercased and without a trailing colon
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "education and training"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tools and technologies", "skills and technologies"],
+    "other": ["projects", "personal projects", "certifications", "certificates", "licenses and certifications",
+              "awards", "publications", "languages", "volunteering", "volunteer experience", "interests"],
+}
+
+_HEADING_TO_SECTION: Dict[str, str] = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# ResumeData fields each section is parsed into; "header" is everything before the first heading
+SECTION_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "header": ("name", "email", "phone"),
+    "summary": ("summary",),
+    "experience": ("experience", "skills"),
+    "education": ("education",),
+    "skills": ("skills",),
+    "other": ("skills",),
+}
+
+# Value of a field whose section was removed from the resume
+_EMPTY = {"summary": None, "experience": [], "education": []}
+
+# With more of the resume changed than this, one full parse is as cheap and more consistent
+MAX_CHANGED_SHARE = 0.5
+
+
+def _heading(line: str) -> Optional[str]:
+    text = re.sub(r"\s+", " ", line.strip().rstrip(":").strip().lower())
+    if not text or len(text) > 40:
+        return None
+    return _HEADING_TO_SECTION.get(text)
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Resume text by section key; repeated headings of one kind are joined"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        section = _heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return {section: "\n".join(lines).strip() for section, lines in sections.items()}
+
+
+def _fingerprint(text: str) -> str:
+    # Re-extraction shifts whitespace and line breaks; only the words matter
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def changed_sections(old_text: str, new_text: str) -> Optional[Set[str]]:
+    """Sections whose text differs between two versions, or None if they cannot be compared
+
+    None means a full parse is needed: no headings were recognized in one
+    of the versions, or most of the resume changed anyway.
+    """
+    old, new = split_sections(old_text), split_sections(new_text)
+    if len(old) < 2 or len(new) < 2:
+        return None
+
+    keys = set(old) | set(new)
+    changed = {key for key in keys if _fingerprint(old.get(key, "")) != _fingerprint(new.get(key, ""))}
+    if len(changed) > MAX_CHANGED_SHARE * len(keys):
+        return None
+    return changed
+
+
+def _merge_skills(previous: List[str], found: List[str], old_text: str, new_text: str) -> List[str]:
+    """Previous skills minus those the revision stopped mentioning, then newly found ones
+
+    Skills Gemini inferred without the text naming them are kept: only a
+    skill mentioned in the old text and absent from the new one is dropped.
+    """
+    matcher = SkillMatcher([normalize_skill(skill) for skill in previous])
+    removed = matcher.matched_skills(old_text) - matcher.matched_skills(new_text)
+    merged, seen = [], set()
+    for skill in previous:
+        canonical = normalize_skill(skill)
+        if canonical and canonical not in removed and canonical not in seen:
+            seen.add(canonical)
+            merged.append(skill)
+    for skill in found or []:
+        canonical = normalize_skill(skill)
+        if canonical and canonical not in seen:
+            seen.add(canonical)
+            merged.append(skill.strip())
+    return merged
+
+
+def parse_revision(llm_client, previous: ResumeData, previous_text: str, new_text: str) -> ResumeData:
+    """Parse a revised resume, sending Gemini only the sections that changed since ``previous``
+
+    An unchanged revision costs no Gemini call. Fields of changed sections
+    are replaced; skills are updated with what the changed sections add or
+    stop mentioning.
+    """
+    changed = changed_sections(previous_text, new_text)
+    if changed is None:
+        RESUME_REVISIONS.inc("full")
+        return llm_client.parse_resume(new_text)
+
+    merged = previous.model_dump()
+    merged["raw_text"] = new_text[:1000]
+    if not changed:
+        RESUME_REVISIONS.inc("unchanged")
+        return ResumeData(**merged)
+
+    new_sections = split_sections(new_text)
+    present = sorted(section for section in changed if new_sections.get(section))
+    fields = sorted({field for section in present for field in SECTION_FIELDS[section]})
+    for section in changed - set(present):
+        for field in SECTION_FIELDS[section]:
+            if field in _EMPTY:
+                merged[field] = _EMPTY[field]
+
+    found: Dict[str, object] = {}
+    if fields:
+        section_text = "\n\n".join(f"{section.upper()}\n{new_sections[section]}" for section in present)
+        found = llm_client.parse_resume_fields(section_text, fields)
+
+    for field in fields:
+        if field == "skills":
+            continue
+        value = found.get(field)
+        # A name is required; keep the old one rather than fail on a bad partial answer
+        if value is None and field == "name":
+            continue
+        merged[field] = value if value is not None else _EMPTY.get(field)
+    if any("skills" in SECTION_FIELDS[section] for section in changed):
+        merged["skills"] = _merge_skills(previous.skills, found.get("skills") or [], previous_text, new_text)
+
+    RESUME_REVISIONS.inc("incremental")
+    log.debug("Re-parsed changed sections: %s", ", ".join(sorted(changed)))
+    return ResumeData(**merged)
@@ -0,0 +1,265 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple, Union
+
+from app.config import settings
+from app.models.schemas import ResumeData
+from app.services.resume_profile import ResumeProfile, normalize_skill
+from app.utils.serialization import pack, unpack
+
+_SUMMARY_COLUMNS = ["id", "name", "email", "seniority", "experience_months", "location", "created_at", "updated_at"]
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_MAX_PARAMS = 900
+
+
+def normalize_location(location: Optional[str]) -> Optional[str]:
+    """Lowercased, whitespace-collapsed location, so 'Berlin,  Germany' and 'berlin, germany' index together"""
+    if not location:
+        return None
+    normalized = re.sub(r"\s+", " ", location.strip().lower())
+    return normalized or None
+
+
+def resume_location(resume_data: ResumeData) -> Optional[str]:
+    """Location of the most recent role that has one; resumes carry no top-level location"""
+    for exp in resume_data.experience:
+        if exp.location:
+            return normalize_location(exp.location)
+    return None
+
+
+class ResumeStore:
+    """Parsed resumes in a local SQLite file (WAL), indexed by skill, seniority and location
+
+    Each resume is stored once as a packed ResumeData blob, with the fields
+    queries filter on (seniority, experience months, normalized location)
+    as indexed columns and its canonical skills in a separate
+    (skill, resume_id) table. Analytics and re-matching read from here
+    instead of asking users to upload and re-parse.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.resume_store_db_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT,
+                seniority TEXT NOT NULL,
+                experience_months INTEGER NOT NULL,
+                location TEXT,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS resume_skills (
+                skill TEXT NOT NULL,
+                resume_id TEXT NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+                PRIMARY KEY (skill, resume_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills (resume_id);
+            CREATE INDEX IF NOT EXISTS idx_resumes_seniority ON resumes (seniority, experience_months);
+            CREATE INDEX IF NOT EXISTS idx_resumes_location ON resumes (location) WHERE location IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_resumes_updated ON resumes (updated_at);
+            """
+        )
+        self._conn.commit()
+
+    def put(self, resume_data: ResumeData, resume_id: Optional[str] = None) -> str:
+        """Store one resume; an existing id is replaced"""
+        return self.put_many([(resume_id, resume_data)])[0]
+
+    def put_many(self, resumes: Iterable[Union[ResumeData, Tuple[Optional[str], ResumeData]]]) -> List[str]:
+        """Store many resumes in one transaction; items are ResumeData or (id or None, ResumeData)"""
+        now = time.time()
+        ids, rows, skill_rows = [], [], []
+        for item in resumes:
+            resume_id, resume_data = item if isinstance(item, tuple) else (None, item)
+            resume_id = resume_id or uuid.uuid4().hex
+            profile = ResumeProfile.from_resume(resume_data)
+            ids.append(resume_id)
+            rows.append((
+                resume_id, resume_data.name, resume_data.email, profile.seniority,
+                profile.experience_months, resume_location(resume_data),
+                pack(resume_data.model_dump()), now, now
+            ))
+            skill_rows.extend((skill, resume_id) for skill in profile.canonical_skills)
+
+        with self._lock:
+            with self._conn:
+                # Replacing must drop the old skills; the conflict update keeps created_at
+                self._delete_skills(ids)
+                self._conn.executemany(
+                    """INSERT INTO resumes
+                           (id, name, email, seniority, experience_months, location, data, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (id) DO UPDATE SET
+                           name = excluded.name, email = excluded.email, seniority = excluded.seniority,
+                           experience_months = excluded.experience_months, location = excluded.location,
+                           data = excluded.data, updated_at = excluded.updated_at""",
+                    rows
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO resume_skills (skill, resume_id) VALUES (?, ?)", skill_rows
+                )
+        return ids
+
+    def get(self, resume_id: str) -> Optional[ResumeData]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return ResumeData.model_validate(unpack(row[0])) if row else None
+
+    def get_many(self, resume_ids: List[str]) -> Dict[str, ResumeData]:
+        found = {}
+        for start in range(0, len(resume_ids), _MAX_PARAMS):
+            chunk = resume_ids[start:start + _MAX_PARAMS]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM resumes WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+                ).fetchall()
+            found.update((resume_id, ResumeData.model_validate(unpack(data))) for resume_id, data in rows)
+        return found
+
+    def delete(self, resume_id: str) -> bool:
+        with self._lock:
+            with self._conn:
+                return self._conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,)).rowcount > 0
+
+    def query(self, skills: Optional[List[str]] = None, match_all: bool = False,
+              seniority: Optional[str] = None, location: Optional[str] = None,
+              min_experience_months: Optional[int] = None,
+              limit: int = 50, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Summaries of matching resumes, most recently updated first, and the total match count
+
+        Skills are normalized like ResumeProfile's; with ``match_all`` a resume
+        must have every one, otherwise any. ``location`` matches as a prefix of
+        the normalized location, so 'berlin' finds 'berlin, germany'.
+        """
+        where, args = self._filters(skills, match_all, seniority, location, min_experience_months)
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM resumes r {where}", args).fetchone()[0]
+            rows = self._conn.execute(
+                f"""SELECT {', '.join(f'r.{column}' for column in _SUMMARY_COLUMNS)} FROM resumes r {where}
+                    ORDER BY r.updated_at DESC LIMIT ? OFFSET ?""",
+                (*args, limit, offset)
+            ).fetchall()
+        summaries = [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows]
+
+        skills_by_id = self._skills_for([summary["id"] for summary in summaries])
+        for summary in summaries:
+            summary["skills"] = skills_by_id.get(summary["id"], [])
+        return summaries, total
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[Tuple[str, ResumeData]]:
+        """Every stored resume in insertion order, fetched in batches so memory stays flat"""
+        for resume_id, data in self._iter_rows(batch_size):
+            yield resume_id, ResumeData.model_validate(unpack(data))
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Every stored resume as a plain dict with its ``id``, for export without validation"""
+        for resume_id, data in self._iter_rows(batch_size):
+            yield {"id": resume_id, **unpack(data)}
+
+    def stats(self, top_skills: int = 20) -> Dict[str, Any]:
+        """Counts for analytics: total, by seniority, top skills and top locations"""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+            seniority = self._conn.execute(
+                "SELECT seniority, COUNT(*) FROM resumes GROUP BY seniority ORDER BY COUNT(*) DESC"
+            ).fetchall()
+            skills = self._conn.execute(
+                "SELECT skill, COUNT(*) FROM resume_skills GROUP BY skill ORDER BY COUNT(*) DESC, skill LIMIT ?",
+                (top_skills,)
+            ).fetchall()
+            locations = self._conn.execute(
+                """SELECT location, COUNT(*) FROM resumes WHERE location IS NOT NULL
+                   GROUP BY location ORDER BY COUNT(*) DESC, location LIMIT ?""",
+                (top_skills,)
+            ).fetchall()
+        return {
+            "total": total,
+            "by_seniority": dict(seniority),
+            "top_skills": dict(skills),
+            "top_locations": dict(locations),
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def _filters(self, skills, match_all, seniority, location, min_experience_months) -> Tuple[str, list]:
+        clauses, args = [], []
+        canonical = sorted({normalize_skill(skill) for skill in skills or []} - {""})
+        if canonical:
+            placeholders = ", ".join("?" for _ in canonical)
+            if match_all:
+                clauses.append(
+                    f"""r.id IN (SELECT resume_id FROM resume_skills WHERE skill IN ({placeholders})
+                                 GROUP BY resume_id HAVING COUNT(*) = ?)"""
+                )
+                args.extend([*canonical, len(canonical)])
+            else:
+                clauses.append(f"r.id IN (SELECT resume_id FROM resume_skills WHERE skill IN ({placeholders}))")
+                args.extend(canonical)
+        if seniority:
+            clauses.append("r.seniority = ?")
+            args.append(seniority.strip().lower())
+        if min_experience_months:
+            clauses.append("r.experience_months >= ?")
+            args.append(min_experience_months)
+        prefix = normalize_location(location)
+        if prefix:
+            # Range instead of LIKE so the location index is used
+            clauses.append("r.location >= ? AND r.location < ?")
+            args.extend([prefix, prefix + "\uffff"])
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def _iter_rows(self, batch_size: int) -> Iterator[Tuple[str, bytes]]:
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, id, data FROM resumes WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for _, resume_id, data in rows:
+                yield resume_id, data
+            last_rowid = rows[-1][0]
+
+    def _skills_for(self, resume_ids: List[str]) -> Dict[str, List[str]]:
+        skills: Dict[str, List[str]] = {}
+        if not resume_ids:
+            return skills
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT resume_id, skill FROM resume_skills WHERE resume_id IN ({', '.join('?' for _ in resume_ids)})",
+                resume_ids
+            ).fetchall()
+        for resume_id, skill in rows:
+            skills.setdefault(resume_id, []).append(skill)
+        return skills
+
+    def _delete_skills(self, resume_ids: List[str]):
+        for start in range(0, len(resume_ids), _MAX_PARAMS):
+            chunk = resume_ids[start:start + _MAX_PARAMS]
+            self._conn.execute(
+                f"DELETE FROM resume_skills WHERE resume_id IN ({', '.join('?' for _ in chunk)})", chunk
+            )
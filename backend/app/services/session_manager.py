@@ -0,0 +1,393 @@
+import logging
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from app.config import settings
+
+log = logging.getLogger(__name__)
+
+# Removal reasons that end a session for good, in the store as well
+_EVICTIONS = ("evicted_ttl", "evicted_lru", "evicted_memory")
+
+# Attempts at saving a new session over concurrent writers
+MAX_UPDATE_ATTEMPTS = 3
+
+
+class SessionConflict(Exception):
+    """Another worker saved the session while this one was handling a turn"""
+
+
+def approximate_agent_size(agent) -> int:
+    """Rough resident size of a ChatAgent in bytes, dominated by its text
+
+    Counts the characters held in the resume, the conversation history and
+    any cached job listings, plus a fixed allowance for the objects
+    themselves. It is meant for capacity planning, not exact accounting.
+    """
+    size = 4096
+
+    # The compact resume: skills are 4-byte ids and role fields are shared strings
+    resume = getattr(agent, "resume", None)
+    if resume is not None:
+        size += len(resume.raw_text or "") + len(resume.summary or "")
+        size += 4 * resume.skill_count
+        for exp in resume.experience:
+            size += 96 + len(exp.description or "")
+        size += 96 * len(resume.education)
+
+    memory = getattr(agent, "memory", None)
+    if memory is not None:
+        size += memory.approximate_size()
+
+    result_set = getattr(agent, "result_set", None)
+    if result_set is not None:
+        for job in result_set.root.listings:
+            size += 600 + len(job.description) + len(job.title)
+
+    return size
+
+
+class SessionManager:
+    """Bounded store of chat agents with idle TTL, LRU eviction and a memory cap
+
+    With a ``store`` the manager is only a hot cache: every change is saved
+    as a snapshot, and a session whose revision in the store moved on (because
+    another worker handled a turn) is rehydrated with ``agent_factory``.
+    Saves are compare-and-set on the revision this worker last saw, and an
+    evicted session is deleted from the store unless another worker has
+    written it since.
+    """
+
+    def __init__(self, max_sessions: int = None, idle_ttl_seconds: int = None,
+                 max_memory_bytes: int = None, store=None,
+                 agent_factory: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.max_sessions = max_sessions or settings.max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds or settings.session_idle_ttl_seconds
+        self.max_memory_bytes = max_memory_bytes or settings.session_memory_limit_mb * 1024 * 1024
+
+        self.store = store
+        self.agent_factory = agent_factory
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._revisions: Dict[str, int] = {}
+        self._last_used: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        # Sessions inside ``update``; never evicted mid-turn
+        self._busy: Dict[str, int] = {}
+        # (session id, revision) evicted locally, to delete from the store outside the lock
+        self._evicted: List[Tuple[str, int]] = []
+        self._counters = {
+            "created": 0,
+            "deleted": 0,
+            "hits": 0,
+            "misses": 0,
+            "evicted_ttl": 0,
+            "evicted_lru": 0,
+            "evicted_memory": 0,
+            "rehydrated": 0,
+            "conflicts": 0,
+            "store_errors": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str):
+        """Return the agent and mark it most recently used, or None"""
+        if self.store is not None:
+            agent = self._get_from_store(session_id)
+            self._delete_evicted()
+            return agent
+
+        with self._lock:
+            now = time.time()
+            agent = self._sessions.get(session_id)
+            if agent is None or self._is_expired(session_id, now):
+                if agent is not None:
+                    self._remove(session_id, "evicted_ttl")
+                self._counters["misses"] += 1
+                return None
+
+            self._sessions.move_to_end(session_id)
+            self._last_used[session_id] = now
+            self._counters["hits"] += 1
+            return agent
+
+    def put(self, session_id: str, agent):
+        """Store an agent, evicting idle and least recently used sessions to fit"""
+        size = approximate_agent_size(agent)
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id, None)
+
+            self._sessions[session_id] = agent
+            self._last_used[session_id] = time.time()
+            self._sizes[session_id] = size
+            self._total_bytes += size
+            self._counters["created"] += 1
+
+            self._sweep_expired(time.time())
+            self._enforce_limits(keep=session_id)
+
+        self._delete_evicted()
+        self._replace(session_id, agent)
+
+    def touch(self, session_id: str) -> bool:
+        """Re-measure a session after it handled a request and save it
+
+        Returns False if another worker saved the session first; the local
+        copy is then dropped so the next ``get`` rehydrates the winner.
+        """
+        with self._lock:
+            agent = self._sessions.get(session_id)
+            if agent is None:
+                return False
+            size = approximate_agent_size(agent)
+            self._total_bytes += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._enforce_limits(keep=session_id)
+            revision = self._revisions.get(session_id)
+
+        self._delete_evicted()
+        return self._save(session_id, agent, revision)
+
+    def update(self, session_id: str, apply: Callable[[Any], Any]):
+        """Run ``apply(agent)`` once on the session and save it; returns what ``apply`` returned
+
+        A turn calls out to Gemini and streams events, so it is never run
+        twice. If another worker saved the session meanwhile, this turn's
+        changes are dropped, the next ``get`` loads the other worker's
+        state, and SessionConflict is raised. Raises KeyError if the
+        session does not exist.
+        """
+        agent = self.get(session_id)
+        if agent is None:
+            raise KeyError(session_id)
+        with self._lock:
+            revision = self._revisions.get(session_id)
+            self._busy[session_id] = self._busy.get(session_id, 0) + 1
+        try:
+            result = apply(agent)
+        finally:
+            with self._lock:
+                self._busy[session_id] -= 1
+                if not self._busy[session_id]:
+                    del self._busy[session_id]
+
+        with self._lock:
+            if self._sessions.get(session_id) is agent:
+                size = approximate_agent_size(agent)
+                self._total_bytes += size - self._sizes.get(session_id, 0)
+                self._sizes[session_id] = size
+                self._enforce_limits(keep=session_id)
+        self._delete_evicted()
+        if not self._save(session_id, agent, revision):
+            raise SessionConflict(session_id)
+        return result
+
+    def delete(self, session_id: str) -> bool:
+        if self.store is not None:
+            try:
+                self.store.delete(session_id)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                log.warning("Failed to delete %s from store: %s", session_id, e)
+
+        with self._lock:
+            if session_id not in self._sessions:
+                return False
+            self._remove(session_id, "deleted")
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._revisions.clear()
+            self._last_used.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every session idle for longer than the TTL"""
+        with self._lock:
+            expired = self._sweep_expired(time.time())
+        self._delete_evicted()
+        return expired
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = list(self._sizes.values())
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "approx_memory_bytes": self._total_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "avg_session_bytes": int(self._total_bytes / len(sizes)) if sizes else 0,
+                "max_session_bytes": max(sizes) if sizes else 0,
+                **self._counters,
+            }
+
+    async def run_sweeper(self, interval_seconds: int = None):
+        """Background task that expires idle sessions periodically"""
+        interval = interval_seconds or settings.session_sweep_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            expired = self.sweep()
+            if expired:
+                log.info("Expired %d idle sessions (%d active)", expired, len(self))
+            if self.store is not None:
+                try:
+                    self.store.sweep()
+                except Exception as e:
+                    self._counters["store_errors"] += 1
+                    log.warning("Failed to sweep session store: %s", e)
+
+    def _get_from_store(self, session_id: str):
+        """Serve the local copy if it is current, otherwise rehydrate from the store"""
+        try:
+            revision = self.store.revision(session_id)
+        except Exception as e:
+            # Keep serving sessions this worker already holds while the store is down
+            self._counters["store_errors"] += 1
+            log.error("Session store unavailable: %s", e)
+            with self._lock:
+                agent = self._sessions.get(session_id)
+                if agent is not None:
+                    self._sessions.move_to_end(session_id)
+                    self._last_used[session_id] = time.time()
+                return agent
+
+        with self._lock:
+            now = time.time()
+            agent = self._sessions.get(session_id)
+            if revision is None:
+                if agent is not None:
+                    self._remove(session_id, "evicted_ttl")
+                self._counters["misses"] += 1
+                return None
+
+            if agent is not None and self._revisions.get(session_id) == revision:
+                self._sessions.move_to_end(session_id)
+                self._last_used[session_id] = now
+                self._counters["hits"] += 1
+                return agent
+
+        loaded = self.store.load(session_id)
+        if loaded is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        snapshot, revision = loaded
+        agent = self.agent_factory(snapshot)
+        size = approximate_agent_size(agent)
+
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id, None)
+            self._sessions[session_id] = agent
+            self._revisions[session_id] = revision
+            self._last_used[session_id] = time.time()
+            self._sizes[session_id] = size
+            self._total_bytes += size
+            self._counters["rehydrated"] += 1
+            self._enforce_limits(keep=session_id)
+        return agent
+
+    def _save(self, session_id: str, agent, expected_revision: Optional[int]) -> bool:
+        if self.store is None:
+            return True
+        try:
+            revision = self.store.save(session_id, agent.to_snapshot(), expected_revision)
+        except Exception as e:
+            self._counters["store_errors"] += 1
+            log.warning("Failed to save %s: %s", session_id, e)
+            return True
+
+        with self._lock:
+            if revision is None:
+                self._counters["conflicts"] += 1
+                if self._sessions.get(session_id) is agent:
+                    self._remove(session_id, None)
+                return False
+            if self._sessions.get(session_id) is agent:
+                self._revisions[session_id] = revision
+        return True
+
+    def _replace(self, session_id: str, agent):
+        """Save a new agent over whatever revision the store holds"""
+        if self.store is None:
+            return
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            try:
+                expected = self.store.revision(session_id)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                log.warning("Failed to save %s: %s", session_id, e)
+                return
+            if self._save(session_id, agent, expected):
+                return
+            # Lost the race; the local copy was dropped, so put it back before retrying
+            with self._lock:
+                if session_id not in self._sessions:
+                    size = approximate_agent_size(agent)
+                    self._sessions[session_id] = agent
+                    self._last_used[session_id] = time.time()
+                    self._sizes[session_id] = size
+                    self._total_bytes += size
+
+    def _delete_evicted(self):
+        """Delete evicted sessions from the store unless another worker wrote them since"""
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+        for session_id, revision in evicted:
+            try:
+                self.store.delete_if_revision(session_id, revision)
+            except Exception as e:
+                self._counters["store_errors"] += 1
+                log.warning("Failed to delete %s from store: %s", session_id, e)
+
+    def _is_expired(self, session_id: str, now: float) -> bool:
+        return now - self._last_used.get(session_id, now) > self.idle_ttl_seconds
+
+    def _sweep_expired(self, now: float) -> int:
+        # Sessions are kept in LRU order, so expired ones are at the front
+        expired = 0
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if not self._is_expired(oldest, now):
+                break
+            self._remove(oldest, "evicted_ttl")
+            expired += 1
+        return expired
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        while len(self._sessions) > self.max_sessions:
+            if not self._evict_oldest("evicted_lru", keep):
+                break
+        while self._total_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+            if not self._evict_oldest("evicted_memory", keep):
+                break
+
+    def _evict_oldest(self, reason: str, keep: Optional[str]) -> bool:
+        for session_id in self._sessions:
+            if session_id != keep and session_id not in self._busy:
+                self._remove(session_id, reason)
+                return True
+        return False
+
+    def _remove(self, session_id: str, reason: Optional[str]):
+        self._sessions.pop(session_id, None)
+        revision = self._revisions.pop(session_id, None)
+        if reason in _EVICTIONS and revision is not None and self.store is not None:
+            self._evicted.append((session_id, revision))
+        self._last_used.pop(session_id, None)
+        self._total_bytes -= self._sizes.pop(session_id, 0)
+        if reason:
+            self._counters[reason] += 1
@@ -0,0 +1,436 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import settings
+from app.utils.serialization import pack, unpack
+
+log = logging.getLogger(__name__)
+
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    """Compact wire form of a session snapshot"""
+    return pack(snapshot)
+
+
+def decode_snapshot(data: bytes) -> Dict[str, Any]:
+    return unpack(data)
+
+
+# Writes between purges of expired entries in the local backends
+_PURGE_EVERY_WRITES = 500
+
+
+class MemoryBackend:
+    """Process-local key/value store with expiry; the default for a single worker
+
+    Expired entries are purged every few hundred writes and by ``sweep``,
+    and past ``max_entries`` the least recently written ones are dropped,
+    so abandoned sessions cannot pile up.
+    """
+
+    def __init__(self, max_entries: int = None):
+        # Each session is two keys: the snapshot and its revision
+        self.max_entries = max_entries or settings.max_sessions * 2
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key, time.time())
+
+    def set(self, key: str, value: bytes, ttl_seconds: int = 0):
+        with self._lock:
+            self._set(key, value, ttl_seconds)
+
+    def set_if(self, key: str, value: bytes, guard_key: str, expected: Optional[bytes],
+               guard_value: bytes, ttl_seconds: int = 0) -> bool:
+        """Write ``key`` and ``guard_key`` only if ``guard_key`` holds ``expected`` (None: absent)"""
+        with self._lock:
+            if self._get(guard_key, time.time()) != expected:
+                return False
+            self._set(key, value, ttl_seconds)
+            self._set(guard_key, guard_value, ttl_seconds)
+            return True
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_if(self, guard_key: str, expected: bytes, *keys: str) -> bool:
+        """Delete ``keys`` only if ``guard_key`` still holds ``expected``"""
+        with self._lock:
+            if self._get(guard_key, time.time()) != expected:
+                return False
+            for key in keys:
+                self._data.pop(key, None)
+            return True
+
+    def sweep(self) -> int:
+        """Drop expired entries; returns how many"""
+        with self._lock:
+            return self._purge_expired(time.time())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get(self, key: str, now: float) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at and expires_at < now:
+            del self._data[key]
+            return None
+        return value
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else 0
+        # Re-inserted at the end, so the front holds the least recently written
+        self._data.pop(key, None)
+        self._data[key] = (value, expires_at)
+        self._writes += 1
+        if self._writes % _PURGE_EVERY_WRITES == 0 or len(self._data) > self.max_entries:
+            self._purge_expired(time.time())
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def _purge_expired(self, now: float) -> int:
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at and expires_at < now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+
+class SQLiteBackend:
+    """Key/value store in a local SQLite file shared by all workers on one host"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.session_sqlite_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_kv (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM session_kv WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at and expires_at < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: int = 0):
+        with self._lock:
+            self._set(key, value, ttl_seconds)
+            self._conn.commit()
+
+    def set_if(self, key: str, value: bytes, guard_key: str, expected: Optional[bytes],
+               guard_value: bytes, ttl_seconds: int = 0) -> bool:
+        """Write ``key`` and ``guard_key`` only if ``guard_key`` holds ``expected`` (None: absent)
+
+        BEGIN IMMEDIATE takes the write lock before the read, so the check
+        and the write are atomic across every process sharing the file.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._current(guard_key) != expected:
+                    self._conn.rollback()
+                    return False
+                self._set(key, value, ttl_seconds)
+                self._set(guard_key, guard_value, ttl_seconds)
+                self._conn.commit()
+                return True
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def delete(self, *keys: str):
+        with self._lock:
+            self._conn.executemany("DELETE FROM session_kv WHERE key = ?", [(key,) for key in keys])
+            self._conn.commit()
+
+    def delete_if(self, guard_key: str, expected: bytes, *keys: str) -> bool:
+        """Delete ``keys`` only if ``guard_key`` still holds ``expected``"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._current(guard_key) != expected:
+                    self._conn.rollback()
+                    return False
+                self._conn.executemany("DELETE FROM session_kv WHERE key = ?", [(key,) for key in keys])
+                self._conn.commit()
+                return True
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def sweep(self) -> int:
+        """Drop expired rows; returns how many"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM session_kv WHERE expires_at > 0 AND expires_at < ?", (time.time(),)
+            ).rowcount
+            self._conn.commit()
+            return deleted
+
+    def _current(self, key: str) -> Optional[bytes]:
+        row = self._conn.execute(
+            "SELECT value FROM session_kv WHERE key = ? AND (expires_at = 0 OR expires_at >= ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: bytes, ttl_seconds: int):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else 0
+        self._conn.execute(
+            "INSERT OR REPLACE INTO session_kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        self._writes += 1
+        # Purge expired rows now and then instead of on every write
+        if self._writes % _PURGE_EVERY_WRITES == 0:
+            self._conn.execute(
+                "DELETE FROM session_kv WHERE expires_at > 0 AND expires_at < ?", (time.time(),)
+            )
+
+
+# Lua runs atomically on the server: check the guard key, then write both keys.
+# KEYS: guard, key. ARGV: expected, expected-exists flag, guard value, value, ttl.
+_SET_IF_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if ARGV[2] == '1' then
+    if current ~= ARGV[1] then return 0 end
+elseif current then
+    return 0
+end
+local ttl = tonumber(ARGV[5])
+if ttl > 0 then
+    redis.call('SET', KEYS[1], ARGV[3], 'EX', ttl)
+    redis.call('SET', KEYS[2], ARGV[4], 'EX', ttl)
+else
+    redis.call('SET', KEYS[1], ARGV[3])
+    redis.call('SET', KEYS[2], ARGV[4])
+end
+return 1
+"""
+
+# KEYS: guard, then the keys to delete. ARGV: expected guard value.
+_DELETE_IF_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then return 0 end
+redis.call('DEL', unpack(KEYS, 2))
+return 1
+"""
+
+
+class RespClient:
+    """Minimal RESP2 client for GET/SET/DEL against Redis or anything that speaks its protocol"""
+
+    def __init__(self, url: str = None, timeout: float = 5.0):
+        parts = urlsplit(url or settings.redis_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._buffer = b""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int = 0):
+        if ttl_seconds:
+            self.execute("SET", key, value, "EX", str(int(ttl_seconds)))
+        else:
+            self.execute("SET", key, value)
+
+    def set_if(self, key: str, value: bytes, guard_key: str, expected: Optional[bytes],
+               guard_value: bytes, ttl_seconds: int = 0) -> bool:
+        """Write ``key`` and ``guard_key`` only if ``guard_key`` holds ``expected`` (None: absent)"""
+        return self.execute(
+            "EVAL", _SET_IF_SCRIPT, "2", guard_key, key,
+            b"" if expected is None else expected, "0" if expected is None else "1",
+            guard_value, value, str(int(ttl_seconds or 0))
+        ) == 1
+
+    def delete(self, *keys: str):
+        if keys:
+            self.execute("DEL", *keys)
+
+    def delete_if(self, guard_key: str, expected: bytes, *keys: str) -> bool:
+        """Delete ``keys`` only if ``guard_key`` still holds ``expected``"""
+        return self.execute("EVAL", _DELETE_IF_SCRIPT, str(len(keys) + 1), guard_key, *keys, expected) == 1
+
+    def execute(self, *args):
+        with self._lock:
+            try:
+                return self._roundtrip(args)
+            except (OSError, ConnectionError):
+                # One reconnect attempt covers idle connections dropped by the server
+                self._close()
+                return self._roundtrip(args)
+
+    def _roundtrip(self, args):
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = b""
+        if self.password:
+            self._sock.sendall(self._encode(("AUTH", self.password)))
+            self._read_reply()
+        if self.db:
+            self._sock.sendall(self._encode(("SELECT", str(self.db))))
+            self._read_reply()
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._buffer = b""
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read_line(self) -> bytes:
+        while b"\r\n" not in self._buffer:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Connection closed by server")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\r\n", 1)
+        return line
+
+    def _read_exact(self, length: int) -> bytes:
+        while len(self._buffer) < length + 2:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Connection closed by server")
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:length], self._buffer[length + 2:]
+        return data
+
+    def _read_reply(self):
+        line = self._read_line()
+        prefix, rest = line[:1], line[1:]
+        if prefix == b"+":
+            return rest.decode()
+        if prefix == b"-":
+            raise RuntimeError(f"Redis error: {rest.decode()}")
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            return None if length == -1 else self._read_exact(length)
+        if prefix == b"*":
+            count = int(rest)
+            return None if count == -1 else [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Unexpected RESP reply: {line!r}")
+
+
+class SessionStore:
+    """Serialized session snapshots plus a revision key for cheap staleness checks"""
+
+    def __init__(self, backend=None, ttl_seconds: int = None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_seconds = ttl_seconds or settings.session_idle_ttl_seconds
+
+    def revision(self, session_id: str) -> Optional[int]:
+        value = self.backend.get(f"session:{session_id}:rev")
+        return int(value) if value is not None else None
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        data = self.backend.get(f"session:{session_id}")
+        revision = self.revision(session_id)
+        if data is None or revision is None:
+            return None
+        return decode_snapshot(data), revision
+
+    def save(self, session_id: str, snapshot: Dict[str, Any], expected_revision: Optional[int]) -> Optional[int]:
+        """Write the snapshot as the next revision if the stored one is still ``expected_revision``
+
+        ``expected_revision`` None means the session must not exist yet.
+        Returns the new revision, or None when another writer got there first.
+        """
+        revision = (expected_revision or 0) + 1
+        saved = self.backend.set_if(
+            f"session:{session_id}", encode_snapshot(snapshot),
+            f"session:{session_id}:rev",
+            str(expected_revision).encode() if expected_revision is not None else None,
+            str(revision).encode(), self.ttl_seconds
+        )
+        return revision if saved else None
+
+    def delete(self, session_id: str):
+        self.backend.delete(f"session:{session_id}", f"session:{session_id}:rev")
+
+    def delete_if_revision(self, session_id: str, revision: int) -> bool:
+        """Delete the session only if no other writer has moved it past ``revision``"""
+        return self.backend.delete_if(
+            f"session:{session_id}:rev", str(revision).encode(),
+            f"session:{session_id}", f"session:{session_id}:rev"
+        )
+
+    def sweep(self) -> int:
+        """Purge expired snapshots from backends that do not expire keys themselves"""
+        sweep = getattr(self.backend, "sweep", None)
+        return sweep() if sweep else 0
+
+
+def create_session_store(backend_name: str = None) -> Optional[SessionStore]:
+    """Build the store selected by SESSION_BACKEND (sqlite or redis); None for memory
+
+    With one worker the live agents are the only copy needed, so the memory
+    backend keeps no snapshots at all.
+    """
+    name = (backend_name or settings.session_backend).lower()
+    if name == "sqlite":
+        return SessionStore(SQLiteBackend())
+    if name == "redis":
+        return SessionStore(RespClient())
+    if name != "memory":
+        log.warning("Unknown session backend '%s', using memory", name)
+    return None
@@ -0,0 +1,203 @@
+import codecs
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Decompressed text handed to consumers per step when streaming
+STREAM_CHUNK_BYTES = 64 * 1024
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def _compress(raw: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def _decompressed_chunks(codec: str, data: bytes, chunk_bytes: int) -> Iterator[bytes]:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this text")
+        with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+            while True:
+                chunk = reader.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+
+    decompressor = zlib.decompressobj()
+    pending = data
+    while pending:
+        yield decompressor.decompress(pending, chunk_bytes)
+        pending = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+class ResumeTextStore:
+    """Full extracted resume texts, compressed and stored once per distinct content
+
+    Texts are keyed by ``text_digest`` (kept on ResumeData), so the same
+    resume uploaded twice is stored once. Re-parsing and re-matching read
+    text from here instead of extracting the original PDF or DOCX again.
+    Compression is zstd when ``zstandard`` is installed, zlib otherwise;
+    each row records its codec. ``link`` records which stored resume uses
+    which text, and a text is deleted once no resume refers to it.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.resume_text_db_path
+        if self.db_path != ":memory:":
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS resume_texts (
+                digest TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS resume_text_refs (
+                resume_id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_resume_text_refs_digest ON resume_text_refs (digest);
+            """
+        )
+        self._conn.commit()
+
+    def put(self, text: str) -> str:
+        """Store a text unless identical content is already stored; returns its digest"""
+        raw = text.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest in self:
+            return digest
+
+        codec, data = _compress(raw)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO resume_texts (digest, codec, size, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (digest, codec, len(raw), data, time.time())
+                )
+        return digest
+
+    def link(self, resume_id: str, digest: Optional[str]):
+        """Record that a stored resume uses a text, releasing the text it used before"""
+        self.link_many([(resume_id, digest)])
+
+    def link_many(self, links: Iterable[Tuple[str, Optional[str]]]):
+        """``link`` for many resumes in one transaction; a None digest only releases"""
+        with self._lock:
+            with self._conn:
+                released = set()
+                for resume_id, digest in links:
+                    row = self._conn.execute(
+                        "SELECT digest FROM resume_text_refs WHERE resume_id = ?", (resume_id,)
+                    ).fetchone()
+                    if row and row[0] != digest:
+                        released.add(row[0])
+                    if digest:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO resume_text_refs (resume_id, digest) VALUES (?, ?)",
+                            (resume_id, digest)
+                        )
+                    elif row:
+                        self._conn.execute("DELETE FROM resume_text_refs WHERE resume_id = ?", (resume_id,))
+                self._delete_unreferenced(released)
+
+    def release(self, resume_id: str) -> bool:
+        """Forget a deleted resume's text reference; the text goes once nothing refers to it"""
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute(
+                    "SELECT digest FROM resume_text_refs WHERE resume_id = ?", (resume_id,)
+                ).fetchone()
+                if row is None:
+                    return False
+                self._conn.execute("DELETE FROM resume_text_refs WHERE resume_id = ?", (resume_id,))
+                self._delete_unreferenced({row[0]})
+                return True
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM resume_texts WHERE digest = ?", (digest,)
+            ).fetchone() is not None
+
+    def get(self, digest: str) -> Optional[str]:
+        chunks = self.stream(digest)
+        return "".join(chunks) if chunks is not None else None
+
+    def stream(self, digest: str, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Optional[Iterator[str]]:
+        """The text as a lazy sequence of string chunks, or None if it is not stored
+
+        Only the compressed blob is read up front; it is decompressed and
+        decoded one chunk at a time as the consumer advances.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codec, data FROM resume_texts WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+        return self._decode(row[0], row[1], chunk_bytes)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM resume_texts"
+            ).fetchone()
+            references = self._conn.execute("SELECT COUNT(*) FROM resume_text_refs").fetchone()[0]
+        return {
+            "texts": count,
+            "references": references,
+            "text_bytes": size,
+            "stored_bytes": stored,
+            "compression_ratio": round(size / stored, 2) if stored else None,
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resume_texts").fetchone()[0]
+
+    def _delete_unreferenced(self, digests):
+        self._conn.executemany(
+            """DELETE FROM resume_texts WHERE digest = ?
+                   AND NOT EXISTS (SELECT 1 FROM resume_text_refs WHERE digest = ?)""",
+            [(digest, digest) for digest in digests]
+        )
+
+    @staticmethod
+    def _decode(codec: str, data: bytes, chunk_bytes: int) -> Iterator[str]:
+        # Incremental, so a multi-byte character split across chunks decodes intact
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for chunk in _decompressed_chunks(codec, data, chunk_bytes):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
@@ -1,13 +1,15 @@
-import pdfplumber
-from docx import Document
 import tempfile
 import os
 from typing import Optional, Tuple
+from app.utils.metrics import STAGE_SECONDS, ERRORS
 
 class FileProcessor:
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> str:
         """Extract text from PDF file"""
+        # Parsers are imported on first use to keep startup fast
+        import pdfplumber
+        
         text = ""
         try:
             with pdfplumber.open(file_path) as pdf:
@@ -22,6 +24,8 @@ class FileProcessor:
     @staticmethod
     def extract_text_from_docx(file_path: str) -> str:
         """Extract text from DOCX file"""
+        from docx import Document
+        
         text = ""
         try:
             doc = Document(file_path)
@@ -35,11 +39,18 @@ class FileProcessor:
     def extract_text_from_file(file_path: str, file_type: str) -> str:
         """Extract text based on file type"""
         if file_type == "application/pdf":
-            return FileProcessor.extract_text_from_pdf(file_path)
+            extract, stage = FileProcessor.extract_text_from_pdf, "extract_pdf"
         elif file_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            return FileProcessor.extract_text_from_docx(file_path)
+            extract, stage = FileProcessor.extract_text_from_docx, "extract_docx"
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
+        
+        try:
+            with STAGE_SECONDS.time(stage):
+                return extract(file_path)
+        except Exception:
+            ERRORS.inc(stage)
+            raise
     
     @staticmethod
     def save_uploaded_file(uploaded_file, temp_dir: str = None) -> Tuple[str, str]:
@@ -56,8 +67,9 @@ class FileProcessor:
         )
         
         # Write uploaded content
-        content = uploaded_file.file.read()
-        temp_file.write(content)
-        temp_file.close()
+        with STAGE_SECONDS.time("upload_save"):
+            content = uploaded_file.file.read()
+            temp_file.write(content)
+            temp_file.close()
         
         return temp_file.name, uploaded_file.content_type
\ No newline at end of file
@@ -1,10 +1,56 @@
-import google.generativeai as genai
+import logging
 import json
 from typing import Dict, Any, List
 from app.models.schemas import ResumeData
 from app.config import settings
+from app.utils.metrics import GEMINI_SECONDS, FALLBACKS, ERRORS, model_name
 import re
 
+log = logging.getLogger(__name__)
+
+# ResumeData as described to Gemini; partial parses send a subset of the keys
+RESUME_JSON_SCHEMA = {
+    "name": "string",
+    "email": "string or null",
+    "phone": "string or null",
+    "skills": ["list", "of", "strings"],
+    "experience": [
+        {
+            "title": "string",
+            "company": "string",
+            "start_date": "string or null",
+            "end_date": "string or null",
+            "description": "string or null",
+            "location": "string or null"
+        }
+    ],
+    "education": [
+        {
+            "degree": "string",
+            "institution": "string",
+            "field_of_study": "string or null",
+            "start_date": "string or null",
+            "end_date": "string or null",
+            "gpa": "number or null"
+        }
+    ],
+    "summary": "string or null"
+}
+
+def configure_gemini():
+    """Point the Gemini SDK at the API, or at GEMINI_API_ENDPOINT when set"""
+    # Imported on first use: the SDK is most of the app's import time
+    import google.generativeai as genai
+    
+    if settings.gemini_api_endpoint:
+        genai.configure(
+            api_key=settings.gemini_api_key,
+            transport="rest",
+            client_options={"api_endpoint": settings.gemini_api_endpoint}
+        )
+    else:
+        genai.configure(api_key=settings.gemini_api_key)
+
 class LLMClient:
     def __init__(self):
         self.api_key = settings.gemini_api_key
@@ -13,7 +59,8 @@ class LLMClient:
             raise ValueError("Gemini API key is not configured")
         
         # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        configure_gemini()
+        import google.generativeai as genai
         
         # Available models from your list
         # Use gemini-2.0-flash (fast and reliable)
@@ -40,16 +87,17 @@ class LLMClient:
                 generation_config=generation_config,
                 safety_settings=safety_settings
             )
-            print(f"[LLMClient] Initialized with {self.model_name}")
+            log.info("Initialized with %s", self.model_name)
             
             # Test the model
             test_response = self.model.generate_content("test")
-            print("[LLMClient] Model test successful")
+            log.info("Model test successful")
             
         except Exception as e:
-            print(f"[LLMClient] Failed to initialize {self.model_name}: {e}")
+            log.warning("Failed to initialize %s: %s", self.model_name, e)
             
             # Fallback to gemini-2.5-flash
+            FALLBACKS.inc("gemini_model")
             try:
                 self.model_name = "models/gemini-2.5-flash"
                 self.model = genai.GenerativeModel(
@@ -57,9 +105,9 @@ class LLMClient:
                     generation_config=generation_config,
                     safety_settings=safety_settings
                 )
-                print(f"[LLMClient] Fallback to {self.model_name}")
+                log.info("Fallback to %s", self.model_name)
             except Exception as e2:
-                print(f"[LLMClient] All models failed: {e2}")
+                log.error("All models failed: %s", e2)
                 raise ValueError("Could not initialize any Gemini model")
     
     def parse_resume(self, resume_text: str) -> ResumeData:
@@ -68,40 +116,12 @@ class LLMClient:
         system_prompt = """You are an expert resume parser. Extract structured information from resume text.
         Return ONLY a valid JSON object matching the schema below. No explanations, no markdown formatting."""
         
-        json_schema = {
-            "name": "string",
-            "email": "string or null",
-            "phone": "string or null",
-            "skills": ["list", "of", "strings"],
-            "experience": [
-                {
-                    "title": "string",
-                    "company": "string",
-                    "start_date": "string or null",
-                    "end_date": "string or null",
-                    "description": "string or null",
-                    "location": "string or null"
-                }
-            ],
-            "education": [
-                {
-                    "degree": "string",
-                    "institution": "string",
-                    "field_of_study": "string or null",
-                    "start_date": "string or null",
-                    "end_date": "string or null",
-                    "gpa": "number or null"
-                }
-            ],
-            "summary": "string or null"
-        }
-        
         user_prompt = f"""Parse this resume text and extract information:
         
         {resume_text[:3000]}
         
         Return ONLY a JSON object matching this exact schema:
-        {json.dumps(json_schema, indent=2)}
+        {json.dumps(RESUME_JSON_SCHEMA, indent=2)}
         
         Important:
         1. If information is missing, use null
@@ -111,13 +131,14 @@ class LLMClient:
         5. Return ONLY the JSON, no other text"""
         
         try:
-            print(f"[LLMClient] Parsing resume with {self.model_name}...")
+            log.debug("Parsing resume with %s", self.model_name)
             
             # Combine prompts
             full_prompt = f"{system_prompt}\n\n{user_prompt}"
             
-            response = self.model.generate_content(full_prompt)
-            response_text = response.text
+            with GEMINI_SECONDS.time(model_name(self.model), "parse_resume"):
+                response = self.model.generate_content(full_prompt)
+                response_text = response.text
             
             # Extract JSON from response
             json_str = self._extract_json(response_text)
@@ -128,13 +149,50 @@ class LLMClient:
             parsed_data = json.loads(json_str)
             parsed_data['raw_text'] = resume_text[:1000]
             
-            print(f"[LLMClient] Successfully parsed resume")
+            log.debug("Successfully parsed resume")
             return ResumeData(**parsed_data)
             
         except Exception as e:
-            print(f"[LLMClient] Error parsing resume: {str(e)}")
+            ERRORS.inc("parse_resume")
+            log.warning("Error parsing resume: %s", e)
             raise Exception(f"Failed to parse resume: {str(e)}")
     
+    def parse_resume_fields(self, section_text: str, fields: List[str]) -> Dict[str, Any]:
+        """Extract only some ResumeData fields from a few resume sections, for incremental re-parsing"""
+        schema = {field: RESUME_JSON_SCHEMA[field] for field in fields}
+        prompt = f"""You are an expert resume parser. These are some sections of a resume, not the whole resume.
+        Return ONLY a valid JSON object matching the schema below. No explanations, no markdown formatting.
+        
+        {section_text[:3000]}
+        
+        Schema:
+        {json.dumps(schema, indent=2)}
+        
+        Important:
+        1. If information is missing, use null (or an empty list)
+        2. Dates in YYYY-MM format when possible
+        3. Extract ALL skills mentioned in these sections
+        4. Return ONLY the JSON, no other text"""
+        
+        try:
+            log.debug("Parsing resume fields %s with %s", ", ".join(fields), self.model_name)
+            
+            with GEMINI_SECONDS.time(model_name(self.model), "parse_resume_fields"):
+                response = self.model.generate_content(prompt)
+                response_text = response.text
+            
+            json_str = self._extract_json(response_text)
+            if not json_str:
+                raise ValueError("Could not extract JSON from response")
+            
+            parsed = json.loads(json_str)
+            return {field: parsed.get(field) for field in fields}
+            
+        except Exception as e:
+            ERRORS.inc("parse_resume_fields")
+            log.warning("Error parsing resume fields: %s", e)
+            raise Exception(f"Failed to parse resume sections: {str(e)}")
+    
     def _extract_json(self, text: str) -> str:
         """Extract JSON from Gemini response"""
         text = text.strip()
@@ -192,8 +250,9 @@ Return ONLY JSON with this format:
 }}"""
         
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text
+            with GEMINI_SECONDS.time(model_name(self.model), "search_query"):
+                response = self.model.generate_content(prompt)
+                response_text = response.text
             
             json_str = self._extract_json(response_text)
             if json_str:
@@ -202,7 +261,8 @@ Return ONLY JSON with this format:
                 raise ValueError("Could not extract JSON")
                 
         except Exception as e:
-            print(f"[LLMClient] Error generating job query: {str(e)}")
+            log.warning("Error generating job query: %s", e)
+            FALLBACKS.inc("default_search_query")
             return {
                 "keywords": resume_data.skills[:5],
                 "job_titles": ["Software Engineer", "Developer", "Full Stack Developer"],
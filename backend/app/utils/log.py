@@ -0,0 +1,198 @@
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+from app.utils.metrics import registry as metrics_registry
+from app.utils.serialization import dumps_json
+
+# Set per request by RequestContextMiddleware / bind_session; copied into
+# threadpool calls, so records from sync endpoints and services carry them too
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+session_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("session_id", default=None)
+
+LOG_DROPPED = metrics_registry.counter(
+    "log_records_dropped_total", "Log records discarded because the log queue was full", ["level"]
+)
+
+# Attributes every LogRecord has; anything else was passed via ``extra=`` and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the current request and session IDs"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep one in ``every`` DEBUG records per call site; other levels always pass"""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        # Unsynchronized on purpose: a lost increment only shifts which line is kept
+        key = (record.pathname, record.lineno)
+        count = self._seen.get(key, 0)
+        self._seen[key] = count + 1
+        return count % self.every == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the listener thread; never blocks, drops when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve arguments and tracebacks now, since they may change before the
+        # listener gets to them; leave the (costlier) formatting to the listener.
+        # This is the only handler, so the record can be modified in place.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc(record.levelname)
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line, or a readable line with the same fields as key=value"""
+
+    def __init__(self, json_output: bool = True):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "session_id"):
+            if getattr(record, key, None):
+                fields[key] = getattr(record, key)
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in fields and key not in ("request_id", "session_id"):
+                fields[key] = value
+        if record.exc_text:
+            fields["exc"] = record.exc_text
+
+        if self.json_output:
+            try:
+                return dumps_json(fields).decode()
+            except TypeError:
+                return json.dumps(fields, default=str)
+
+        exc = fields.pop("exc", None)
+        head = f"{fields.pop('ts')} {fields.pop('level'):<7} {fields.pop('logger')}: {fields.pop('msg')}"
+        line = head + "".join(f" {key}={value}" for key, value in fields.items())
+        return f"{line}\n{exc}" if exc else line
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging():
+    """Route the app's loggers through a bounded queue drained by a background thread
+
+    Safe to call more than once. The root logger stays at WARNING so chatty
+    libraries do not flood the queue; ``app.*`` loggers use LOG_LEVEL.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    sink = logging.StreamHandler(sys.stdout)
+    sink.setFormatter(StructuredFormatter(json_output=settings.log_format == "json"))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(DebugSampler(settings.log_debug_sample_every))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.WARNING)
+    logging.getLogger("app").setLevel(settings.log_level.upper())
+
+    _listener = QueueListener(handler.queue, sink)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+async def bind_session(connection: HTTPConnection):
+    """Route dependency: tag records in this request with its ``session_id`` path parameter"""
+    session_id = connection.path_params.get("session_id")
+    if session_id:
+        session_id_var.set(session_id)
+
+
+class RequestContextMiddleware:
+    """ASGI middleware giving each request an ID (or honouring X-Request-ID) and logging its outcome"""
+
+    def __init__(self, app):
+        self.app = app
+        self.log = logging.getLogger("app.access")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if scope["type"] == "http":
+                self.log.info(
+                    "%s %s %s", scope["method"], scope["path"], status[0],
+                    extra={"status": status[0], "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+                )
+            request_id_var.reset(token)
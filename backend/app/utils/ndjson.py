@@ -0,0 +1,162 @@
+"""Streaming NDJSON (one JSON document per line) for bulk export and import
+
+Both directions hold at most one chunk of records in memory, so millions
+of records move through a single request without being loaded at once.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.models.schemas import NdjsonImportError, NdjsonImportResult
+from app.utils.serialization import dumps_json, loads_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Export lines are written in blocks of about this size rather than one send per record
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Records validated and stored together; one store call (one transaction) per chunk
+IMPORT_CHUNK_SIZE = 500
+
+# A longer line is reported and skipped, so one bad record cannot exhaust memory
+MAX_LINE_BYTES = 1024 * 1024
+
+# Failures listed in an import report; the counts still cover every one
+MAX_REPORTED_ERRORS = 100
+
+# Receives (line number, raw object, validated model) for every valid line of a chunk
+ChunkStore = Callable[[List[Tuple[int, Dict[str, Any], BaseModel]]], None]
+
+
+def encode_ndjson(records: Iterable[Any], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Encode records lazily, one JSON document per line, yielding blocks of lines"""
+    buffer = bytearray()
+    for record in records:
+        buffer += dumps_json(record)
+        buffer += b"\n"
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes],
+                            max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """(line number, line) for every non-blank line of a byte stream
+
+    A line longer than ``max_line_bytes`` is yielded as None once it ends;
+    its bytes are dropped as they arrive instead of being buffered.
+    """
+    buffer = bytearray()
+    line_number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if not oversized:
+                buffer += piece
+                if len(buffer) > max_line_bytes:
+                    oversized = True
+                    buffer.clear()
+            if end < 0:
+                break
+
+            line_number += 1
+            if oversized:
+                yield line_number, None
+            elif buffer.strip():
+                yield line_number, bytes(buffer)
+            buffer.clear()
+            oversized = False
+            start = end + 1
+
+    # The last line may have no trailing newline
+    if oversized or buffer.strip():
+        yield line_number + 1, None if oversized else bytes(buffer)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}"
+        for detail in error.errors()[:3]
+    )
+
+
+class ImportReport:
+    """Counts of imported and failed records, with the first few failures by line number"""
+
+    def __init__(self, max_errors: int = MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[NdjsonImportError] = []
+
+    def fail(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(NdjsonImportError.model_construct(line=line, error=error))
+
+    def to_model(self) -> NdjsonImportResult:
+        return NdjsonImportResult.model_construct(
+            imported=self.imported,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors)
+        )
+
+
+def _import_chunk(lines: List[Tuple[int, Optional[bytes]]], model: Type[BaseModel],
+                  store: ChunkStore, report: ImportReport):
+    """Decode, validate and store one chunk; runs in the threadpool"""
+    valid = []
+    for line_number, line in lines:
+        if line is None:
+            report.fail(line_number, f"Line longer than {MAX_LINE_BYTES} bytes")
+            continue
+        try:
+            raw = loads_json(line)
+        except ValueError as e:
+            report.fail(line_number, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(raw, dict):
+            report.fail(line_number, "Expected a JSON object")
+            continue
+        try:
+            valid.append((line_number, raw, model.model_validate(raw)))
+        except ValidationError as e:
+            report.fail(line_number, _validation_message(e))
+
+    if not valid:
+        return
+    try:
+        store(valid)
+    except Exception as e:
+        # The store writes a chunk in one transaction, so none of it was kept
+        for line_number, _, _ in valid:
+            report.fail(line_number, f"Could not store record: {e}")
+        return
+    report.imported += len(valid)
+
+
+async def import_ndjson(chunks: AsyncIterator[bytes], model: Type[BaseModel], store: ChunkStore,
+                        chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Validate an NDJSON stream against ``model`` and store it chunk by chunk
+
+    Invalid lines are reported and skipped; the rest of the stream is still
+    imported.
+    """
+    report = ImportReport()
+    pending: List[Tuple[int, Optional[bytes]]] = []
+    async for line in iter_ndjson_lines(chunks):
+        pending.append(line)
+        if len(pending) >= chunk_size:
+            await run_in_threadpool(_import_chunk, pending, model, store, report)
+            pending = []
+    if pending:
+        await run_in_threadpool(_import_chunk, pending, model, store, report)
+    return report
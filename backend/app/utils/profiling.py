@@ -0,0 +1,252 @@
+import cProfile
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+from app.config import settings
+from app.utils.log import request_id_var
+from app.utils.serialization import dumps_json, loads_json
+
+log = logging.getLogger(__name__)
+
+MODES = ("sample", "cprofile")
+SAFE_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Leaf frames of threads that are waiting, not working; sampled stacks ending here are skipped
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class StackSampler:
+    """Samples every other thread's Python stack on a fixed interval into collapsed-stack counts
+
+    Output is one ``thread;frame;frame... count`` line per distinct stack, the
+    format flamegraph.pl and speedscope read. Threads serving other requests
+    during the window are sampled too; each stack starts with its thread name
+    so they can be told apart.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Recent profiles on disk, one data file plus a JSON metadata sidecar per request ID"""
+
+    def __init__(self, directory: str = None, keep: int = None):
+        self.directory = directory or settings.profile_dir
+        self.keep = keep or settings.profile_keep
+        self._lock = threading.Lock()
+
+    def save(self, request_id: str, mode: str, data: bytes, meta: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{request_id}.{'collapsed' if mode == 'sample' else 'prof'}"
+        meta = dict(meta, request_id=request_id, mode=mode, filename=filename, size=len(data),
+                    created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        with self._lock:
+            with open(os.path.join(self.directory, filename), "wb") as f:
+                f.write(data)
+            with open(os.path.join(self.directory, f"{request_id}.json"), "wb") as f:
+                f.write(dumps_json(meta))
+            self._prune()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of stored profiles, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    entries.append(loads_json(f.read()))
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+    def path(self, request_id: str) -> Optional[str]:
+        for entry in self.list():
+            if entry["request_id"] == request_id:
+                return os.path.join(self.directory, entry["filename"])
+        return None
+
+    def _prune(self):
+        for entry in self.list()[self.keep:]:
+            for name in (entry["filename"], f"{entry['request_id']}.json"):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+class Profiler:
+    """Decides which requests to profile and runs one profile at a time
+
+    A request is profiled when it carries ``X-Profile: sample|cprofile`` (and
+    ``X-Profile-Token`` when PROFILING_TOKEN is set), or when the admin toggle
+    has armed the next N requests. ``cprofile`` traces every call on the event
+    loop thread, which covers async endpoints and the blocking work they do
+    inline; ``sample`` also sees work handed to the threadpool.
+    """
+
+    def __init__(self, store: ProfileStore = None):
+        self.store = store or ProfileStore()
+        self._lock = threading.Lock()
+        self._busy = False
+        self._armed = 0
+        self._armed_mode = "sample"
+        self._armed_prefix = ""
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return not settings.profiling_token or token == settings.profiling_token
+
+    def arm(self, count: int, mode: str = "sample", path_prefix: str = ""):
+        with self._lock:
+            self._armed = count
+            self._armed_mode = mode
+            self._armed_prefix = path_prefix
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"armed": self._armed, "mode": self._armed_mode, "path_prefix": self._armed_prefix,
+                    "busy": self._busy, "stored": len(self.store.list())}
+
+    def acquire(self, path: str, requested: Optional[str]) -> Optional[str]:
+        """Mode to profile this request with, or None; at most one profile runs at a time"""
+        with self._lock:
+            if self._busy:
+                return None
+            mode = requested
+            if mode is None and self._armed > 0 and path.startswith(self._armed_prefix):
+                self._armed -= 1
+                mode = self._armed_mode
+            if mode is None:
+                return None
+            self._busy = True
+            return mode
+
+    def release(self):
+        with self._lock:
+            self._busy = False
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles opted-in requests; only installed when PROFILING_ENABLED is set"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = token = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-profile":
+                requested = value.decode("latin-1").strip().lower()
+            elif name == b"x-profile-token":
+                token = value.decode("latin-1")
+        if requested is not None and (requested not in MODES or not profiler.authorized(token)):
+            requested = None
+
+        mode = profiler.acquire(scope["path"], requested)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The ID names files on disk; a client-supplied X-Request-ID is only used when it is safe
+        request_id = request_id_var.get()
+        if not request_id or not SAFE_ID.fullmatch(request_id):
+            request_id = os.urandom(8).hex()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        sampler = tracer = None
+        if mode == "sample":
+            sampler = StackSampler(settings.profile_sample_interval_ms / 1000)
+            sampler.start()
+        else:
+            tracer = cProfile.Profile()
+            tracer.enable()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            try:
+                if sampler is not None:
+                    sampler.stop()
+                    data, extra = sampler.collapsed().encode(), {"samples": sampler.samples}
+                else:
+                    tracer.disable()
+                    data, extra = _pstats_bytes(tracer), {}
+                profiler.store.save(request_id, mode, data, dict(
+                    extra, method=scope["method"], path=scope["path"], status=status[0],
+                    duration_ms=round(duration * 1000, 1)
+                ))
+                log.info("Saved %s profile for %s %s", mode, scope["method"], scope["path"],
+                         extra={"profile_id": request_id, "duration_ms": round(duration * 1000, 1)})
+            except Exception:
+                log.exception("Saving profile %s failed", request_id)
+            finally:
+                profiler.release()
+
+
+def _pstats_bytes(tracer: cProfile.Profile) -> bytes:
+    """Serialized stats in the .prof format pstats, snakeviz and flameprof load"""
+    tracer.create_stats()
+    return marshal.dumps(tracer.stats)
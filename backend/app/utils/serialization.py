@@ -0,0 +1,73 @@
+import json
+import zlib
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Leading byte of packed blobs, naming the encoding under the zlib layer
+_MSGPACK_TAG = b"M"
+_JSON_TAG = b"J"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def pack(obj: Any, level: int = 1) -> bytes:
+    """Compressed binary encoding for snapshots and caches (msgpack, else JSON)"""
+    if msgpack is not None:
+        return _MSGPACK_TAG + zlib.compress(msgpack.packb(obj, use_bin_type=True, default=_default), level)
+    return _JSON_TAG + zlib.compress(dumps_json(obj), level)
+
+
+def unpack(data: bytes) -> Any:
+    """Decode anything written by pack"""
+    tag = data[:1]
+    if tag == _MSGPACK_TAG:
+        if msgpack is None:
+            raise RuntimeError("msgpack is required to read this snapshot")
+        return msgpack.unpackb(zlib.decompress(data[1:]), raw=False, strict_map_key=False)
+    if tag == _JSON_TAG:
+        return loads_json(zlib.decompress(data[1:]))
+    raise ValueError(f"Unknown packed encoding {tag!r}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that serializes pydantic models directly, skipping FastAPI's encoder
+
+    Return ``FastJSONResponse(model)`` from an endpoint for models built from
+    data the app already validated (``model_construct``); FastAPI then neither
+    re-validates it against ``response_model`` nor walks it with
+    ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return dumps_json(content)
@@ -0,0 +1,59 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Any, Sequence
+
+log = logging.getLogger(__name__)
+
+# Imported on first use rather than by app.main; together they are most of a cold import
+HEAVY_MODULES = ("google.generativeai", "tavily", "pdfplumber", "docx", "numpy")
+
+
+class StartupTimer:
+    """Milestones since app.main started importing, and how long each background preload took"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.preloaded: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        elapsed = round((time.perf_counter() - self.started) * 1000, 1)
+        self.marks[name] = elapsed
+        return elapsed
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "marks_ms": dict(self.marks),
+            "preloaded_ms": dict(self.preloaded),
+            "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+        }
+
+
+startup = StartupTimer()
+
+
+def preload_heavy_modules(modules: Sequence[str] = HEAVY_MODULES) -> threading.Thread:
+    """Import heavy modules on a background thread so the first request does not pay for them
+
+    A request that needs a module before its preload finishes simply waits on
+    the import lock for the rest of that one import.
+    """
+    def run():
+        for name in modules:
+            if name in sys.modules:
+                continue
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                log.warning("Could not preload %s: %s", name, e)
+                continue
+            startup.preloaded[name] = round((time.perf_counter() - start) * 1000, 1)
+        log.info("Preloaded heavy modules", extra={"duration_ms": startup.mark("preloaded")})
+
+    thread = threading.Thread(target=run, name="module-preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,56 @@
+"""Recruiter-side matching: one job description against a CandidateIndex of 100k resumes
+
+The matching endpoint targets well under a second at this size.
+"""
+import random
+import time
+
+from app.models.schemas import ResumeData, Experience
+from app.services.candidate_index import CandidateIndex
+
+from benchmarks.corpus import SKILLS, TITLES, COMPANIES
+from benchmarks.harness import benchmark
+
+CANDIDATES = 100_000
+
+# Well under a second per match at 100k candidates
+MAX_MATCH_SECONDS = 0.5
+
+# Long-tail skills so the vocabulary looks like real resumes, not just the common stack
+RARE_SKILLS = [f"Framework{i}" for i in range(2000)]
+
+JOB_DESCRIPTION = (
+    "We are hiring a Senior Backend Engineer with 5+ years of experience in Python, FastAPI and "
+    "PostgreSQL. You will run services on Kubernetes in AWS, stream events through Kafka and keep "
+    "Redis caches fast. Terraform, Docker and CI/CD experience is a plus; Framework17 is nice to have."
+)
+
+
+def candidate_index(count: int = CANDIDATES, seed: int = 5) -> CandidateIndex:
+    rng = random.Random(seed)
+    index = CandidateIndex()
+    for i in range(count):
+        start_year = rng.randint(2005, 2022)
+        index.add(ResumeData.model_construct(
+            name=f"Candidate {i}",
+            email=f"candidate{i}@example.com",
+            skills=rng.sample(SKILLS, rng.randint(5, 15)) + rng.sample(RARE_SKILLS, 2),
+            experience=[Experience.model_construct(
+                title=rng.choice(TITLES), company=rng.choice(COMPANIES),
+                start_date=f"{start_year}-01", end_date="Present", description=None, location=None
+            )],
+            education=[],
+        ), f"c{i}")
+    return index
+
+
+@benchmark("candidate_index.match[100k]")
+def match_100k():
+    index = candidate_index()
+    start = time.perf_counter()
+    matches, required = index.match(JOB_DESCRIPTION, top_n=20)
+    elapsed = time.perf_counter() - start
+    assert len(matches) == 20 and "python" in required, "expected 20 ranked candidates"
+    # The first match also compiles the skill matcher, so this bounds the worst case
+    assert elapsed < MAX_MATCH_SECONDS, f"match took {elapsed:.2f}s, target is under {MAX_MATCH_SECONDS}s"
+    return lambda: index.match(JOB_DESCRIPTION, top_n=20)
@@ -0,0 +1,40 @@
+"""FileProcessor text extraction over generated PDFs and DOCX files of 1, 3 and 10 pages, and reading it back stored"""
+from app.services.text_store import ResumeTextStore
+from app.utils.file_processor import FileProcessor
+
+from benchmarks.corpus import resume_file, page_marker
+from benchmarks.harness import benchmark
+
+PAGE_COUNTS = (1, 3, 10)
+
+
+def _checked(extract, path: str, pages: int):
+    text = extract(path)
+    missing = [page for page in range(pages) if page_marker(page) not in text]
+    assert not missing, f"{path}: no text extracted for pages {missing}"
+    return lambda: extract(path)
+
+
+def _register(kind: str, extract, pages: int):
+    # File I/O and parsing libraries make these noisier than pure-Python benchmarks
+    @benchmark(f"extract_{kind}[{pages}p]", threshold=0.4)
+    def setup():
+        return _checked(extract, resume_file(kind, pages), pages)
+
+
+for _pages in PAGE_COUNTS:
+    _register("pdf", FileProcessor.extract_text_from_pdf, _pages)
+    _register("docx", FileProcessor.extract_text_from_docx, _pages)
+
+
+def _register_stored(pages: int):
+    # The same text read back from the resume text store, as re-parsing does
+    @benchmark(f"stored_text[{pages}p]")
+    def setup():
+        store = ResumeTextStore(":memory:")
+        digest = store.put(FileProcessor.extract_text_from_pdf(resume_file("pdf", pages)))
+        return _checked(lambda _: store.get(digest), digest, pages)
+
+
+for _pages in PAGE_COUNTS:
+    _register_stored(_pages)
@@ -0,0 +1,28 @@
+"""LLMClient._extract_json on fenced, unfenced, prose-wrapped and invalid Gemini output"""
+import json
+
+from app.utils.llm_client import LLMClient
+
+from benchmarks.corpus import gemini_outputs
+from benchmarks.harness import benchmark
+
+
+def _client() -> LLMClient:
+    # _extract_json uses no instance state; skip __init__, which calls the Gemini API
+    return LLMClient.__new__(LLMClient)
+
+
+def _register(label: str, text: str):
+    @benchmark(f"extract_json[{label}]")
+    def setup():
+        client = _client()
+        extracted = client._extract_json(text)
+        if label == "invalid":
+            assert extracted == "", "invalid output should yield no JSON"
+        else:
+            assert json.loads(extracted)["name"] == "Jane Doe", f"{label}: wrong JSON extracted"
+        return lambda: client._extract_json(text)
+
+
+for _label, _text in gemini_outputs().items():
+    _register(_label, _text)
@@ -0,0 +1,58 @@
+"""Cost of a log call through the queue handler with a fast sink and a sink far slower than the callers"""
+import logging
+import queue
+import time
+from logging.handlers import QueueListener
+
+from app.utils.log import ContextFilter, DebugSampler, DroppingQueueHandler, StructuredFormatter
+
+from benchmarks.harness import benchmark
+
+
+class _Sink(logging.Handler):
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.setFormatter(StructuredFormatter(json_output=True))
+
+    def emit(self, record):
+        self.format(record)
+        if self.delay:
+            time.sleep(self.delay)
+
+
+def _logger(label: str, delay: float, level: int) -> logging.Logger:
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1000))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(DebugSampler(20))
+    # Listener thread is a daemon; it is left running for the rest of the process
+    QueueListener(handler.queue, _Sink(delay)).start()
+
+    logger = logging.getLogger(f"benchmarks.logging.{label}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+# Calls contend with the listener thread for the GIL, so timings vary more than
+# single-threaded benchmarks; the point is that the slow sink is no slower
+NOISY_THRESHOLD = 1.0
+
+
+def _register(label: str, delay: float):
+    @benchmark(f"log_info[{label}]", threshold=NOISY_THRESHOLD)
+    def setup():
+        logger = _logger(label, delay, logging.INFO)
+        return lambda: logger.info("Fetching up to %d results for: %s", 20, "senior python engineer",
+                                   extra={"stage": "tavily_search"})
+
+
+_register("fast_sink", 0.0)
+_register("slow_sink_10ms", 0.01)
+
+
+@benchmark("log_debug[sampled]", threshold=NOISY_THRESHOLD)
+def debug_sampled():
+    logger = _logger("sampled", 0.0, logging.DEBUG)
+    return lambda: logger.debug("Searching for: %s", "senior python engineer")
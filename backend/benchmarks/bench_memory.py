@@ -0,0 +1,91 @@
+"""Resident memory of a session's resume: pydantic models as sessions held them vs. the compact form
+
+Run directly for the per-session byte counts:
+
+    python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from app.models.schemas import ResumeData
+from app.services.compact_resume import CompactResume
+from app.services.resume_profile import ResumeProfile, SkillMatcher
+from app.utils.serialization import dumps_json, loads_json
+
+from benchmarks.corpus import parsed_resume_json
+from benchmarks.harness import benchmark
+
+SESSIONS = 1000
+
+# The compact form must at least halve what a session keeps resident
+MAX_RATIO = 0.5
+
+
+def _uploads(count: int = SESSIONS) -> List[bytes]:
+    # Each session's resume arrives as its own JSON, so no strings are shared up front
+    uploads = []
+    for seed in range(count):
+        data = parsed_resume_json(seed=seed)
+        data["raw_text"] = " ".join([data["summary"]] * 14)[:1000]
+        uploads.append(dumps_json(data))
+    return uploads
+
+
+def _pydantic_session(upload: bytes):
+    """What a session held before: the model plus per-session profile lists, set and matcher"""
+    resume = ResumeData(**loads_json(upload))
+    profile = ResumeProfile.from_resume(resume)
+    skills, canonical = list(profile.skills), list(profile.canonical_skills)
+    return resume, skills, canonical, set(canonical), SkillMatcher(canonical)
+
+
+def _compact_session(upload: bytes):
+    resume = CompactResume.from_resume_data(ResumeData(**loads_json(upload)))
+    return resume, ResumeProfile.from_resume(resume)
+
+
+def resident_bytes(build: Callable[[bytes], Any], uploads: List[bytes]) -> float:
+    """Bytes still allocated per session once every session is built"""
+    # Warm the shared vocabulary and regex caches so only per-session cost is counted
+    build(uploads[0])
+    gc.collect()
+    tracemalloc.start()
+    try:
+        sessions = [build(upload) for upload in uploads]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del sessions
+    return current / len(uploads)
+
+
+def report(count: int = SESSIONS) -> Dict[str, float]:
+    uploads = _uploads(count)
+    before = resident_bytes(_pydantic_session, uploads)
+    after = resident_bytes(_compact_session, uploads)
+    return {"pydantic_bytes": round(before), "compact_bytes": round(after), "ratio": round(after / before, 3)}
+
+
+@benchmark("resume_compact[from_resume_data]")
+def compact_resume():
+    sizes = report(200)
+    assert sizes["ratio"] <= MAX_RATIO, f"compact resume keeps {sizes['ratio']:.0%} of the pydantic size"
+
+    resume = ResumeData(**parsed_resume_json())
+    compact = CompactResume.from_resume_data(resume)
+    assert compact.to_resume_data() == resume
+    return lambda: CompactResume.from_resume_data(resume)
+
+
+@benchmark("resume_compact[to_resume_data]")
+def materialize_resume():
+    compact = CompactResume.from_resume_data(ResumeData(**parsed_resume_json()))
+    return compact.to_resume_data
+
+
+if __name__ == "__main__":
+    sizes = report()
+    print(f"per session, {SESSIONS} sessions: pydantic {sizes['pydantic_bytes']} B, "
+          f"compact {sizes['compact_bytes']} B ({sizes['ratio']:.0%})")
@@ -0,0 +1,56 @@
+"""Match scoring of single results and _process_search_results at increasing scale"""
+from app.config import settings
+from app.models.schemas import ResumeData
+from app.services.job_dedup import JobDeduplicator, SignatureStore
+from app.services.job_search import JobSearchService
+from app.services.resume_profile import ResumeProfile
+
+from benchmarks.corpus import parsed_resume_json, search_results
+from benchmarks.harness import benchmark
+
+RESULT_COUNTS = (20, 200, 2000)
+
+
+def offline_search_service() -> JobSearchService:
+    """Search service with no Tavily client and an in-memory dedup index"""
+    settings.tavily_api_key = None
+    service = JobSearchService()
+    service.deduplicator = JobDeduplicator(SignatureStore(":memory:"))
+    return service
+
+
+def _resume() -> ResumeData:
+    return ResumeData(**parsed_resume_json())
+
+
+@benchmark("match_score[profile]")
+def match_score_with_profile():
+    service, resume = offline_search_service(), _resume()
+    profile = ResumeProfile.from_resume(resume)
+    result = search_results(1)[0]
+    score = service._calculate_match_score(result, resume, profile)
+    assert 0.0 <= score <= 1.0
+    return lambda: service._calculate_match_score(result, resume, profile)
+
+
+@benchmark("match_score[no_profile]")
+def match_score_without_profile():
+    # Ad-hoc callers without a session profile pay for building one per call
+    service, resume = offline_search_service(), _resume()
+    result = search_results(1)[0]
+    return lambda: service._calculate_match_score(result, resume)
+
+
+def _register(count: int):
+    @benchmark(f"process_search_results[{count}]")
+    def setup():
+        service, resume = offline_search_service(), _resume()
+        profile = ResumeProfile.from_resume(resume)
+        results = search_results(count)
+        listings = service._process_search_results(results, resume, limit=None, profile=profile)
+        assert listings and len(listings) < count, "expected syndicated duplicates to be collapsed"
+        return lambda: service._process_search_results(results, resume, limit=None, profile=profile)
+
+
+for _count in RESULT_COUNTS:
+    _register(_count)
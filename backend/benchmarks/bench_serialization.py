@@ -0,0 +1,155 @@
+"""Per-request CPU of the default FastAPI response path vs the fast serialization path
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import time
+import zlib
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.schemas import ChatResponse, JobListing, ResumeData, ResumeParseResponse
+from app.utils.serialization import FastJSONResponse, pack, unpack, orjson, msgpack
+
+
+def sample_resume() -> ResumeData:
+    return ResumeData(
+        name="Jane Doe",
+        email="jane@example.com",
+        phone="+1 555 0100",
+        skills=[f"skill-{i}" for i in range(30)],
+        experience=[
+            {
+                "title": f"Engineer {i}",
+                "company": f"Company {i}",
+                "start_date": f"20{10 + i}-01",
+                "end_date": f"20{11 + i}-06",
+                "description": "Built and operated services in Python and Go. " * 6,
+                "location": "Berlin",
+            }
+            for i in range(5)
+        ],
+        education=[{"degree": "BSc", "institution": "TU Berlin", "field_of_study": "CS", "gpa": 3.7}],
+        summary="Backend engineer focused on data-heavy APIs. " * 4,
+        raw_text="x" * 1000,
+    )
+
+
+def sample_jobs(count: int) -> list:
+    return [
+        JobListing(
+            title=f"Senior Python Developer {i}",
+            company=f"Company {i}",
+            location="Remote",
+            url=f"https://jobs.example.com/{i}",
+            description="Work on distributed systems with Python, FastAPI and PostgreSQL. " * 5,
+            posted_date="2025-01-15",
+            salary="$120k - $150k",
+            match_score=0.8,
+            job_type="full time",
+            seniority="senior",
+        )
+        for i in range(count)
+    ]
+
+
+def sample_chat_response() -> dict:
+    jobs = sample_jobs(5)
+    return {
+        "message": "Here are some jobs for you. " * 80,
+        "job_suggestions": jobs,
+        "requires_input": False,
+        "next_cursor": "YWJjOjU",
+    }
+
+
+def sample_snapshot(resume: ResumeData) -> dict:
+    """Same shape as ChatAgent.to_snapshot with a 20-listing result set"""
+    return {
+        "resume_data": resume.model_dump(),
+        "memory": {
+            "summary": "User asked: remote python jobs; senior roles in Berlin.",
+            "total_turns": 10,
+            "recent": [["u" if i % 2 else "a", "Some chat text about jobs. " * 8] for i in range(10)],
+        },
+        "result_set": {
+            "root": {
+                "set_id": "0123456789ab",
+                "query_params": {"location": "Remote"},
+                "listings": [job.model_dump() for job in sample_jobs(20)],
+                "seen_clusters": list(range(20)),
+                "requested": 20,
+                "exhausted": False,
+            }
+        },
+        "prefetched": None,
+        "next_cursor": "YWJjOjU",
+        "jobs_shown": 5,
+    }
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def fastapi_path(model_cls, build):
+    """What an endpoint returning a model with response_model= costs"""
+    field = create_response_field("response", model_cls)
+
+    def run():
+        # serialize_response never awaits here; drive it without event loop overhead
+        coroutine = serialize_response(field=field, response_content=build())
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return JSONResponse(done.value).body
+        raise RuntimeError("serialize_response suspended unexpectedly")
+    return run
+
+
+def report(name: str, baseline_us: float, fast_us: float):
+    print(f"{name:<28} {baseline_us:>10.1f} {fast_us:>10.1f} {baseline_us - fast_us:>10.1f} {baseline_us / fast_us:>7.1f}x")
+
+
+def main(iterations: int = 2000):
+    print(f"orjson: {'yes' if orjson else 'no'}, msgpack: {'yes' if msgpack else 'no'}\n")
+    print(f"{'path':<28} {'default us':>10} {'fast us':>10} {'saved us':>10} {'speedup':>8}")
+
+    chat_data = sample_chat_response()
+    baseline = per_call_us(fastapi_path(ChatResponse, lambda: ChatResponse(**chat_data)), iterations)
+    fast = per_call_us(lambda: FastJSONResponse(ChatResponse.model_construct(**chat_data)).body, iterations)
+    report("POST /chat response", baseline, fast)
+
+    resume = sample_resume()
+    build_parse = lambda: ResumeParseResponse(success=True, data=resume, message="ok", candidate_id="c1")
+    baseline = per_call_us(fastapi_path(ResumeParseResponse, build_parse), iterations)
+    fast = per_call_us(
+        lambda: FastJSONResponse(
+            ResumeParseResponse.model_construct(success=True, data=resume, message="ok", candidate_id="c1")
+        ).body,
+        iterations
+    )
+    report("POST /parse-resume response", baseline, fast)
+
+    snapshot = sample_snapshot(resume)
+    legacy = lambda: zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"), 6)
+    legacy_blob, packed_blob = legacy(), pack(snapshot)
+    report("session snapshot encode", per_call_us(legacy, iterations), per_call_us(lambda: pack(snapshot), iterations))
+    report(
+        "session snapshot decode",
+        per_call_us(lambda: json.loads(zlib.decompress(legacy_blob)), iterations),
+        per_call_us(lambda: unpack(packed_blob), iterations)
+    )
+    print(f"\nsnapshot size: {len(legacy_blob)} bytes (json+zlib) vs {len(packed_blob)} bytes (packed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Cold import of app.main in a fresh interpreter, the bulk of a new replica's time to ready"""
+import json
+import os
+import subprocess
+import sys
+
+from app.utils.startup import HEAVY_MODULES
+
+from benchmarks.harness import benchmark
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT = (
+    "import json, sys\n"
+    "import app.main\n"
+    "print(json.dumps([name for name in %r if name in sys.modules]))\n" % (HEAVY_MODULES,)
+)
+
+
+def _import_app() -> list:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, PRELOAD_HEAVY_MODULES="false")
+    result = subprocess.run([sys.executable, "-c", _SCRIPT], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@benchmark("cold_import[app.main]", threshold=0.3)
+def cold_import():
+    # The budget that matters most: none of the heavy SDKs or parsers load at import
+    loaded = _import_app()
+    assert not loaded, f"app.main imports heavy modules eagerly: {', '.join(loaded)}"
+    return _import_app
@@ -0,0 +1,170 @@
+"""Synthetic resume corpus with known text: PDFs, DOCX files, Gemini outputs and search results
+
+Everything is generated from a fixed seed, so runs are comparable. Files
+are written once to benchmarks/.corpus and reused.
+"""
+import json
+import os
+import random
+from typing import List, Dict, Any
+
+from docx import Document
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".corpus")
+LINES_PER_PAGE = 45
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "FastAPI", "Django", "Flask",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Docker", "Kubernetes", "AWS", "GCP", "Azure",
+    "Terraform", "Go", "Rust", "Java", "Spring", "Kafka", "Spark", "Airflow", "Pandas",
+    "NumPy", "TensorFlow", "PyTorch", "GraphQL", "REST", "CI/CD", "Linux", "Git", "C++",
+]
+TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Full Stack Developer",
+          "Platform Engineer", "Machine Learning Engineer", "DevOps Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+WORDS = ("built maintained designed scaled migrated services pipelines teams customers latency "
+         "throughput reliability features platform APIs dashboards reporting tooling infrastructure").split()
+
+
+def page_marker(page: int) -> str:
+    """Token placed on every page so extraction can be checked, not just timed"""
+    return f"MARKER{page:03d}"
+
+
+def resume_lines(pages: int, seed: int = 7) -> List[List[str]]:
+    """Resume text split into pages of LINES_PER_PAGE lines"""
+    rng = random.Random(seed + pages)
+    result = []
+    for page in range(pages):
+        lines = [f"Jane Doe - Resume page {page + 1} {page_marker(page)}"]
+        while len(lines) < LINES_PER_PAGE:
+            if len(lines) % 9 == 1:
+                lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)} (20{rng.randint(10, 23)}-0{rng.randint(1, 9)})")
+            elif len(lines) % 9 == 2:
+                lines.append("Skills: " + ", ".join(rng.sample(SKILLS, 6)))
+            else:
+                lines.append(" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + ".")
+        result.append(lines)
+    return result
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(pages: List[List[str]]) -> bytes:
+    """Minimal valid PDF with one Helvetica text stream per page"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        body = ["BT", "/F1 10 Tf", "12 TL", "50 770 Td"]
+        body += [f"({_pdf_escape(line)}) Tj T*" for line in lines]
+        body.append("ET")
+        stream = "\n".join(body).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def build_docx(pages: List[List[str]], path: str):
+    document = Document()
+    for lines in pages:
+        for line in lines:
+            document.add_paragraph(line)
+    document.save(path)
+
+
+def resume_file(kind: str, pages: int) -> str:
+    """Path to a generated resume of the given kind ("pdf" or "docx") and length"""
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    path = os.path.join(CORPUS_DIR, f"resume_{pages}p.{kind}")
+    if not os.path.exists(path):
+        lines = resume_lines(pages)
+        if kind == "pdf":
+            with open(path, "wb") as f:
+                f.write(build_pdf(lines))
+        else:
+            build_docx(lines, path)
+    return path
+
+
+def parsed_resume_json(experiences: int = 4, seed: int = 11) -> Dict[str, Any]:
+    rng = random.Random(seed + experiences)
+    return {
+        "name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "+1 555 0100",
+        "skills": rng.sample(SKILLS, 20),
+        "experience": [
+            {
+                "title": rng.choice(TITLES),
+                "company": rng.choice(COMPANIES),
+                "start_date": f"20{10 + i}-01",
+                "end_date": f"20{11 + i}-06",
+                "description": " ".join(rng.choice(WORDS) for _ in range(40)),
+                "location": "Berlin, Germany",
+            }
+            for i in range(experiences)
+        ],
+        "education": [{"degree": "BSc", "institution": "TU Berlin", "field_of_study": "Computer Science",
+                       "start_date": "2008-10", "end_date": "2012-07", "gpa": 3.6}],
+        "summary": "Engineer with a decade of experience building data-heavy backend services.",
+    }
+
+
+def gemini_outputs() -> Dict[str, str]:
+    """Response texts in the shapes Gemini actually returns"""
+    small = json.dumps(parsed_resume_json(2), indent=2)
+    large = json.dumps(parsed_resume_json(12), indent=2)
+    return {
+        "fenced_small": f"```json\n{small}\n```",
+        "fenced_large": f"```json\n{large}\n```",
+        "unfenced_small": small,
+        "prose_wrapped": f"Here is the extracted resume data:\n\n{small}\n\nLet me know if you need anything else.",
+        "invalid": "I'm sorry, I could not parse this resume. {not json at all",
+    }
+
+
+def search_results(count: int, seed: int = 3) -> List[Dict[str, Any]]:
+    """Tavily-shaped results; about a fifth are the same posting on another board"""
+    rng = random.Random(seed + count)
+    boards = ["linkedin.com/jobs/view", "indeed.com/viewjob", "glassdoor.com/job-listing"]
+    results = []
+    for i in range(count):
+        original = i - 1 if i % 5 == 4 else i
+        posting_rng = random.Random(original)
+        title = f"{posting_rng.choice(['Senior', 'Junior', 'Lead', ''])} {posting_rng.choice(TITLES)}".strip()
+        skills = posting_rng.sample(SKILLS, 8)
+        content = (
+            f"{posting_rng.choice(COMPANIES)} is hiring a {title}. Full-time, remote friendly. "
+            f"Requirements: {', '.join(skills)}. "
+            + " ".join(posting_rng.choice(WORDS) for _ in range(60))
+        )
+        results.append({
+            "title": f"{title} - {posting_rng.choice(COMPANIES)}",
+            "url": f"https://www.{rng.choice(boards)}/{original}-{rng.randint(0, 10 ** 6)}",
+            "content": content,
+            "published_date": f"2025-0{posting_rng.randint(1, 9)}-1{posting_rng.randint(0, 9)}",
+        })
+    return results
@@ -0,0 +1,121 @@
+"""Tiny benchmark harness: registration, timing, and comparison against stored baselines"""
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import date
+from typing import Callable, Dict, Any, List, Optional
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Allowed slowdown over baseline before a benchmark counts as regressed
+DEFAULT_THRESHOLD = 0.25
+
+_REGISTRY: Dict[str, Dict[str, Any]] = {}
+
+
+def benchmark(name: str, threshold: Optional[float] = None):
+    """Register a setup function; it does untimed preparation and returns the callable to time
+
+    The setup may also raise AssertionError to reject wrong results, so a
+    faster-but-broken change does not pass as an improvement.
+    """
+    def register(setup: Callable[[], Callable[[], Any]]):
+        _REGISTRY[name] = {"setup": setup, "threshold": threshold}
+        return setup
+    return register
+
+
+def registered() -> Dict[str, Dict[str, Any]]:
+    return dict(_REGISTRY)
+
+
+def measure(fn: Callable[[], Any], repeat: int = 7, target_seconds: float = 0.05) -> Dict[str, float]:
+    """Median and best per-call time over ``repeat`` rounds of an auto-sized loop"""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target_seconds or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(target_seconds / elapsed) + 1))
+
+    # Keep multi-second benchmarks to a few rounds
+    if elapsed / number > 0.5:
+        repeat = min(repeat, 3)
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    return {
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "min_us": round(min(rounds) * 1e6, 3),
+        "loops": number,
+    }
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], thresholds: Dict[str, float],
+                  path: str = BASELINE_PATH, merge: bool = True):
+    baseline = load_baseline(path) if merge else {"results": {}}
+    baseline["meta"] = {
+        "created": date.today().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "processor": platform.processor() or "unknown",
+    }
+    baseline["default_threshold"] = DEFAULT_THRESHOLD
+    for name, result in results.items():
+        entry = {"median_us": result["median_us"]}
+        if thresholds.get(name) is not None:
+            entry["threshold"] = thresholds[name]
+        baseline["results"][name] = entry
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(name: str, result: Dict[str, float], baseline: Dict[str, Any],
+            threshold_override: Optional[float] = None) -> Dict[str, Any]:
+    """Classify one result against the baseline: new, ok, improved or regressed"""
+    stored = baseline.get("results", {}).get(name)
+    if stored is None:
+        return {"status": "new", "change": None, "baseline_us": None}
+
+    threshold = threshold_override
+    if threshold is None:
+        threshold = stored.get("threshold", baseline.get("default_threshold", DEFAULT_THRESHOLD))
+    change = result["median_us"] / stored["median_us"] - 1
+    if change > threshold:
+        status = "REGRESSED"
+    elif change < -threshold:
+        status = "improved"
+    else:
+        status = "ok"
+    return {"status": status, "change": change, "baseline_us": stored["median_us"]}
+
+
+def format_row(name: str, result: Dict[str, float], comparison: Dict[str, Any]) -> str:
+    baseline = f"{comparison['baseline_us']:.1f}" if comparison["baseline_us"] is not None else "-"
+    change = f"{comparison['change'] * 100:+.1f}%" if comparison["change"] is not None else "-"
+    return f"{name:<44} {result['median_us']:>12.1f} {baseline:>12} {change:>8}  {comparison['status']}"
+
+
+def header() -> List[str]:
+    return [
+        f"{'benchmark':<44} {'median us':>12} {'baseline us':>12} {'change':>8}  status",
+        "-" * 88,
+    ]
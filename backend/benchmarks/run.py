@@ -0,0 +1,67 @@
+"""Run the micro-benchmarks and compare them with the stored baselines
+
+From the backend directory:
+
+    python -m benchmarks.run                     # compare, exit 1 on regression
+    python -m benchmarks.run -k extract_json     # only matching benchmarks
+    python -m benchmarks.run --update-baseline   # store these results as the new baseline
+
+Baselines are machine-specific; refresh them when moving to different hardware.
+"""
+import argparse
+import io
+import logging
+import sys
+from contextlib import redirect_stdout
+
+from benchmarks import (  # noqa: F401 (registers benchmarks)
+    bench_candidates, bench_extraction, bench_json, bench_logging, bench_memory, bench_scoring, bench_startup
+)
+from benchmarks.harness import (
+    registered, measure, load_baseline, save_baseline, compare, format_row, header
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to baselines.json")
+    parser.add_argument("--threshold", type=float, default=None, help="override every regression threshold")
+    parser.add_argument("--repeat", type=int, default=7, help="timed rounds per benchmark")
+    args = parser.parse_args(argv)
+
+    # Expected warnings from the code under test (e.g. no Tavily key) are not results
+    logging.getLogger("app").setLevel(logging.ERROR)
+
+    baseline = load_baseline()
+    results, thresholds, regressed = {}, {}, []
+
+    for line in header():
+        print(line)
+    for name, entry in sorted(registered().items()):
+        if args.pattern not in name:
+            continue
+        # Keep anything the code under test writes to stdout out of the report
+        with redirect_stdout(io.StringIO()):
+            fn = entry["setup"]()
+            result = measure(fn, repeat=args.repeat)
+        comparison = compare(name, result, baseline, args.threshold)
+        print(format_row(name, result, comparison), flush=True)
+
+        results[name] = result
+        thresholds[name] = entry["threshold"]
+        if comparison["status"] == "REGRESSED":
+            regressed.append(name)
+
+    if args.update_baseline:
+        save_baseline(results, thresholds)
+        print(f"\nBaseline updated for {len(results)} benchmarks")
+        return 0
+    if regressed:
+        print(f"\n{len(regressed)} regressed: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Local stand-ins for the Gemini REST API and Tavily search, with configurable latency
+
+    python -m loadtest.fakes gemini --port 9101 --latency lognormal:800:0.4
+    python -m loadtest.fakes tavily --port 9102 --latency uniform:300:900
+
+Latency specs (milliseconds): ``fixed:MS``, ``uniform:LOW:HIGH`` or
+``lognormal:MEDIAN:SIGMA``. ``--error-rate`` makes that fraction of calls
+return HTTP 503.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+from typing import Callable
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.corpus import parsed_resume_json, search_results
+
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """Sampler returning a delay in seconds for a latency spec"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(":") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        low, high = values
+        return lambda: random.uniform(low, high) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma) / 1000
+    raise ValueError(f"Bad latency spec {spec!r}; use fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+
+
+def _gemini_text(prompt: str) -> str:
+    """Answer in the shape the app expects for each kind of prompt"""
+    if "resume parser" in prompt:
+        return "```json\n" + json.dumps(parsed_resume_json(3)) + "\n```"
+    if "job search parameters" in prompt:
+        return json.dumps({"keywords": ["python", "fastapi"], "job_titles": ["Backend Engineer"],
+                           "experience_level": "Senior", "location": None})
+    if "running summary" in prompt:
+        return "The user is looking for senior backend roles and asked for resume feedback."
+    return ("1. **Quantify impact** in every experience bullet.\n"
+            "2. **Lead with skills** that match the roles you target.\n"
+            "3. **Tighten the summary** to two sentences about your focus.")
+
+
+def _candidate(text: str) -> dict:
+    return {"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}
+
+
+def gemini_app(latency: Callable[[], float], error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/{version}/models/{call:path}")
+    async def generate(version: str, call: str, request: Request):
+        await asyncio.sleep(latency())
+        if random.random() < error_rate:
+            return JSONResponse({"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}}, 503)
+
+        body = await request.json()
+        prompt = " ".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        text = _gemini_text(prompt)
+        usage = {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+
+        if call.endswith(":streamGenerateContent"):
+            # The REST transport reads a JSON array of partial responses
+            chunks = [text[i:i + 80] for i in range(0, len(text), 80)]
+            return JSONResponse([{"candidates": [_candidate(chunk)], "usageMetadata": usage} for chunk in chunks])
+        return {"candidates": [_candidate(text)], "usageMetadata": usage}
+
+    return app
+
+
+def tavily_app(latency: Callable[[], float], error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/search")
+    async def search(request: Request):
+        await asyncio.sleep(latency())
+        if random.random() < error_rate:
+            return JSONResponse({"detail": "overloaded"}, 503)
+
+        body = await request.json()
+        count = int(body.get("max_results") or 5)
+        # Vary results per query so the dedup index sees realistic churn
+        return {"query": body.get("query"), "results": search_results(count, seed=random.randint(0, 50))}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("service", choices=["gemini", "tavily"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    factory = gemini_app if args.service == "gemini" else tavily_app
+    app = factory(parse_latency(args.latency), args.error_rate)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
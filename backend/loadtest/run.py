@@ -0,0 +1,154 @@
+"""Offline end-to-end load test: boots fake Gemini/Tavily servers and the API, then drives journeys
+
+    python -m loadtest.run --rates 1,2,4 --duration 60
+    python -m loadtest.run --rates 2 --gemini-latency lognormal:1200:0.5 --json report.json
+
+Each rate is one stage. A journey uploads a resume, creates a chat agent,
+sends a few chat turns with think time, and deletes the session. The
+report lists throughput, p50/p95/p99 and error rate per endpoint per stage,
+plus the server's own /metrics at the end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Dict, List
+
+import httpx
+
+from loadtest.workload import Workload
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def start_process(stack: ExitStack, args: List[str], env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    """Start a child process that is terminated when the stack closes"""
+    log = stack.enter_context(open(log_path, "w"))
+    process = subprocess.Popen(args, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    def stop():
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    stack.callback(stop)
+    return process
+
+
+def boot(stack: ExitStack, args, workdir: str) -> str:
+    """Start the fakes and the API; returns the API base URL"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    fakes = [("gemini", args.gemini_port, args.gemini_latency), ("tavily", args.tavily_port, args.tavily_latency)]
+    for service, port, latency in fakes:
+        start_process(stack, [
+            sys.executable, "-m", "loadtest.fakes", service, "--port", str(port),
+            "--latency", latency, "--error-rate", str(args.upstream_error_rate),
+        ], env, os.path.join(workdir, f"{service}.log"))
+        wait_until_up(f"http://127.0.0.1:{port}/docs")
+
+    app_env = dict(
+        env,
+        GEMINI_API_KEY="loadtest",
+        GEMINI_API_ENDPOINT=f"http://127.0.0.1:{args.gemini_port}",
+        TAVILY_API_KEY="loadtest",
+        TAVILY_API_URL=f"http://127.0.0.1:{args.tavily_port}/search",
+        SESSION_BACKEND="memory",
+        # Every file the app writes stays in the workdir, so synthetic resumes never reach data/
+        JOB_DEDUP_DB_PATH=os.path.join(workdir, "job_signatures.db"),
+        RESUME_STORE_DB_PATH=os.path.join(workdir, "resumes.db"),
+        JOB_LISTING_STORE_DB_PATH=os.path.join(workdir, "job_listings.db"),
+        RESUME_TEXT_DB_PATH=os.path.join(workdir, "resume_texts.db"),
+        SESSION_SQLITE_PATH=os.path.join(workdir, "sessions.db"),
+        PARSE_QUEUE_DB_PATH=os.path.join(workdir, "parse_jobs.db"),
+        PARSE_UPLOAD_DIR=os.path.join(workdir, "parse_uploads"),
+        PROFILE_DIR=os.path.join(workdir, "profiles"),
+    )
+    start_process(stack, [
+        sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+        "--port", str(args.app_port), "--workers", str(args.app_workers), "--log-level", "warning",
+    ], app_env, os.path.join(workdir, "app.log"))
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    wait_until_up(f"{base_url}/health", timeout=60)
+    return base_url
+
+
+def format_report(stages: List[Dict[str, object]]) -> str:
+    lines = [
+        f"{'rate/s':>6}  {'endpoint':<20} {'reqs':>6} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}",
+        "-" * 82,
+    ]
+    for stage in stages:
+        for name, row in stage["endpoints"].items():
+            lines.append(
+                f"{stage['target_rate']:>6g}  {name:<20} {row['requests']:>6} {row['throughput_rps']:>7.2f} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate'] * 100:>6.1f}%"
+            )
+        lines.append(
+            f"{'':>6}  journeys completed {stage['journeys_completed']}/{stage['journeys_started']} "
+            f"in {stage['elapsed_s']}s"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default="1,2,4", help="Comma-separated journey arrival rates per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of arrivals per stage")
+    parser.add_argument("--chat-turns", type=int, default=4)
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between chat turns")
+    parser.add_argument("--resume-pages", type=int, default=2)
+    parser.add_argument("--gemini-latency", default="lognormal:800:0.4")
+    parser.add_argument("--tavily-latency", default="uniform:300:900")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--app-port", type=int, default=9100)
+    parser.add_argument("--gemini-port", type=int, default=9101)
+    parser.add_argument("--tavily-port", type=int, default=9102)
+    parser.add_argument("--app-workers", type=int, default=1)
+    parser.add_argument("--base-url", help="Drive an already running API instead of booting one")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rates.split(",") if rate]
+    stages = []
+    metrics = ""
+    with ExitStack() as stack, tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        base_url = args.base_url or boot(stack, args, workdir)
+        for rate in rates:
+            print(f"[LoadTest] {rate:g} journeys/s for {args.duration:g}s against {base_url}")
+            workload = Workload(base_url, rate, args.duration, chat_turns=args.chat_turns,
+                                think_time=args.think_time, resume_pages=args.resume_pages)
+            stages.append(asyncio.run(workload.run()))
+        try:
+            metrics = httpx.get(f"{base_url}/metrics", timeout=5).text
+        except httpx.HTTPError as e:
+            print(f"[LoadTest] Could not read /metrics: {e}")
+
+    print()
+    print(format_report(stages))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"config": vars(args), "stages": stages, "server_metrics": metrics}, f, indent=2)
+        print(f"\n[LoadTest] Report written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Open-loop user journeys against the API and per-endpoint latency statistics"""
+import asyncio
+import random
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import build_pdf, resume_lines
+
+CHAT_SCRIPT = [
+    "hello",
+    "find me backend jobs",
+    "show me more",
+    "only remote full time roles",
+    "give me feedback on my resume",
+    "should i learn rust or go?",
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint during one stage"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, latency: float, status: str, ok: bool):
+        self.latencies.append(latency)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "statuses": dict(self.status_counts),
+        }
+
+
+class Workload:
+    """Starts one journey per arrival: upload -> create-agent -> several chat turns
+
+    Arrivals follow a Poisson process at ``rate`` journeys per second and do
+    not wait for earlier journeys (open loop), so a saturated server shows up
+    as growing latency and errors instead of silently lowering the load.
+    """
+
+    def __init__(self, base_url: str, rate: float, duration: float, chat_turns: int = 4,
+                 think_time: float = 1.0, resume_pages: int = 2, timeout: float = 60.0,
+                 max_connections: int = 1000):
+        self.base_url = base_url
+        self.rate = rate
+        self.duration = duration
+        self.chat_turns = chat_turns
+        self.think_time = think_time
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.resume_pdf = build_pdf(resume_lines(resume_pages))
+        self.stats: Dict[str, EndpointStats] = {}
+        self.journeys_started = 0
+        self.journeys_completed = 0
+
+    async def run(self) -> Dict[str, object]:
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            tasks = []
+            start = time.perf_counter()
+            next_arrival = start
+            while next_arrival - start < self.duration:
+                await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+                tasks.append(asyncio.create_task(self._journey(client)))
+                self.journeys_started += 1
+                next_arrival += random.expovariate(self.rate)
+
+            # Let in-flight journeys finish so their latencies are counted
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+
+        return {
+            "target_rate": self.rate,
+            "elapsed_s": round(elapsed, 1),
+            "journeys_started": self.journeys_started,
+            "journeys_completed": self.journeys_completed,
+            "endpoints": {name: stats.summary(elapsed) for name, stats in sorted(self.stats.items())},
+        }
+
+    async def _journey(self, client: httpx.AsyncClient):
+        session_id = uuid.uuid4().hex
+        files = {"file": ("resume.pdf", self.resume_pdf, "application/pdf")}
+        parsed = await self._call(client, "POST /parse-resume", "POST", "/parse-resume", files=files)
+        if parsed is None:
+            return
+
+        created = await self._call(
+            client, "POST /create-agent", "POST", f"/create-agent/{session_id}", json=parsed["data"]
+        )
+        if created is None:
+            return
+
+        for message in CHAT_SCRIPT[:self.chat_turns]:
+            await asyncio.sleep(random.expovariate(1 / self.think_time) if self.think_time else 0)
+            reply = await self._call(
+                client, "POST /chat", "POST", f"/chat/{session_id}", json={"role": "user", "content": message}
+            )
+            if reply is None:
+                return
+
+        await self._call(client, "DELETE /session", "DELETE", f"/session/{session_id}")
+        self.journeys_completed += 1
+
+    async def _call(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> Optional[dict]:
+        stats = self.stats.setdefault(name, EndpointStats())
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            stats.record(time.perf_counter() - start, type(e).__name__, ok=False)
+            return None
+
+        ok = response.status_code < 400
+        stats.record(time.perf_counter() - start, str(response.status_code), ok)
+        return response.json() if ok else None
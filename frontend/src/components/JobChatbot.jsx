@@ -32,6 +32,9 @@ import axios from 'axios';
 import ReactMarkdown from 'react-markdown';
 
 const API_BASE_URL = 'http://localhost:8000';
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
+const RECONNECT_BASE_DELAY_MS = 500;
+const RECONNECT_MAX_DELAY_MS = 15000;
 
 const JobChatbot = ({ resumeData, sessionId, onReset }) => {
   const [messages, setMessages] = useState([]);
@@ -40,27 +43,118 @@ const JobChatbot = ({ resumeData, sessionId, onReset }) => {
   const [jobSuggestions, setJobSuggestions] = useState([]);
   const [expandedJob, setExpandedJob] = useState(null);
   const messagesEndRef = useRef(null);
+  const socketRef = useRef(null);
+  const pendingTurnRef = useRef(null);
+
+  useEffect(() => {
+    // One socket per session; turns fall back to HTTP while it is not open
+    if (!sessionId) return undefined;
+
+    let stopped = false;
+    let attempts = 0;
+    let retryTimer = null;
+
+    const connect = () => {
+      // keep_session: a dropped socket must not end the session; only "Upload New Resume" does
+      const socket = new WebSocket(`${WS_BASE_URL}/ws/chat/${sessionId}?keep_session=true`);
+      socketRef.current = socket;
+
+      socket.onopen = () => {
+        attempts = 0;
+      };
+
+      socket.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        const turn = pendingTurnRef.current;
+
+        if (data.type === 'prefetch_ready') {
+          console.debug('Job matches are ready');
+          return;
+        }
+        if (!turn) return;
+
+        if (data.type === 'job') {
+          turn.jobs.push(data.job);
+          setJobSuggestions([...turn.jobs]);
+        } else if (data.type === 'delta') {
+          turn.text += data.content;
+          const streamed = { id: turn.id, role: 'assistant', content: turn.text, jobSuggestions: [] };
+          setMessages(prev => [...prev.filter(msg => msg.id !== turn.id), streamed]);
+        } else if (data.type === 'done') {
+          pendingTurnRef.current = null;
+          turn.resolve({ message: data.message, job_suggestions: turn.jobs, streamId: turn.id });
+        } else if (data.type === 'error') {
+          pendingTurnRef.current = null;
+          turn.reject(new Error(data.detail));
+        }
+      };
+
+      socket.onclose = (event) => {
+        if (socketRef.current === socket) socketRef.current = null;
+        const turn = pendingTurnRef.current;
+        if (turn) {
+          pendingTurnRef.current = null;
+          turn.reject(new Error('Connection closed'));
+        }
+
+        // 4404: the session is gone; 4409: another tab took the session over
+        if (stopped || event.code === 4404 || event.code === 4409) return;
+        const delay = Math.min(RECONNECT_MAX_DELAY_MS, RECONNECT_BASE_DELAY_MS * 2 ** attempts);
+        attempts += 1;
+        retryTimer = setTimeout(connect, delay);
+      };
+    };
+
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      if (socketRef.current) socketRef.current.close();
+    };
+  }, [sessionId]);
+
+  const handleReset = () => {
+    // The socket keeps the session alive across drops, so ending it is explicit
+    axios.delete(`${API_BASE_URL}/session/${sessionId}`).catch(error => {
+      console.error('Failed to end session:', error);
+    });
+    onReset();
+  };
+
+  const sendChat = async (content) => {
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      return new Promise((resolve, reject) => {
+        pendingTurnRef.current = { id: `stream-${Date.now()}`, text: '', jobs: [], resolve, reject };
+        socket.send(JSON.stringify({ content }));
+      });
+    }
+
+    const response = await axios.post(`${API_BASE_URL}/chat/${sessionId}`, {
+      role: 'user',
+      content
+    });
+    return response.data;
+  };
 
   useEffect(() => {
     // Initialize chat with greeting
     const initChat = async () => {
       setLoading(true);
       try {
-        const response = await axios.post(`${API_BASE_URL}/chat/${sessionId}`, {
-          role: 'user',
-          content: 'hello'
-        });
+        const data = await sendChat('hello');
 
         const newMessage = {
           id: Date.now(),
           role: 'assistant',
-          content: response.data.message,
-          jobSuggestions: response.data.job_suggestions || []
+          content: data.message,
+          jobSuggestions: data.job_suggestions || []
         };
 
         setMessages([newMessage]);
-        if (response.data.job_suggestions) {
-          setJobSuggestions(response.data.job_suggestions);
+        if (data.job_suggestions) {
+          setJobSuggestions(data.job_suggestions);
         }
       } catch (error) {
         console.error('Failed to initialize chat:', error);
@@ -96,22 +190,20 @@ const JobChatbot = ({ resumeData, sessionId, onReset }) => {
     setLoading(true);
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/chat/${sessionId}`, {
-        role: 'user',
-        content: inputMessage
-      });
+      const data = await sendChat(inputMessage);
 
       const assistantMessage = {
         id: Date.now() + 1,
         role: 'assistant',
-        content: response.data.message,
-        jobSuggestions: response.data.job_suggestions || []
+        content: data.message,
+        jobSuggestions: data.job_suggestions || []
       };
 
-      setMessages(prev => [...prev, assistantMessage]);
+      // The full reply replaces any text streamed while it was generated
+      setMessages(prev => [...prev.filter(msg => msg.id !== data.streamId), assistantMessage]);
       
-      if (response.data.job_suggestions && response.data.job_suggestions.length > 0) {
-        setJobSuggestions(response.data.job_suggestions);
+      if (data.job_suggestions && data.job_suggestions.length > 0) {
+        setJobSuggestions(data.job_suggestions);
       }
     } catch (error) {
       console.error('Failed to send message:', error);
@@ -180,7 +272,7 @@ const JobChatbot = ({ resumeData, sessionId, onReset }) => {
             <Typography variant="h5" sx={{ display: 'flex', alignItems: 'center', gap: 1 }}>
               <SmartToyIcon /> Job Hunter Assistant
             </Typography>
-            <Button variant="outlined" color="secondary" onClick={onReset}>
+            <Button variant="outlined" color="secondary" onClick={handleReset}>
               Upload New Resume
             </Button>
           </Box>